@@ -11,15 +11,23 @@ Capabilities:
 
 Main public API:
 - analyze_file()
-- analyze_repo_files()
+- analyze_source()
+- analyze_repo_files()   (directory or analyzer.sources.Source)
 - build_unified_model()  ← FINAL OUTPUT
 """
 
 import ast
+import hashlib
 from pathlib import Path
-from typing import Dict, Set, Optional, List
+from typing import Callable, Dict, Set, Optional, List, Union, TYPE_CHECKING
 import json
 
+if TYPE_CHECKING:
+    from analyzer.checkpoint import AnalysisJournal
+    from analyzer.isolation import ResourceLimits
+    from analyzer.records import NamePool
+    from analyzer.sources import Source
+
 
 # ============================================================
 # AST Visitor
@@ -142,73 +150,270 @@ def parse_python_file(file_path: Path) -> Optional[ast.AST]:
         return None
 
 
+def parse_python_source(source: Union[str, bytes], filename: str = "<unknown>") -> Optional[ast.AST]:
+    """Parse in-memory source (bytes honour PEP 263 encoding declarations)."""
+    try:
+        return ast.parse(source, filename=filename)
+    except Exception:
+        return None
+
+
 # ============================================================
 # File Analysis
 # ============================================================
 
-def analyze_file(file_path: Path) -> Dict:
-    tree = parse_python_file(file_path)
+def analyze_file(file_path: Path, passes: Optional[List[str]] = None) -> Dict:
+    """
+    Analyze one file.
+
+    Args:
+        file_path: File to analyze
+        passes: Names of extra analysis passes (see analyzer/passes.py);
+            they run in the same traversal and their results are stored
+            under "passes"
+    """
+    return analyze_tree(parse_python_file(file_path), passes)
+
+
+def analyze_source(source: Union[str, bytes], filename: str = "<unknown>",
+                   passes: Optional[List[str]] = None) -> Dict:
+    """Same as analyze_file(), for source that is not on disk."""
+    return analyze_tree(parse_python_source(source, filename), passes)
+
+
+def analyze_tree(tree: Optional[ast.AST], passes: Optional[List[str]] = None) -> Dict:
+    pass_instances = []
+    if passes:
+        from analyzer.passes import FusedVisitor, create_passes
+        pass_instances = create_passes(passes)
 
     if tree is None:
-        return {
+        result = {
             "entry": False,
             "imports": [],
             "functions": {}
         }
-
-    visitor = CodeVisitor()
-    visitor.visit(tree)
-
-    return {
-        "entry": visitor.has_main_guard,
-        "imports": sorted(visitor.imports),
-        "functions": {
-            name: {
-                "calls": sorted(visitor.calls.get(name, []))
+    else:
+        visitor = FusedVisitor(pass_instances) if pass_instances else CodeVisitor()
+        visitor.visit(tree)
+
+        result = {
+            "entry": visitor.has_main_guard,
+            "imports": sorted(visitor.imports),
+            "functions": {
+                name: {
+                    "calls": sorted(visitor.calls.get(name, []))
+                }
+                for name in sorted(visitor.functions)
             }
-            for name in sorted(visitor.functions)
         }
-    }
 
+    if pass_instances:
+        result["passes"] = {p.name: p.result() for p in pass_instances}
+
+    return result
 
-def analyze_repo_files(repo_path: str) -> Dict[str, Dict]:
-    from analyzer.parser import get_python_files
 
+def analyze_repo_files(repo_path: Union[str, "Source"],
+                       select: Optional[Callable[[str], bool]] = None,
+                       pool: Optional["NamePool"] = None,
+                       passes: Optional[List[str]] = None,
+                       stats: Optional[Dict] = None,
+                       limits: Optional["ResourceLimits"] = None,
+                       on_file: Optional[Callable[[str, int], None]] = None,
+                       on_progress: Optional[Callable[[Dict], None]] = None,
+                       progress_interval: float = 1.0,
+                       journal: Optional["AnalysisJournal"] = None) -> Dict[str, Dict]:
+    """
+    Analyze every Python file of a repository.
+
+    Files with byte-identical content (vendored copies, generated stubs)
+    are parsed once; every further path gets a copy of the analysis (or
+    a shared FileRecord), and path-specific fields such as depends_on
+    are added per path when the model is assembled.
+
+    Args:
+        repo_path: Directory path, or any analyzer.sources.Source (git
+            revision, archive, ...)
+        select: Optional predicate on relative paths; only files it
+            accepts are read and analyzed (see analyzer/shard.py)
+        pool: If given, results are compacted into analyzer.records
+            FileRecords as they are produced, interning names in `pool`
+        passes: Extra analysis passes to run on every file
+        stats: If given, filled with "files", "unique" (distinct
+            contents actually parsed), "skipped" and "resumed" (taken
+            from the journal)
+        limits: If given, files are analyzed in a worker process under
+            these size/time/memory limits, and files that exceed them are
+            recorded with a "skipped" reason (see analyzer/isolation.py)
+        on_file: Called after each file with its path and size in bytes
+        on_progress: Receives progress events (files done, throughput,
+            ETA, current and slowest file; see analyzer/progress.py),
+            at least every progress_interval seconds
+        journal: Checkpoint journal (analyzer/checkpoint.py); completed
+            results are appended to it, and files it already holds with
+            the same content are not analyzed again
+
+    Returns:
+        Dictionary mapping relative path -> analysis, sorted by path
+    """
+    from analyzer.sources import Source, LocalSource
+
+    source = repo_path if isinstance(repo_path, Source) else LocalSource(repo_path)
     results = {}
-    files = get_python_files(repo_path)
+    # content digest -> analysis of the first file with that content
+    by_content = {}
 
-    for file_rel_path in files:
-        full_path = Path(repo_path) / file_rel_path
-        results[file_rel_path] = analyze_file(full_path)
+    if pool is not None:
+        from analyzer.records import FileRecord
 
-    return results
+    isolated = None
+    if limits is not None:
+        from analyzer.isolation import IsolatedAnalyzer
+        isolated = IsolatedAnalyzer(limits)
+
+    tracker = None
+    if on_progress is not None:
+        from analyzer.progress import ProgressTracker
+        tracker = ProgressTracker(on_progress, source.count_files(select), interval=progress_interval)
+
+    try:
+        for file_rel_path, content in source.iter_files(select):
+            if tracker is not None:
+                tracker.file_started(file_rel_path)
+            digest = hashlib.blake2b(content, digest_size=16).digest()
+            shared = by_content.get(digest)
+            if shared is None:
+                file_data = journal.lookup(file_rel_path, digest.hex()) if journal is not None else None
+                if file_data is None:
+                    if isolated is not None:
+                        file_data = isolated.analyze(content, file_rel_path, passes)
+                    else:
+                        file_data = analyze_source(content, file_rel_path, passes)
+                    if journal is not None:
+                        journal.record(file_rel_path, digest.hex(), file_data)
+                if pool is not None:
+                    file_data = FileRecord.from_analysis(file_data, pool)
+                by_content[digest] = file_data
+            elif pool is not None:
+                # Records carry per-path depends_on/fingerprint
+                file_data = shared.share()
+            else:
+                # Function entries are per path: fingerprints and enrichment
+                # add fields to them
+                file_data = {
+                    **shared,
+                    "functions": {name: dict(func_data) for name, func_data in shared["functions"].items()}
+                }
+            if pool is not None:
+                file_rel_path = pool.name(file_rel_path)
+            results[file_rel_path] = file_data
+            if on_file is not None:
+                on_file(file_rel_path, len(content))
+            if tracker is not None:
+                tracker.file_done(file_rel_path, len(content))
+    finally:
+        if isolated is not None:
+            isolated.close()
+        if tracker is not None:
+            tracker.finish()
+
+    if stats is not None:
+        stats["files"] = len(results)
+        stats["unique"] = len(by_content)
+        stats["skipped"] = sum(1 for file_data in results.values() if file_data.get("skipped"))
+        stats["resumed"] = journal.resumed if journal is not None else 0
+
+    # Archives yield files in archive order
+    return {file_rel_path: results[file_rel_path] for file_rel_path in sorted(results)}
 
 
 # ============================================================
 # Unified Model (FINAL OUTPUT)
 # ============================================================
 
-def build_unified_model(repo_path: str) -> Dict:
+def build_unified_model(repo_path: Union[str, "Source"], compact: bool = False,
+                        passes: Optional[List[str]] = None,
+                        deadline_seconds: Optional[float] = None,
+                        on_snapshot: Optional[Callable[[Dict], None]] = None,
+                        stats: Optional[Dict] = None,
+                        limits: Optional["ResourceLimits"] = None,
+                        on_file: Optional[Callable[[str, int], None]] = None,
+                        on_progress: Optional[Callable[[Dict], None]] = None,
+                        progress_interval: float = 1.0,
+                        journal: Optional["AnalysisJournal"] = None) -> Dict:
     """
     Final Day-3 output.
+    Accepts a directory path or an analyzer.sources.Source.
     Combines:
     - entry point detection
     - function call analysis
     - file-level dependencies
+    - Merkle fingerprints per function, file, directory and repo
+      (see analyzer/fingerprint.py)
+
+    With compact=True, returns an analyzer.records.CompactModel instead:
+    same content, a fraction of the memory, serialized with write_json().
+
+    `passes` names extra analysis passes (analyzer/passes.py); their
+    results appear under "passes" in each file entry.
+
+    With deadline_seconds, analysis is progressive and stops at the
+    deadline: an imports-only map first, then full analysis while time
+    remains, with intermediate models passed to on_snapshot (see
+    analyzer/progressive.py). Not combinable with compact or journal.
+
+    `stats`, `limits`, `on_file`, `on_progress`/`progress_interval` and
+    `journal` are passed to analyze_repo_files() (run counters; per-file
+    size/time/memory guards; per-file hook; progress events; checkpoint
+    journal).
     """
+    if deadline_seconds is not None:
+        if compact:
+            raise ValueError("compact=True is not supported with deadline_seconds")
+        if journal is not None:
+            raise ValueError("journal is not supported with deadline_seconds")
+        from analyzer.progressive import build_progressive_model
+
+        return build_progressive_model(repo_path, deadline_seconds, on_snapshot, passes=passes,
+                                       limits=limits, on_file=on_file, on_progress=on_progress,
+                                       progress_interval=progress_interval)
+
+    if compact:
+        from analyzer.records import CompactModel, NamePool
+
+        pool = NamePool()
+        return CompactModel(analyze_repo_files(repo_path, pool=pool, passes=passes, stats=stats,
+                                               limits=limits, on_file=on_file, on_progress=on_progress,
+                                               progress_interval=progress_interval, journal=journal), pool)
+
+    return assemble_unified_model(analyze_repo_files(repo_path, passes=passes, stats=stats,
+                                                     limits=limits, on_file=on_file, on_progress=on_progress,
+                                                     progress_interval=progress_interval, journal=journal))
 
-    analysis_results = analyze_repo_files(repo_path)
 
+def assemble_unified_model(analysis_results: Dict[str, Dict]) -> Dict:
+    """
+    Build the unified model from per-file analysis results.
+
+    Shared by build_unified_model() and the shard reduce step, so a
+    merged model is identical to a single-node run.
+
+    Args:
+        analysis_results: Output of analyze_repo_files() (sorted by path)
+    """
     from analyzer.dependency import (
         build_file_dependency_graph,
         identify_entry_point
     )
+    from analyzer.fingerprint import add_fingerprints
 
     dependency_graph = build_file_dependency_graph(analysis_results)
     entry_point = identify_entry_point(analysis_results)
 
     unified = {
         "entry_point": entry_point,
+        "fingerprint": None,
         "files": {}
     }
 
@@ -219,8 +424,12 @@ def build_unified_model(repo_path: str) -> Dict:
             "functions": file_data["functions"],
             "depends_on": dependency_graph.get(file_path, [])
         }
+        if "passes" in file_data:
+            unified["files"][file_path]["passes"] = file_data["passes"]
+        if "skipped" in file_data:
+            unified["files"][file_path]["skipped"] = file_data["skipped"]
 
-    return unified
+    return add_fingerprints(unified)
 
 
 # ============================================================
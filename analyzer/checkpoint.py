@@ -0,0 +1,202 @@
+"""
+checkpoint.py - Checkpoint journal for resumable analysis
+analyze_repo_files(journal=...) appends every completed per-file result
+to a JSON-lines journal as the run progresses. If the run is killed (OOM,
+CI timeout), a resumed run reads the journal back and skips every file
+whose path and content hash are already recorded, so only the remaining
+files are parsed; dependency resolution and entry-point detection then
+run over the full result set as usual.
+
+Layout (one JSON object per line):
+
+    {"format": "code-sherpa-journal/1", "passes": [...],
+     "pass_versions": {name: version}, "limits": {...} | null}  header
+    {"path": "...", "digest": "<hex>", "analysis": {...}}      result
+    {"path": "...", "digest": "<hex>"}                         same content
+                                                               as an earlier
+                                                               line
+
+Each line is flushed as it is written, so a killed process loses at most
+the line it was writing; a torn last line is dropped on resume.
+
+Resource limits (analyzer/isolation.py) decide which files are skipped.
+When a run is resumed under other limits, the journal is rewritten under
+the new ones: if no limit got tighter only the skipped results are
+dropped and analyzed again, otherwise every result is.
+"""
+
+import json
+import os
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from analyzer.isolation import ResourceLimits
+
+JOURNAL_FORMAT = "code-sherpa-journal/1"
+
+
+def _limits_header(limits: Optional["ResourceLimits"]) -> Optional[Dict]:
+    """The limits that can change a file's result, as stored in the header."""
+    if limits is None:
+        return None
+    return {"max_bytes": limits.max_bytes, "timeout": limits.timeout, "max_memory": limits.max_memory}
+
+
+def _pass_versions(passes: List[str]) -> Dict[str, int]:
+    """Versions of the named passes; results of an older version are stale."""
+    if not passes:
+        return {}
+    from analyzer.passes import PASSES
+
+    return {name: PASSES[name].version for name in passes if name in PASSES}
+
+
+def _limits_loosened(old: Optional[Dict], new: Optional[Dict]) -> bool:
+    """Whether every file analyzed under `old` would also be analyzed under `new`."""
+    if new is None:
+        return True
+    if old is None:
+        # Without limits, unparsable files are not recorded as skipped
+        return False
+    return all(
+        new[name] is None or (old.get(name) is not None and new[name] >= old[name])
+        for name in new
+    )
+
+
+class AnalysisJournal:
+    """
+    Append-only journal of per-file analysis results.
+
+    Args:
+        journal_path: Journal file
+        passes: Analysis passes of the run; a journal written with
+            different passes, or other versions of them, cannot be resumed
+        resume: Load an existing journal and append to it; otherwise any
+            existing journal is replaced
+        limits: ResourceLimits of the run, if any; see the module
+            docstring for resuming under other limits
+    """
+
+    def __init__(self, journal_path: str, passes: Optional[List[str]] = None, resume: bool = False,
+                 limits: Optional["ResourceLimits"] = None):
+        self.journal_path = journal_path
+        self.passes = list(passes or [])
+        self.pass_versions = _pass_versions(self.passes)
+        self.limits = _limits_header(limits)
+        self._paths: Dict[str, str] = {}
+        # Results read back on resume; new results are only written out
+        self._analyses: Dict[str, Dict] = {}
+        self._digests = set()
+        self.resumed = 0
+
+        if resume and os.path.exists(journal_path):
+            self._load()
+            self._file = open(journal_path, "a", encoding="utf-8")
+        else:
+            self._file = open(journal_path, "w", encoding="utf-8")
+            self._write(self._header())
+
+    def _header(self) -> Dict:
+        return {"format": JOURNAL_FORMAT, "passes": self.passes,
+                "pass_versions": self.pass_versions, "limits": self.limits}
+
+    def _load(self) -> None:
+        """
+        Read results back, truncating a torn last line. Under other
+        limits, results that may change are dropped and the remaining
+        lines are rewritten behind the new header.
+
+        Raises:
+            ValueError: Not a journal, or written with other passes or
+                pass versions
+        """
+        valid_size = 0
+        rewrite = None
+        with open(self.journal_path, "rb") as f:
+            header_line = f.readline()
+            try:
+                header = json.loads(header_line)
+            except ValueError:
+                header = None
+            if not isinstance(header, dict) or header.get("format") != JOURNAL_FORMAT:
+                raise ValueError(f"Not an analysis journal: {self.journal_path}")
+            if header.get("passes", []) != self.passes:
+                raise ValueError(
+                    f"Journal was written with passes {header.get('passes', [])}, not {self.passes}"
+                )
+            if header.get("pass_versions", {}) != self.pass_versions:
+                raise ValueError(
+                    f"Journal was written with pass versions {header.get('pass_versions', {})}, "
+                    f"not {self.pass_versions}"
+                )
+            valid_size = len(header_line)
+            if header.get("limits") != self.limits:
+                rewrite = open(self.journal_path + ".tmp", "wb")
+                keep_analyzed = _limits_loosened(header.get("limits"), self.limits)
+
+            try:
+                if rewrite is not None:
+                    rewrite.write((json.dumps(self._header()) + "\n").encode("utf-8"))
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    valid_size += len(line)
+                    analysis = entry.get("analysis")
+                    if rewrite is not None:
+                        if analysis is not None and not (keep_analyzed and "skipped" not in analysis):
+                            continue
+                        if analysis is None and entry["digest"] not in self._digests:
+                            continue
+                        rewrite.write(line)
+                    self._paths[entry["path"]] = entry["digest"]
+                    if analysis is not None:
+                        self._analyses[entry["digest"]] = analysis
+                        self._digests.add(entry["digest"])
+            finally:
+                if rewrite is not None:
+                    rewrite.close()
+
+        if rewrite is not None:
+            os.replace(self.journal_path + ".tmp", self.journal_path)
+            return
+        with open(self.journal_path, "r+b") as f:
+            f.truncate(valid_size)
+
+    def _write(self, entry: Dict) -> None:
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+    def lookup(self, file_path: str, digest: str) -> Optional[Dict]:
+        """Journaled analysis of this path with this content, if any."""
+        if self._paths.get(file_path) != digest:
+            return None
+        analysis = self._analyses.get(digest)
+        if analysis is not None:
+            self.resumed += 1
+        return analysis
+
+    def record(self, file_path: str, digest: str, analysis: Dict) -> None:
+        """Append one completed result (analysis is stored once per content)."""
+        entry = {"path": file_path, "digest": digest}
+        if digest not in self._digests:
+            entry["analysis"] = analysis
+            self._digests.add(digest)
+        self._paths[file_path] = digest
+        self._write(entry)
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+    def __enter__(self) -> "AnalysisJournal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -5,6 +5,9 @@ Builds relationships between files based on imports.
 
 from typing import Dict, List, Set
 
+# Package of files at the repository root (see package_of())
+ROOT_PACKAGE = "(root)"
+
 
 def get_available_modules(analysis_results: Dict[str, Dict]) -> Set[str]:
     """
@@ -129,6 +132,24 @@ def import_to_file(import_name: str, available_modules: Set[str],
     return None
 
 
+def package_of(file_path: str, depth: int) -> str:
+    """
+    Directory prefix of file_path, truncated to `depth` components.
+
+    Examples:
+        >>> package_of('src/requests/api.py', 1)
+        'src'
+        >>> package_of('src/requests/api.py', 2)
+        'src/requests'
+        >>> package_of('setup.py', 2)
+        '(root)'
+    """
+    parts = file_path.split("/")[:-1]
+    if not parts:
+        return ROOT_PACKAGE
+    return "/".join(parts[:depth])
+
+
 def build_file_dependency_graph(analysis_results: Dict[str, Dict]) -> Dict[str, List[str]]:
     """
     Build a graph showing which files depend on which other files.
@@ -162,26 +183,80 @@ def build_file_dependency_graph(analysis_results: Dict[str, Dict]) -> Dict[str,
     dependency_graph = {}
     
     for file_path, file_data in analysis_results.items():
-        dependencies = []
-        
-        # Get imports for this file
-        imports = file_data.get('imports', [])
+        dependency_graph[file_path] = resolve_file_dependencies(
+            file_path, file_data.get('imports', []), available_modules, all_files
+        )
+    
+    return dependency_graph
+
+
+def resolve_file_dependencies(file_path: str, imports: List[str],
+                              available_modules: Set[str], all_files: Set[str]) -> List[str]:
+    """
+    Resolve one file's imports to the local files it depends on.
+    
+    A file's dependencies only change when its own imports or the set of
+    files in the repository change, which lets incremental callers
+    (see analyzer/diff.py) re-resolve just the files that changed.
+    
+    Args:
+        file_path: The importing file (never listed as its own dependency)
+        imports: Its import names
+        available_modules: Output of get_available_modules()
+        all_files: Set of all file paths in the repo
+    
+    Returns:
+        Sorted list of local files the file depends on
+    """
+    dependencies = []
+    
+    for import_name in imports:
+        # Only process local modules (automatically filters out stdlib/third-party)
+        if not is_local_module(import_name, available_modules):
+            continue
         
-        for import_name in imports:
-            # Only process local modules (automatically filters out stdlib/third-party)
-            if not is_local_module(import_name, available_modules):
-                continue
-            
-            # Try to resolve to a file
-            target_file = import_to_file(import_name, available_modules, all_files)
-            
-            if target_file and target_file != file_path:  # Don't self-reference
-                dependencies.append(target_file)
+        # Try to resolve to a file
+        target_file = import_to_file(import_name, available_modules, all_files)
         
-        # Remove duplicates and sort for consistency
-        dependency_graph[file_path] = sorted(list(set(dependencies)))
+        if target_file and target_file != file_path:  # Don't self-reference
+            dependencies.append(target_file)
     
-    return dependency_graph
+    # Remove duplicates and sort for consistency
+    return sorted(list(set(dependencies)))
+
+
+def build_reverse_dependency_graph(dependency_graph: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """
+    Invert a dependency graph: for each file, which files depend on it.
+    
+    Built in one pass over all edges, so every later lookup is O(1).
+    
+    Args:
+        dependency_graph: Dictionary mapping file -> list of files it depends on
+            (output of build_file_dependency_graph(), or the depends_on
+            lists of the unified model)
+    
+    Returns:
+        Dictionary mapping file -> sorted list of files that depend on it
+        (every file in dependency_graph has an entry, possibly empty)
+    
+    Example:
+        >>> build_reverse_dependency_graph({
+        ...     'app.py': ['service.py'],
+        ...     'service.py': [],
+        ... })
+        {'app.py': [], 'service.py': ['app.py']}
+    """
+    reverse: Dict[str, List[str]] = {file_path: [] for file_path in dependency_graph}
+    
+    for file_path, dependencies in dependency_graph.items():
+        for dep_file in dependencies:
+            reverse.setdefault(dep_file, []).append(file_path)
+    
+    for dependents in reverse.values():
+        dependents.sort()
+    
+    return reverse
 
 
 def identify_entry_point(analysis_results: Dict[str, Dict]) -> str | None:
@@ -227,6 +302,81 @@ def identify_entry_point(analysis_results: Dict[str, Dict]) -> str | None:
     return None
 
 
+def find_strongly_connected_components(graph: Dict[str, List[str]]) -> List[List[str]]:
+    """
+    Find strongly connected components (import cycles) of a dependency graph.
+    
+    Iterative Tarjan's algorithm: O(V + E) and safe on very deep graphs
+    (no recursion limit).
+    
+    Args:
+        graph: Dictionary mapping node -> list of nodes it points to.
+            Targets missing from the keys are treated as nodes too.
+    
+    Returns:
+        List of components in reverse topological order (a component is
+        listed before any component that points to it). Each component
+        is a sorted list of nodes.
+    
+    Example:
+        >>> find_strongly_connected_components({'a': ['b'], 'b': ['a'], 'c': ['a']})
+        [['a', 'b'], ['c']]
+    """
+    index_of: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    on_stack: Set[str] = set()
+    stack: List[str] = []
+    components: List[List[str]] = []
+    counter = 0
+    
+    for start in graph:
+        if start in index_of:
+            continue
+        
+        # Each frame: (node, iterator over its successors)
+        work = [(start, iter(graph.get(start, [])))]
+        index_of[start] = lowlink[start] = counter
+        counter += 1
+        stack.append(start)
+        on_stack.add(start)
+        
+        while work:
+            node, successors = work[-1]
+            advanced = False
+            
+            for succ in successors:
+                if succ not in index_of:
+                    index_of[succ] = lowlink[succ] = counter
+                    counter += 1
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(graph.get(succ, []))))
+                    advanced = True
+                    break
+                if succ in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[succ])
+            
+            if advanced:
+                continue
+            
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            
+            if lowlink[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(sorted(component))
+    
+    return components
+
+
 def get_dependency_summary(dependency_graph: Dict[str, List[str]]) -> Dict:
     """
     Generate summary statistics for the dependency graph.
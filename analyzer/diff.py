@@ -0,0 +1,436 @@
+"""
+diff.py - Incremental analysis between two git revisions
+Analyzes only the Python files that changed between a base and a head
+revision, patches the base model into the head model, and reports the
+structural delta plus the downstream files it impacts.
+
+Cost is proportional to the diff: changed files are read straight from
+the object store (see analyzer/sources.py) and only their dependencies
+are re-resolved, unless files were added or removed, in which case
+dependencies are re-resolved in memory for every file (imports can only
+resolve differently when the set of files changes).
+
+Two existing models can be compared without any repository: diff_models()
+uses their Merkle fingerprints (see analyzer/fingerprint.py) to visit
+only the directories that differ.
+
+Usage:
+    python -m analyzer.diff <repo_path> <base_rev> <head_rev>
+        [--base-model analysis.json] [--output-model head.json]
+    python -m analyzer.diff --models <base.json> <head.json> [--impacted]
+"""
+
+import json
+import subprocess
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from analyzer.analyzer import analyze_source, build_unified_model
+from analyzer.dependency import (
+    build_file_dependency_graph,
+    build_reverse_dependency_graph,
+    get_available_modules,
+    identify_entry_point,
+    resolve_file_dependencies
+)
+from analyzer.fingerprint import ROOT, add_fingerprints, update_fingerprints
+from analyzer.parser import FileTraverser
+from analyzer.sources import GitRevisionSource
+
+ADDED = "added"
+MODIFIED = "modified"
+REMOVED = "removed"
+
+_STATUS = {"A": ADDED, "M": MODIFIED, "D": REMOVED, "T": MODIFIED}
+
+
+# ============================================================
+# Changed Files
+# ============================================================
+
+def changed_python_files(repo_path: str, base_rev: str, head_rev: str) -> Dict[str, str]:
+    """
+    Python files that differ between two revisions.
+
+    Renames are reported as a removal plus an addition, matching how the
+    model keys files by path.
+
+    Returns:
+        Dictionary mapping relative path -> "added" | "modified" | "removed"
+    """
+    result = subprocess.run(
+        ["git", "-C", repo_path, "diff", "--name-status", "-z", "--no-renames",
+         base_rev, head_rev],
+        capture_output=True
+    )
+    if result.returncode != 0:
+        raise ValueError(f"git diff failed: {result.stderr.decode('utf-8', 'replace').strip()}")
+
+    fields = result.stdout.decode("utf-8", "surrogateescape").split("\0")
+    changes = {}
+    for status, file_path in zip(fields[0::2], fields[1::2]):
+        kind = _STATUS.get(status[:1])
+        if kind and FileTraverser.is_included_path(file_path):
+            changes[file_path] = kind
+    return changes
+
+
+# ============================================================
+# Model Patching
+# ============================================================
+
+def patch_model(base_model: Dict, changes: Dict[str, Optional[Dict]]) -> Dict:
+    """
+    Apply per-file analysis results to a unified model.
+
+    Args:
+        base_model: Unified model of the base revision
+        changes: Dictionary mapping path -> analyze_source() result, or
+            None for a removed file
+
+    Returns:
+        New unified model, identical to build_unified_model() on the head
+        revision. Entries of unchanged files are shared with base_model
+        unless their depends_on changed, and only rebuilt entries and
+        their directories are re-fingerprinted.
+    """
+    base_files = base_model.get("files", {})
+    analysis_results = {
+        file_path: file_data for file_path, file_data in base_files.items()
+        if file_path not in changes
+    }
+    for file_path, file_data in changes.items():
+        if file_data is not None:
+            analysis_results[file_path] = file_data
+    analysis_results = {file_path: analysis_results[file_path] for file_path in sorted(analysis_results)}
+
+    if set(analysis_results) != set(base_files):
+        # The file set changed, so any import may resolve differently
+        dependency_graph = build_file_dependency_graph(analysis_results)
+    else:
+        available_modules = get_available_modules(analysis_results)
+        all_files = set(analysis_results)
+        dependency_graph = {
+            file_path: resolve_file_dependencies(
+                file_path, file_data.get("imports", []), available_modules, all_files
+            )
+            if file_path in changes else file_data.get("depends_on", [])
+            for file_path, file_data in analysis_results.items()
+        }
+
+    files = {}
+    dirty = set(base_files) - set(analysis_results)
+    for file_path, file_data in analysis_results.items():
+        depends_on = dependency_graph.get(file_path, [])
+        if file_path not in changes and file_data.get("depends_on") == depends_on:
+            files[file_path] = file_data
+            continue
+        files[file_path] = {
+            "entry": file_data["entry"],
+            "imports": file_data["imports"],
+            "functions": file_data["functions"],
+            "depends_on": depends_on
+        }
+        if "passes" in file_data:
+            files[file_path]["passes"] = file_data["passes"]
+        if "skipped" in file_data:
+            files[file_path]["skipped"] = file_data["skipped"]
+        dirty.add(file_path)
+
+    head_model = {
+        "entry_point": identify_entry_point(analysis_results),
+        "fingerprint": None,
+        "files": files
+    }
+    return update_fingerprints(head_model, base_model, dirty)
+
+
+# ============================================================
+# Structural Delta
+# ============================================================
+
+def _function_delta(old_functions: Dict, new_functions: Dict) -> Dict:
+    calls_changed = {}
+    for name in sorted(set(old_functions) & set(new_functions)):
+        old_calls = set(old_functions[name].get("calls", []))
+        new_calls = set(new_functions[name].get("calls", []))
+        if old_calls != new_calls:
+            calls_changed[name] = {
+                "added": sorted(new_calls - old_calls),
+                "removed": sorted(old_calls - new_calls)
+            }
+
+    return {
+        "functions_added": sorted(set(new_functions) - set(old_functions)),
+        "functions_removed": sorted(set(old_functions) - set(new_functions)),
+        "calls_changed": calls_changed
+    }
+
+
+def find_impacted_files(model: Dict, seeds: Set[str]) -> List[str]:
+    """
+    Files that depend, directly or transitively, on any of `seeds`.
+
+    Seeds themselves are only listed if they also depend on another seed.
+    """
+    reverse = build_reverse_dependency_graph({
+        file_path: file_data.get("depends_on", [])
+        for file_path, file_data in model.get("files", {}).items()
+    })
+
+    impacted: Set[str] = set()
+    queue = list(seeds)
+    while queue:
+        file_path = queue.pop()
+        for dependent in reverse.get(file_path, []):
+            if dependent not in impacted:
+                impacted.add(dependent)
+                queue.append(dependent)
+    return sorted(impacted)
+
+
+def model_delta(base_model: Dict, head_model: Dict, changed: Dict[str, str],
+                edge_paths: Optional[Iterable[str]] = None,
+                include_impacted: bool = True) -> Dict:
+    """
+    Structural delta between two models.
+
+    Args:
+        base_model: Unified model of the base revision
+        head_model: Unified model of the head revision
+        changed: Output of changed_python_files()
+        edge_paths: Files whose depends_on may differ (default: all files)
+        include_impacted: Compute "impacted" (walks the whole dependency
+            graph, so skip it when only the delta is needed)
+
+    Returns:
+        {
+            "entry_point": {"base", "head"} (only if it changed),
+            "files": {path: {"status", "functions_added", "functions_removed",
+                             "calls_changed": {func: {"added", "removed"}}}},
+            "depends_on": {"added": [[src, dst]], "removed": [[src, dst]]},
+            "impacted": [files that transitively depend on a changed file]
+        }
+    """
+    base_files = base_model.get("files", {})
+    head_files = head_model.get("files", {})
+
+    files = {}
+    for file_path in sorted(changed):
+        old_functions = base_files.get(file_path, {}).get("functions", {})
+        new_functions = head_files.get(file_path, {}).get("functions", {})
+        files[file_path] = {"status": changed[file_path], **_function_delta(old_functions, new_functions)}
+
+    # Edges can change in unchanged files too, when files are added or removed
+    if edge_paths is None:
+        edge_paths = set(base_files) | set(head_files)
+    edges_added, edges_removed = [], []
+    for file_path in sorted(edge_paths):
+        old_deps = base_files.get(file_path, {}).get("depends_on", [])
+        new_deps = head_files.get(file_path, {}).get("depends_on", [])
+        if old_deps is new_deps or old_deps == new_deps:
+            continue
+        edges_added.extend([file_path, dep] for dep in sorted(set(new_deps) - set(old_deps)))
+        edges_removed.extend([file_path, dep] for dep in sorted(set(old_deps) - set(new_deps)))
+
+    delta = {
+        "files": files,
+        "depends_on": {"added": edges_added, "removed": edges_removed}
+    }
+
+    if include_impacted:
+        # Dependents of removed files are found through the base model
+        removed = {file_path for file_path, kind in changed.items() if kind == REMOVED}
+        impacted = set(find_impacted_files(head_model, set(changed) - removed))
+        if removed:
+            impacted.update(find_impacted_files(base_model, removed))
+        delta["impacted"] = sorted(impacted & set(head_files))
+
+    if base_model.get("entry_point") != head_model.get("entry_point"):
+        delta["entry_point"] = {
+            "base": base_model.get("entry_point"),
+            "head": head_model.get("entry_point")
+        }
+    return delta
+
+
+# ============================================================
+# Model Diff (Merkle)
+# ============================================================
+
+def changed_files_between(base_model: Dict, head_model: Dict) -> Dict[str, str]:
+    """
+    Files that differ between two fingerprinted models.
+
+    Walks the directory tree from the root and only descends into
+    directories whose fingerprints differ, so the cost depends on the
+    size of the change rather than the size of the models.
+
+    Returns:
+        Dictionary mapping relative path -> "added" | "modified" | "removed"
+    """
+    base_files, head_files = base_model["files"], head_model["files"]
+    base_dirs, head_dirs = base_model["directories"], head_model["directories"]
+    empty = {"fingerprint": None, "dirs": [], "files": []}
+
+    changed = {}
+    stack = [ROOT]
+    while stack:
+        dir_path = stack.pop()
+        old = base_dirs.get(dir_path, empty)
+        new = head_dirs.get(dir_path, empty)
+        if old["fingerprint"] is not None and old["fingerprint"] == new["fingerprint"]:
+            continue
+
+        stack.extend(set(old["dirs"]) | set(new["dirs"]))
+        for file_path in set(old["files"]) | set(new["files"]):
+            if file_path not in head_files:
+                changed[file_path] = REMOVED
+            elif file_path not in base_files:
+                changed[file_path] = ADDED
+            elif base_files[file_path]["fingerprint"] != head_files[file_path]["fingerprint"]:
+                changed[file_path] = MODIFIED
+
+    return changed
+
+
+def diff_models(base_model: Dict, head_model: Dict, include_impacted: bool = False) -> Dict:
+    """
+    Structural delta between two unified models, using their fingerprints.
+
+    Identical models are detected with a single hash comparison. Models
+    written before fingerprints existed are fingerprinted in place first.
+
+    Returns:
+        {"identical": bool, ...model_delta() fields}. Files whose only
+        change is depends_on are listed as "modified" with empty
+        function changes.
+    """
+    for model in (base_model, head_model):
+        if "directories" not in model:
+            add_fingerprints(model)
+
+    if base_model["fingerprint"] == head_model["fingerprint"]:
+        delta = {"identical": True, "files": {}, "depends_on": {"added": [], "removed": []}}
+        if include_impacted:
+            delta["impacted"] = []
+        return delta
+
+    changed = changed_files_between(base_model, head_model)
+    delta = model_delta(base_model, head_model, changed,
+                        edge_paths=changed, include_impacted=include_impacted)
+    return {"identical": False, **delta}
+
+
+# ============================================================
+# Revision Diff
+# ============================================================
+
+def diff_revisions(repo_path: str, base_rev: str, head_rev: str,
+                   base_model: Optional[Dict] = None,
+                   passes: Optional[List[str]] = None) -> Tuple[Dict, Dict]:
+    """
+    Incrementally analyze head_rev against base_rev.
+
+    Args:
+        repo_path: Git repository
+        base_rev: Base revision
+        head_rev: Head revision
+        base_model: Unified model of base_rev (e.g. a cached analysis.json).
+            If omitted, base_rev is analyzed in full first.
+        passes: Extra analysis passes for changed files. Defaults to the
+            passes found in base_model, so patched entries match the
+            unchanged ones.
+
+    Returns:
+        (head_model, delta) - see patch_model() and model_delta()
+    """
+    if base_model is None:
+        with GitRevisionSource(repo_path, base_rev) as base_source:
+            base_model = build_unified_model(base_source, passes=passes)
+    elif passes is None:
+        passes = model_passes(base_model)
+
+    changed = changed_python_files(repo_path, base_rev, head_rev)
+
+    changes: Dict[str, Optional[Dict]] = {}
+    with GitRevisionSource(repo_path, head_rev) as head_source:
+        for file_path, kind in sorted(changed.items()):
+            if kind == REMOVED:
+                changes[file_path] = None
+            else:
+                changes[file_path] = analyze_source(head_source.read_bytes(file_path), file_path, passes)
+
+    head_model = patch_model(base_model, changes)
+
+    # patch_model() shares unchanged entries, so any other entry was
+    # rebuilt because its depends_on changed
+    base_files = base_model.get("files", {})
+    edge_paths = set(changed) | {
+        file_path for file_path, file_data in head_model["files"].items()
+        if file_data is not base_files.get(file_path)
+    }
+    return head_model, model_delta(base_model, head_model, changed, edge_paths=edge_paths)
+
+
+def model_passes(model: Dict) -> Optional[List[str]]:
+    """Names of the extra analysis passes a model was built with, if any."""
+    for file_data in model.get("files", {}).values():
+        if "passes" in file_data:
+            return list(file_data["passes"])
+    return None
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main():
+    import sys
+
+    if len(sys.argv) < 4:
+        print(
+            "Usage: python -m analyzer.diff <repo_path> <base_rev> <head_rev> "
+            "[--base-model analysis.json] [--output-model head.json] [--passes <a,b,...>]\n"
+            "       python -m analyzer.diff --models <base.json> <head.json> [--impacted]",
+            file=sys.stderr
+        )
+        sys.exit(1)
+
+    if sys.argv[1] == "--models":
+        models = []
+        for model_path in sys.argv[2:4]:
+            with open(model_path, "r", encoding="utf-8") as f:
+                models.append(json.load(f))
+        print(json.dumps(diff_models(*models, include_impacted="--impacted" in sys.argv), indent=2))
+        return
+
+    repo_path, base_rev, head_rev = sys.argv[1:4]
+
+    def option(name, default=None):
+        if name in sys.argv:
+            idx = sys.argv.index(name)
+            if idx + 1 < len(sys.argv):
+                return sys.argv[idx + 1]
+        return default
+
+    base_model = None
+    base_model_path = option("--base-model")
+    if base_model_path:
+        with open(base_model_path, "r", encoding="utf-8") as f:
+            base_model = json.load(f)
+
+    passes = option("--passes")
+    passes = passes.split(",") if passes else None
+
+    head_model, delta = diff_revisions(repo_path, base_rev, head_rev, base_model, passes)
+
+    output_model_path = option("--output-model")
+    if output_model_path:
+        with open(output_model_path, "w", encoding="utf-8") as f:
+            json.dump(head_model, f, indent=2)
+
+    print(json.dumps(delta, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+fingerprint.py - Merkle fingerprints for the unified model
+Adds a stable content hash to every function and file entry, rolls them
+up per directory and for the whole repository, so two models (or a
+model and a cache built from it) can be compared with one hash and
+diffed by descending only into subtrees whose hashes differ.
+
+Fingerprints cover the fields written by the analyzer (entry, imports,
+functions/calls, depends_on, entry_point) plus, when present, the
+per-file "passes" results and "skipped" reason (hashed as canonical
+JSON). Fields added later, such as enrichment explanations, do not
+change them.
+
+Model additions:
+    "fingerprint": repository hash
+    "files": {path: {..., "fingerprint": ..., "functions": {name: {..., "fingerprint": ...}}}}
+    "directories": {dir: {"fingerprint", "dirs": [child dirs], "files": [direct files]}}
+        ("" is the repository root)
+"""
+
+import hashlib
+import json
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+DIGEST_SIZE = 16
+
+# Separators that cannot occur in paths or identifiers
+_FIELD = "\0"
+_ITEM = "\x1f"
+
+ROOT = ""
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8", "surrogateescape"), digest_size=DIGEST_SIZE).hexdigest()
+
+
+def parent_directory(path: str) -> str:
+    """Directory containing a file or directory ("" for top-level entries)."""
+    return path.rsplit("/", 1)[0] if "/" in path else ROOT
+
+
+def hash_function(name: str, calls: Iterable[str]) -> str:
+    """Fingerprint of a function from its name and calls."""
+    return _digest(name + _FIELD + _ITEM.join(calls))
+
+
+def hash_file(file_path: str, entry: bool, imports: Iterable[str],
+              depends_on: Iterable[str], function_hashes: Iterable[str],
+              passes: Optional[Dict[str, Any]] = None,
+              skipped: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Fingerprint of a file from its fields and its functions' fingerprints.
+
+    passes/skipped are only hashed when present, so files without them
+    keep the fingerprints they had before these fields existed.
+    """
+    fields = [
+        file_path,
+        "1" if entry else "0",
+        _ITEM.join(imports),
+        _ITEM.join(depends_on),
+        _ITEM.join(function_hashes)
+    ]
+    if passes is not None or skipped is not None:
+        fields.append(json.dumps({"passes": passes, "skipped": skipped},
+                                 sort_keys=True, separators=(",", ":")))
+    return _digest(_FIELD.join(fields))
+
+
+def function_fingerprint(name: str, func_data: Dict) -> str:
+    return hash_function(name, func_data.get("calls", []))
+
+
+def file_fingerprint(file_path: str, file_data: Dict) -> str:
+    """
+    Hash of a file entry. Sets the fingerprint of each of its functions
+    as a side effect.
+    """
+    function_hashes = []
+    for name, func_data in file_data.get("functions", {}).items():
+        func_data["fingerprint"] = function_fingerprint(name, func_data)
+        function_hashes.append(func_data["fingerprint"])
+
+    return hash_file(
+        file_path,
+        file_data.get("entry"),
+        file_data.get("imports", []),
+        file_data.get("depends_on", []),
+        function_hashes,
+        file_data.get("passes"),
+        file_data.get("skipped")
+    )
+
+
+def _directory_fingerprint(dir_path: str, node: Dict, directories: Dict,
+                           file_hash: Callable[[str], str]) -> str:
+    return _digest(_FIELD.join((
+        dir_path,
+        _ITEM.join(directories[child]["fingerprint"] for child in node["dirs"]),
+        _ITEM.join(file_hash(file_path) for file_path in node["files"])
+    )))
+
+
+def _depth(dir_path: str) -> int:
+    return dir_path.count("/") if dir_path else -1
+
+
+def _roll_up(directories: Dict, dir_paths: Iterable[str], entry_point: Optional[str],
+             file_hash: Callable[[str], str]) -> Tuple[str, Dict]:
+    """
+    Recompute the given directories bottom-up.
+
+    Returns:
+        (repository fingerprint, directories sorted by path)
+    """
+    for dir_path in sorted(dir_paths, key=_depth, reverse=True):
+        node = directories[dir_path]
+        node["fingerprint"] = _directory_fingerprint(dir_path, node, directories, file_hash)
+
+    repo_fingerprint = _digest(_FIELD.join((entry_point or "", directories[ROOT]["fingerprint"])))
+    return repo_fingerprint, {dir_path: directories[dir_path] for dir_path in sorted(directories)}
+
+
+def build_directories(file_hashes: Dict[str, str], entry_point: Optional[str]) -> Tuple[str, Dict]:
+    """
+    Roll file fingerprints up into the directory tree.
+
+    Args:
+        file_hashes: Dictionary mapping file path -> file fingerprint
+        entry_point: The model's entry point
+
+    Returns:
+        (repository fingerprint, "directories" section of the model)
+    """
+    directories: Dict[str, Dict] = {ROOT: {"dirs": [], "files": []}}
+
+    for file_path in file_hashes:
+        dir_path = parent_directory(file_path)
+        ancestor = dir_path
+        while ancestor not in directories:
+            directories[ancestor] = {"dirs": [], "files": []}
+            ancestor = parent_directory(ancestor)
+        directories[dir_path]["files"].append(file_path)
+
+    for dir_path in directories:
+        if dir_path:
+            directories[parent_directory(dir_path)]["dirs"].append(dir_path)
+
+    for node in directories.values():
+        node["dirs"].sort()
+        node["files"].sort()
+
+    return _roll_up(directories, list(directories), entry_point, file_hashes.__getitem__)
+
+
+def add_fingerprints(model: Dict) -> Dict:
+    """
+    Fingerprint every function, file, directory and the repository.
+
+    Modifies the model in place and returns it.
+    """
+    files = model.get("files", {})
+    file_hashes = {}
+    for file_path, file_data in files.items():
+        file_data["fingerprint"] = file_hashes[file_path] = file_fingerprint(file_path, file_data)
+
+    model["fingerprint"], model["directories"] = build_directories(file_hashes, model.get("entry_point"))
+    return model
+
+
+def update_fingerprints(model: Dict, base_model: Dict, dirty: Set[str]) -> Dict:
+    """
+    Refresh fingerprints after a model was patched from base_model.
+
+    Only the dirty files (changed, added, removed, or with new depends_on)
+    and their ancestor directories are rehashed; everything else is
+    reused from base_model. Produces the same result as add_fingerprints().
+
+    Args:
+        model: Patched model; entries of clean files are shared with
+            base_model and already carry fingerprints
+        base_model: Fingerprinted model the patch was applied to
+        dirty: Paths whose entries were rebuilt or removed
+    """
+    if "directories" not in base_model:
+        return add_fingerprints(model)
+
+    files = model["files"]
+    directories = dict(base_model["directories"])
+    touched: Set[str] = set()
+
+    def node_for_update(dir_path: str) -> Dict:
+        # Copy on write: base_model keeps its own nodes
+        if dir_path not in touched:
+            old = directories.get(dir_path, {"dirs": [], "files": []})
+            directories[dir_path] = {"dirs": list(old["dirs"]), "files": list(old["files"])}
+            touched.add(dir_path)
+        return directories[dir_path]
+
+    for file_path in dirty:
+        dir_path = parent_directory(file_path)
+        node = node_for_update(dir_path)
+        if file_path in files:
+            files[file_path]["fingerprint"] = file_fingerprint(file_path, files[file_path])
+            if file_path not in node["files"]:
+                node["files"].append(file_path)
+        elif file_path in node["files"]:
+            node["files"].remove(file_path)
+
+        # Every ancestor needs rehashing; link new directories into their parent
+        while dir_path:
+            parent = node_for_update(parent_directory(dir_path))
+            if dir_path not in parent["dirs"]:
+                parent["dirs"].append(dir_path)
+            dir_path = parent_directory(dir_path)
+
+    # Drop directories left empty, deepest first so parents can empty too
+    for dir_path in sorted(touched, key=_depth, reverse=True):
+        node = directories[dir_path]
+        node["dirs"] = sorted(d for d in node["dirs"] if d in directories)
+        node["files"].sort()
+        if dir_path and not node["dirs"] and not node["files"]:
+            del directories[dir_path]
+
+    model["fingerprint"], model["directories"] = _roll_up(
+        directories, touched & set(directories), model.get("entry_point"),
+        lambda file_path: files[file_path]["fingerprint"]
+    )
+    return model
+
+
+def fingerprints_match(model: Dict, other: Dict, path: Optional[str] = None) -> bool:
+    """
+    One-hash validity check: True if two models (or one file or directory
+    of them) are structurally identical. Models without fingerprints
+    never match.
+    """
+    if path is None:
+        a, b = model.get("fingerprint"), other.get("fingerprint")
+    elif path in model.get("files", {}) or path in other.get("files", {}):
+        a = model.get("files", {}).get(path, {}).get("fingerprint")
+        b = other.get("files", {}).get(path, {}).get("fingerprint")
+    else:
+        a = model.get("directories", {}).get(path, {}).get("fingerprint")
+        b = other.get("directories", {}).get(path, {}).get("fingerprint")
+    return a is not None and a == b
@@ -0,0 +1,190 @@
+"""
+isolation.py - Per-file resource limits for pathological inputs
+A gigantic generated file or a deeply nested expression can stall a run
+or exhaust the recursion limit inside ast.parse / CodeVisitor. With
+limits, analyze_repo_files() hands each file to a worker process instead:
+
+- max_bytes:   larger files are not parsed at all
+- timeout:     a file taking longer is abandoned and its worker killed
+- max_memory:  address-space cap of the worker (RLIMIT_AS; POSIX only,
+               not enforced where the resource module is unavailable)
+
+Workers are recycled after max_tasks_per_worker files, and after any
+timeout, crash or memory error, so one bad file cannot poison the rest
+of the run.
+
+Files that were not analyzed get an empty analysis plus
+"skipped": {"reason", "detail"}, which the unified model keeps, so
+failures are visible instead of silently empty. Reasons:
+
+    too_large      over max_bytes
+    timeout        over the time budget
+    memory         MemoryError under max_memory
+    recursion      nesting too deep for the parser or the visitor
+    syntax_error   not valid Python
+    worker_crashed the worker died (e.g. a C stack overflow)
+"""
+
+import ast
+import multiprocessing
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from analyzer.analyzer import analyze_tree
+
+TOO_LARGE = "too_large"
+TIMEOUT = "timeout"
+MEMORY = "memory"
+RECURSION = "recursion"
+SYNTAX_ERROR = "syntax_error"
+WORKER_CRASHED = "worker_crashed"
+
+# Reasons after which the worker is replaced rather than reused
+_RECYCLE_REASONS = (MEMORY, RECURSION)
+
+
+class ResourceLimits:
+    """
+    Per-file guards; None disables a guard.
+
+    Args:
+        max_bytes: Largest file (in bytes) that is parsed
+        timeout: Seconds allowed to parse and visit one file
+        max_memory: Worker address-space cap in bytes
+        max_tasks_per_worker: Files analyzed before a worker is replaced
+    """
+
+    def __init__(self, max_bytes: Optional[int] = 5 * 1024 * 1024,
+                 timeout: Optional[float] = 30.0,
+                 max_memory: Optional[int] = 2 * 1024 * 1024 * 1024,
+                 max_tasks_per_worker: int = 1000):
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.max_memory = max_memory
+        self.max_tasks_per_worker = max_tasks_per_worker
+
+
+def skipped_analysis(reason: str, detail: str) -> Dict:
+    """Empty analysis for a file that was not analyzed."""
+    return {
+        "entry": False,
+        "imports": [],
+        "functions": {},
+        "skipped": {"reason": reason, "detail": detail}
+    }
+
+
+def guarded_analysis(content: bytes, filename: str, passes: Optional[List[str]] = None) -> Dict:
+    """analyze_source() that reports why a file could not be analyzed."""
+    try:
+        tree = ast.parse(content, filename=filename)
+    except (SyntaxError, ValueError) as e:
+        return skipped_analysis(SYNTAX_ERROR, str(e))
+    except RecursionError:
+        return skipped_analysis(RECURSION, "nesting too deep to parse")
+    except MemoryError:
+        return skipped_analysis(MEMORY, "out of memory while parsing")
+
+    try:
+        return analyze_tree(tree, passes)
+    except RecursionError:
+        return skipped_analysis(RECURSION, "nesting too deep to analyze")
+    except MemoryError:
+        return skipped_analysis(MEMORY, "out of memory while analyzing")
+
+
+def _worker_main(conn, max_memory: Optional[int]) -> None:
+    if max_memory and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory, max_memory))
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        conn.send(guarded_analysis(*task))
+
+
+class IsolatedAnalyzer:
+    """
+    Analyzes files in a worker process under ResourceLimits.
+
+    One worker is kept alive and reused; use as a context manager (or call
+    close()) to stop it.
+    """
+
+    def __init__(self, limits: ResourceLimits):
+        self.limits = limits
+        # spawn: a forked worker would inherit (and count) the parent's memory
+        self._context = multiprocessing.get_context("spawn")
+        self._process = None
+        self._conn = None
+        self._tasks = 0
+
+    def _start(self) -> None:
+        parent_conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.limits.max_memory),
+            daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        self._tasks = 0
+
+    def _stop(self, kill: bool = False) -> None:
+        if self._process is None:
+            return
+        if kill:
+            self._process.kill()
+        else:
+            try:
+                self._conn.send(None)
+            except (BrokenPipeError, OSError):
+                self._process.kill()
+        self._process.join()
+        self._conn.close()
+        self._process = self._conn = None
+
+    def analyze(self, content: bytes, filename: str, passes: Optional[List[str]] = None) -> Dict:
+        """analyze_source() under the limits; never raises for bad input."""
+        limits = self.limits
+        if limits.max_bytes is not None and len(content) > limits.max_bytes:
+            return skipped_analysis(TOO_LARGE, f"{len(content)} bytes > {limits.max_bytes}")
+
+        if self._process is None:
+            self._start()
+
+        try:
+            self._conn.send((content, filename, passes))
+            if not self._conn.poll(limits.timeout):
+                self._stop(kill=True)
+                return skipped_analysis(TIMEOUT, f"exceeded {limits.timeout}s")
+            result = self._conn.recv()
+        except (EOFError, BrokenPipeError, ConnectionResetError):
+            self._process.join(1)
+            exit_code = self._process.exitcode
+            self._stop(kill=True)
+            return skipped_analysis(WORKER_CRASHED, f"worker exited with code {exit_code}")
+
+        self._tasks += 1
+        skipped = result.get("skipped")
+        if (skipped and skipped["reason"] in _RECYCLE_REASONS) or self._tasks >= limits.max_tasks_per_worker:
+            self._stop()
+        return result
+
+    def close(self) -> None:
+        self._stop()
+
+    def __enter__(self) -> "IsolatedAnalyzer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -47,7 +47,8 @@ class FileTraverser:
         if not self.root_path.is_dir():
             raise ValueError(f"Path is not a directory: {root_path}")
     
-    def _should_exclude_dir(self, dir_name: str) -> bool:
+    @classmethod
+    def _should_exclude_dir(cls, dir_name: str) -> bool:
         """
         Check if a directory should be excluded from traversal.
         
@@ -58,7 +59,7 @@ class FileTraverser:
             True if directory should be excluded, False otherwise
         """
         # Check exact matches
-        if dir_name in self.EXCLUDED_DIRS:
+        if dir_name in cls.EXCLUDED_DIRS:
             return True
         
         # Check if it starts with a dot (hidden directories)
@@ -91,6 +92,30 @@ class FileTraverser:
         
         return True
     
+    @classmethod
+    def is_included_path(cls, relative_path: str) -> bool:
+        """
+        Apply the traversal rules to a relative path without touching disk.
+        
+        Used by non-filesystem sources (git revisions, archives) so they
+        select exactly the files a directory traversal would.
+        
+        Args:
+            relative_path: Forward-slash path relative to the repository root
+            
+        Returns:
+            True if the file would be collected by traverse(), False otherwise
+        """
+        *dir_parts, file_name = relative_path.split('/')
+        
+        if any(cls._should_exclude_dir(d) for d in dir_parts):
+            return False
+        
+        if Path(file_name).suffix not in cls.INCLUDED_EXTENSIONS:
+            return False
+        
+        return not file_name.startswith('.')
+    
     def traverse(self) -> List[str]:
         """
         Recursively traverse directory and collect Python files.
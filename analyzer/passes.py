@@ -0,0 +1,221 @@
+"""
+passes.py - Pluggable analysis passes fused into one AST traversal
+Extra per-file facts (classes, decorators, line counts, complexity, ...)
+are computed by passes. A pass declares node handlers; every requested
+pass runs inside the same walk CodeVisitor already does, so adding five
+metrics costs one traversal, not five.
+
+Writing a pass:
+
+    @register_pass
+    class TodoPass(AnalysisPass):
+        name = "todos"
+
+        def __init__(self):
+            self.count = 0
+
+        def visit_Constant(self, node, ctx):
+            ...
+
+        def result(self):
+            return {"count": self.count}
+
+Handlers are named visit_<NodeType> (called before the node's children)
+and leave_<NodeType> (after them). `ctx` is the running visitor, so
+ctx.current_function and ctx.nesting_level are available. A fresh
+instance is created for every file, so passes keep per-file state on
+self and need no locking in parallel runs.
+
+Results must be JSON-serializable; analyze_file() stores them under
+"passes": {pass name: result}. Bump `version` when a pass's output
+changes: a checkpoint journal (analyzer/checkpoint.py) written with
+another version is then refused on resume.
+"""
+
+import ast
+from typing import Any, Callable, Dict, Iterable, List, Type
+
+from analyzer.analyzer import CodeVisitor
+
+
+class AnalysisPass:
+    """Base class for analysis passes (see module docstring)."""
+
+    name: str = ""
+    version: int = 1
+
+    def result(self) -> Any:
+        raise NotImplementedError
+
+
+PASSES: Dict[str, Type[AnalysisPass]] = {}
+
+
+def register_pass(cls: Type[AnalysisPass]) -> Type[AnalysisPass]:
+    """Class decorator: make a pass available by name."""
+    if not cls.name:
+        raise ValueError(f"{cls.__name__} has no name")
+    PASSES[cls.name] = cls
+    return cls
+
+
+def create_passes(names: Iterable[str]) -> List[AnalysisPass]:
+    """
+    Instantiate registered passes by name.
+
+    Raises:
+        ValueError: Unknown pass name
+    """
+    passes = []
+    for name in names:
+        if name not in PASSES:
+            raise ValueError(f"Unknown analysis pass: {name} (available: {', '.join(sorted(PASSES))})")
+        passes.append(PASSES[name]())
+    return passes
+
+
+class FusedVisitor(CodeVisitor):
+    """
+    CodeVisitor that also dispatches every node to the passes' handlers.
+
+    Handler tables are built once per file, keyed by node type name, so a
+    node without handlers costs one dictionary lookup.
+    """
+
+    def __init__(self, passes: List[AnalysisPass]):
+        super().__init__()
+        self._enter: Dict[str, List[Callable]] = {}
+        self._leave: Dict[str, List[Callable]] = {}
+        for analysis_pass in passes:
+            for attr in dir(analysis_pass):
+                if attr.startswith("visit_"):
+                    self._enter.setdefault(attr[6:], []).append(getattr(analysis_pass, attr))
+                elif attr.startswith("leave_"):
+                    self._leave.setdefault(attr[6:], []).append(getattr(analysis_pass, attr))
+
+    def visit(self, node: ast.AST) -> Any:
+        kind = node.__class__.__name__
+        for handler in self._enter.get(kind, ()):
+            handler(node, self)
+        result = super().visit(node)
+        for handler in self._leave.get(kind, ()):
+            handler(node, self)
+        return result
+
+
+# ============================================================
+# Built-in Passes
+# ============================================================
+
+def _dotted_name(node: ast.expr) -> str:
+    if isinstance(node, ast.Call):
+        node = node.func
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return f"{_dotted_name(node.value)}.{node.attr}"
+    return ast.unparse(node)
+
+
+@register_pass
+class ClassesPass(AnalysisPass):
+    """Classes with their bases and methods."""
+
+    name = "classes"
+
+    def __init__(self):
+        self.classes: Dict[str, Dict] = {}
+
+    def visit_ClassDef(self, node: ast.ClassDef, ctx: CodeVisitor) -> None:
+        self.classes[node.name] = {
+            "bases": [_dotted_name(base) for base in node.bases],
+            "methods": sorted(
+                child.name for child in node.body
+                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))
+            )
+        }
+
+    def result(self) -> Dict:
+        return {name: self.classes[name] for name in sorted(self.classes)}
+
+
+@register_pass
+class DecoratorsPass(AnalysisPass):
+    """Decorators applied to functions and classes."""
+
+    name = "decorators"
+
+    def __init__(self):
+        self.decorated: Dict[str, List[str]] = {}
+
+    def _record(self, node, ctx) -> None:
+        if node.decorator_list:
+            self.decorated[node.name] = [_dotted_name(d) for d in node.decorator_list]
+
+    visit_FunctionDef = visit_AsyncFunctionDef = visit_ClassDef = _record
+
+    def result(self) -> Dict:
+        return {name: self.decorated[name] for name in sorted(self.decorated)}
+
+
+@register_pass
+class LinesPass(AnalysisPass):
+    """Line span of the module and of each function."""
+
+    name = "lines"
+
+    def __init__(self):
+        self.total = 0
+        self.functions: Dict[str, int] = {}
+
+    def visit_Module(self, node: ast.Module, ctx: CodeVisitor) -> None:
+        if node.body:
+            self.total = node.body[-1].end_lineno or 0
+
+    def _record(self, node, ctx) -> None:
+        self.functions[node.name] = (node.end_lineno or node.lineno) - node.lineno + 1
+
+    visit_FunctionDef = visit_AsyncFunctionDef = _record
+
+    def result(self) -> Dict:
+        return {
+            "total": self.total,
+            "functions": {name: self.functions[name] for name in sorted(self.functions)}
+        }
+
+
+@register_pass
+class ComplexityPass(AnalysisPass):
+    """
+    Cyclomatic complexity per function: 1 + decision points (branches,
+    loops, exception handlers, boolean operators, comprehension filters,
+    match cases). Nested functions are counted separately.
+    """
+
+    name = "complexity"
+
+    def __init__(self):
+        self.complexity: Dict[str, int] = {}
+
+    def _function(self, node, ctx) -> None:
+        self.complexity[node.name] = 1
+
+    visit_FunctionDef = visit_AsyncFunctionDef = _function
+
+    def _decision(self, node, ctx) -> None:
+        if ctx.current_function is not None:
+            self.complexity[ctx.current_function] += 1
+
+    visit_If = visit_IfExp = visit_For = visit_AsyncFor = visit_While = _decision
+    visit_ExceptHandler = visit_Assert = visit_match_case = _decision
+
+    def visit_BoolOp(self, node: ast.BoolOp, ctx: CodeVisitor) -> None:
+        if ctx.current_function is not None:
+            self.complexity[ctx.current_function] += len(node.values) - 1
+
+    def visit_comprehension(self, node: ast.comprehension, ctx: CodeVisitor) -> None:
+        if ctx.current_function is not None:
+            self.complexity[ctx.current_function] += 1 + len(node.ifs)
+
+    def result(self) -> Dict:
+        return {name: self.complexity[name] for name in sorted(self.complexity)}
@@ -0,0 +1,169 @@
+"""
+progress.py - Progress and throughput reporting for long analyses
+analyze_repo_files(on_progress=...) reports through a ProgressTracker:
+files discovered and analyzed, files/s, bytes/s, ETA, the file being
+analyzed right now and the slowest file so far. Events are plain dicts:
+
+    {"event": "progress" | "done", "stage": "analyze",
+     "files_discovered": int | None, "files_done": int, "bytes_done": int,
+     "elapsed_seconds", "files_per_second", "bytes_per_second",
+     "eta_seconds": float | None,
+     "current_file": str | None, "current_seconds": float | None,
+     "slowest_file": str | None, "slowest_seconds": float | None}
+
+The CLI also emits {"event": "stage_start" | "stage_done", "stage",
+"elapsed_seconds"} around pipeline stages.
+
+A heartbeat thread emits "progress" every `interval` seconds even when
+no file finishes, so a file that hangs shows up as a growing
+current_seconds instead of silence. Callbacks may therefore run on that
+thread.
+
+console_reporter() renders events for a terminal (one refreshed line) or,
+when the stream is not a TTY, as JSON lines for log collectors.
+"""
+
+import json
+import sys
+import threading
+import time
+from typing import IO, Callable, Dict, Optional
+
+ProgressCallback = Callable[[Dict], None]
+
+TTY_INTERVAL = 0.5
+LOG_INTERVAL = 10.0
+
+
+class ProgressTracker:
+    """
+    Accumulates per-file progress and passes events to a callback.
+
+    Args:
+        on_progress: Receives event dicts (see module docstring)
+        total: Files discovered, or None if unknown (streamed archives)
+        stage: Stage name carried in every event
+        interval: Seconds between heartbeat events; 0 disables the
+            heartbeat and reports after every file instead
+    """
+
+    def __init__(self, on_progress: ProgressCallback, total: Optional[int] = None,
+                 stage: str = "analyze", interval: float = 1.0):
+        self.on_progress = on_progress
+        self.total = total
+        self.stage = stage
+        self.interval = interval
+        self.files_done = 0
+        self.bytes_done = 0
+        self.slowest_file: Optional[str] = None
+        self.slowest_seconds: Optional[float] = None
+        self._current_file: Optional[str] = None
+        self._current_start = 0.0
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+        if interval > 0:
+            self._heartbeat = threading.Thread(target=self._beat, name="progress", daemon=True)
+            self._heartbeat.start()
+
+    def _beat(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.on_progress(self.event("progress"))
+
+    def event(self, kind: str) -> Dict:
+        """Snapshot of the counters as an event dict."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._start
+            files_per_second = self.files_done / elapsed if elapsed > 0 else 0.0
+            eta = None
+            if self.total is not None and files_per_second > 0:
+                eta = round(max(self.total - self.files_done, 0) / files_per_second, 1)
+            return {
+                "event": kind,
+                "stage": self.stage,
+                "files_discovered": self.total,
+                "files_done": self.files_done,
+                "bytes_done": self.bytes_done,
+                "elapsed_seconds": round(elapsed, 3),
+                "files_per_second": round(files_per_second, 1),
+                "bytes_per_second": round(self.bytes_done / elapsed if elapsed > 0 else 0.0),
+                "eta_seconds": eta,
+                "current_file": self._current_file,
+                "current_seconds": round(now - self._current_start, 3) if self._current_file else None,
+                "slowest_file": self.slowest_file,
+                "slowest_seconds": self.slowest_seconds
+            }
+
+    def file_started(self, file_path: str) -> None:
+        with self._lock:
+            self._current_file = file_path
+            self._current_start = time.monotonic()
+
+    def file_done(self, file_path: str, size: int) -> None:
+        with self._lock:
+            seconds = round(time.monotonic() - self._current_start, 3)
+            self.files_done += 1
+            self.bytes_done += size
+            if self.slowest_seconds is None or seconds > self.slowest_seconds:
+                self.slowest_file, self.slowest_seconds = file_path, seconds
+            self._current_file = None
+        if self._heartbeat is None:
+            self.on_progress(self.event("progress"))
+
+    def finish(self) -> None:
+        """Stop the heartbeat and emit the final "done" event."""
+        self._stopped.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+        self.on_progress(self.event("done"))
+
+
+def _format_bytes(count: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if count < 1024 or unit == "GB":
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+
+
+def console_reporter(stream: IO[str] = None, is_tty: Optional[bool] = None) -> ProgressCallback:
+    """
+    Callback that renders events on `stream` (default stderr): a single
+    refreshed status line on a terminal, JSON lines otherwise.
+    """
+    stream = stream or sys.stderr
+    if is_tty is None:
+        is_tty = stream.isatty()
+    lock = threading.Lock()
+
+    def report_json(event: Dict) -> None:
+        with lock:
+            stream.write(json.dumps(event) + "\n")
+            stream.flush()
+
+    def report_tty(event: Dict) -> None:
+        kind = event["event"]
+        if kind == "stage_start":
+            line = f"[{event['stage']}] ..."
+        elif kind == "stage_done":
+            line = f"[{event['stage']}] done in {event['elapsed_seconds']:.1f}s"
+        else:
+            total = event["files_discovered"]
+            line = (
+                f"[{event['stage']}] {event['files_done']}/{total if total is not None else '?'} files"
+                f"  {event['files_per_second']:.1f} files/s"
+                f"  {_format_bytes(event['bytes_per_second'])}/s"
+            )
+            if event["eta_seconds"] is not None and kind == "progress":
+                line += f"  ETA {event['eta_seconds']:.0f}s"
+            if event["current_file"] and event["current_seconds"] >= 1:
+                line += f"  current: {event['current_file']} ({event['current_seconds']:.0f}s)"
+            elif event["slowest_file"]:
+                line += f"  slowest: {event['slowest_file']} ({event['slowest_seconds']:.2f}s)"
+        with lock:
+            # \r + clear to end of line; finished lines are kept
+            stream.write("\r\033[K" + line + ("" if kind == "progress" else "\n"))
+            stream.flush()
+
+    return report_tty if is_tty else report_json
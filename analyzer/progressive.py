@@ -0,0 +1,224 @@
+"""
+progressive.py - Time-budgeted progressive analysis
+Produces the best model that fits in a deadline instead of a perfect one
+later. Used by build_unified_model(deadline_seconds=...).
+
+Phases:
+1. Map: a fast line scan (no AST) extracts imports and the __main__
+   guard of every file, which identifies the entry point with the rules
+   of identify_entry_point(). Files are then ordered breadth-first from
+   the entry point over the scanned imports; files it does not reach
+   follow in listing order.
+2. Refine: files are fully analyzed (functions and calls) in the same
+   order while time remains.
+
+Resolving imports to files dominates the map phase and is repeated when
+the final model is assembled, so the time spent on it is held back from
+both phases to keep the total close to the deadline.
+
+Every file in the model carries a "status":
+    "complete"    full analysis
+    "partial"     imports and entry guard only (from the line scan)
+    "unanalyzed"  not reached before the deadline (empty entry)
+
+The top-level "progress" section summarizes the counts. Snapshots of the
+model are handed to a callback after the map phase and periodically
+during refinement, so callers can show a rough map immediately.
+"""
+
+import re
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Union
+
+from analyzer.analyzer import analyze_source, assemble_unified_model
+from analyzer.dependency import get_available_modules, identify_entry_point, resolve_file_dependencies
+from analyzer.sources import LocalSource, Source
+
+if TYPE_CHECKING:
+    from analyzer.isolation import ResourceLimits
+
+COMPLETE = "complete"
+PARTIAL = "partial"
+UNANALYZED = "unanalyzed"
+
+DEFAULT_SNAPSHOT_INTERVAL = 1.0
+
+_IMPORT_RE = re.compile(r"^[ \t]*import[ \t]+([^#;\n]+)", re.MULTILINE)
+_FROM_IMPORT_RE = re.compile(r"^[ \t]*from[ \t]+\.*([\w.]*)[ \t]+import\b", re.MULTILINE)
+_MAIN_GUARD_RE = re.compile(
+    r"""^if[ \t]+(?:__name__[ \t]*==[ \t]*['"]__main__['"]|['"]__main__['"][ \t]*==[ \t]*__name__)[ \t]*:""",
+    re.MULTILINE
+)
+
+
+def scan_imports(content: bytes) -> Dict:
+    """
+    Imports and top-level __main__ guard from a line scan.
+
+    Much cheaper than parsing; may pick up import-like lines inside
+    strings, which the refine phase corrects.
+
+    Returns:
+        Analysis in the analyze_source() shape, with no functions
+    """
+    text = content.decode("utf-8", errors="replace")
+    imports = set()
+
+    for match in _IMPORT_RE.finditer(text):
+        for alias in match.group(1).split(","):
+            name = alias.split(" as ")[0].strip().rstrip("\\").strip()
+            if name and all(part.isidentifier() for part in name.split(".")):
+                imports.add(name)
+
+    for match in _FROM_IMPORT_RE.finditer(text):
+        if match.group(1):
+            imports.add(match.group(1))
+
+    return {
+        "entry": _MAIN_GUARD_RE.search(text) is not None,
+        "imports": sorted(imports),
+        "functions": {}
+    }
+
+
+def _empty_analysis() -> Dict:
+    return {"entry": False, "imports": [], "functions": {}}
+
+
+def build_progressive_model(repo_path: Union[str, Source], deadline_seconds: float,
+                            on_snapshot: Optional[Callable[[Dict], None]] = None,
+                            snapshot_interval: float = DEFAULT_SNAPSHOT_INTERVAL,
+                            passes: Optional[List[str]] = None,
+                            limits: Optional["ResourceLimits"] = None,
+                            on_file: Optional[Callable[[str, int], None]] = None,
+                            on_progress: Optional[Callable[[Dict], None]] = None,
+                            progress_interval: float = 1.0) -> Dict:
+    """
+    Analyze as much of a repository as fits in a time budget.
+
+    Args:
+        repo_path: Directory path or analyzer.sources.Source
+        deadline_seconds: Time budget, measured from the call
+        on_snapshot: Called with an intermediate model after the map
+            phase and at most every snapshot_interval seconds while
+            refining (snapshot building counts against the budget)
+        snapshot_interval: Minimum seconds between refine snapshots
+        passes: Extra analysis passes, run on complete files only
+        limits, on_file, on_progress, progress_interval: As for
+            analyze_repo_files(), applied to the refine phase (progress
+            counts the files the map phase reached)
+
+    Returns:
+        Unified model with a per-file "status" and a "progress" summary.
+        When the budget suffices, file entries match build_unified_model()
+        apart from "status".
+    """
+    start = time.monotonic()
+    deadline = start + deadline_seconds
+    source = repo_path if isinstance(repo_path, Source) else LocalSource(repo_path)
+
+    files = source.list_files()
+    all_files = set(files)
+    available_modules = get_available_modules(dict.fromkeys(files))
+    results: Dict[str, Dict] = {}
+    status: Dict[str, str] = {}
+
+    def snapshot() -> Dict:
+        analysis_results = {
+            file_path: results.get(file_path) or _empty_analysis() for file_path in files
+        }
+        model = assemble_unified_model(analysis_results)
+        for file_path, file_data in model["files"].items():
+            file_data["status"] = status.get(file_path, UNANALYZED)
+        counts = {COMPLETE: 0, PARTIAL: 0, UNANALYZED: 0}
+        for file_path in files:
+            counts[status.get(file_path, UNANALYZED)] += 1
+        model["progress"] = {
+            **counts,
+            "total": len(files),
+            "elapsed_seconds": round(time.monotonic() - start, 3),
+            "deadline_seconds": deadline_seconds
+        }
+        return model
+
+    # Phase 1: imports-only map. The line scan sees every __main__ guard,
+    # so the entry point is known before the walk starts
+    for file_path in files:
+        if time.monotonic() >= deadline:
+            break
+        results[file_path] = scan_imports(source.read_bytes(file_path))
+        status[file_path] = PARTIAL
+
+    # Breadth-first from the entry point, then from each file it does not
+    # reach, in listing order
+    entry_point = identify_entry_point(results)
+    seeds = ([entry_point] if entry_point else []) + [f for f in files if f in results]
+    order: List[str] = []
+    queued = set()
+    # Estimated cost of assembling a model; paid again for the map snapshot
+    reserve = 0.0
+    assemblies = 2 if on_snapshot else 1
+
+    for seed in seeds:
+        if seed in queued:
+            continue
+        queued.add(seed)
+        frontier = deque([seed])
+        while frontier and time.monotonic() + reserve * assemblies < deadline:
+            file_path = frontier.popleft()
+            order.append(file_path)
+            resolve_start = time.monotonic()
+            deps = resolve_file_dependencies(file_path, results[file_path]["imports"],
+                                             available_modules, all_files)
+            reserve += time.monotonic() - resolve_start
+            for dep in deps:
+                if dep not in queued and dep in results:
+                    queued.add(dep)
+                    frontier.append(dep)
+        if frontier:
+            break
+
+    if on_snapshot:
+        on_snapshot(snapshot())
+
+    # Phase 2: full analysis in map order
+    isolated = None
+    if limits is not None:
+        from analyzer.isolation import IsolatedAnalyzer
+        isolated = IsolatedAnalyzer(limits)
+
+    tracker = None
+    if on_progress is not None:
+        from analyzer.progress import ProgressTracker
+        tracker = ProgressTracker(on_progress, len(order), interval=progress_interval)
+
+    last_snapshot = time.monotonic()
+    try:
+        for file_path in order:
+            if time.monotonic() + reserve >= deadline:
+                break
+            if tracker is not None:
+                tracker.file_started(file_path)
+            content = source.read_bytes(file_path)
+            if isolated is not None:
+                results[file_path] = isolated.analyze(content, file_path, passes)
+            else:
+                results[file_path] = analyze_source(content, file_path, passes)
+            status[file_path] = COMPLETE
+            if on_file is not None:
+                on_file(file_path, len(content))
+            if tracker is not None:
+                tracker.file_done(file_path, len(content))
+
+            if (on_snapshot and time.monotonic() - last_snapshot >= snapshot_interval
+                    and time.monotonic() + reserve * 2 < deadline):
+                on_snapshot(snapshot())
+                last_snapshot = time.monotonic()
+    finally:
+        if isolated is not None:
+            isolated.close()
+        if tracker is not None:
+            tracker.finish()
+
+    return snapshot()
@@ -0,0 +1,122 @@
+"""
+query.py - In-memory indexes over the unified model
+Answers structural questions about an analyzed repository (who calls
+what, who imports what, who depends on whom) with hash lookups instead
+of scanning analysis.json.
+
+All indexes are built in a single linear pass over the model; every
+query afterwards is a dictionary lookup.
+"""
+
+from typing import Callable, Dict, List
+
+
+class ModelIndex:
+    """
+    Hash indexes over a unified model.
+
+    Attributes:
+        functions: file -> function names it defines
+        definers: function name -> files that define it
+        importers: import name -> files that import it
+        callers: called name -> "file::function" entries that call it
+        deps: file -> files it depends on
+        rdeps: file -> files that depend on it
+    """
+
+    def __init__(self, model: Dict):
+        self.entry_point = model.get("entry_point")
+        self.functions: Dict[str, List[str]] = {}
+        self.definers: Dict[str, List[str]] = {}
+        self.importers: Dict[str, List[str]] = {}
+        self.callers: Dict[str, List[str]] = {}
+        self.deps: Dict[str, List[str]] = {}
+        self.rdeps: Dict[str, List[str]] = {}
+
+        for file_path, file_data in model.get("files", {}).items():
+            functions = file_data.get("functions", {})
+            self.functions[file_path] = list(functions)
+            self.deps[file_path] = file_data.get("depends_on", [])
+            self.rdeps.setdefault(file_path, [])
+
+            for import_name in file_data.get("imports", []):
+                self.importers.setdefault(import_name, []).append(file_path)
+
+            for dep_file in self.deps[file_path]:
+                self.rdeps.setdefault(dep_file, []).append(file_path)
+
+            for func_name, func_data in functions.items():
+                self.definers.setdefault(func_name, []).append(file_path)
+                caller = f"{file_path}::{func_name}"
+                for called in func_data.get("calls", []):
+                    self.callers.setdefault(called, []).append(caller)
+
+    def lookup(self, command: str, argument: str) -> List[str]:
+        """
+        Run one query.
+
+        Raises:
+            KeyError: Unknown command
+        """
+        if command not in QUERY_COMMANDS:
+            raise KeyError(command)
+        return QUERY_COMMANDS[command][0](self, argument)
+
+
+# command -> (lookup, help text)
+QUERY_COMMANDS: Dict[str, tuple] = {
+    "callers": (lambda index, name: index.callers.get(name, []),
+                "callers <function>   functions (file::function) that call it"),
+    "defines": (lambda index, name: index.definers.get(name, []),
+                "defines <function>   files that define a function with that name"),
+    "importers": (lambda index, name: index.importers.get(name, []),
+                  "importers <module>   files that import the module"),
+    "functions": (lambda index, path: index.functions.get(path, []),
+                  "functions <file>     functions defined in the file"),
+    "deps": (lambda index, path: index.deps.get(path, []),
+             "deps <file>          files the file depends on"),
+    "rdeps": (lambda index, path: index.rdeps.get(path, []),
+              "rdeps <file>         files that depend on the file"),
+}
+
+
+def query_help() -> str:
+    return "\n".join(help_text for _, help_text in QUERY_COMMANDS.values())
+
+
+def run_query_line(index: ModelIndex, line: str, emit: Callable[[str], None] = print) -> bool:
+    """
+    Parse and answer one query line ("<command> <argument>").
+
+    Results are passed to `emit` one per line; errors are reported the
+    same way.
+
+    Returns:
+        False if the line asked to quit, True otherwise
+    """
+    parts = line.strip().split(None, 1)
+    if not parts:
+        return True
+
+    command = parts[0].lower()
+    if command in ("quit", "exit"):
+        return False
+    if command == "help":
+        emit(query_help())
+        return True
+    if len(parts) < 2:
+        emit(f"Missing argument. Usage: {QUERY_COMMANDS[command][1]}" if command in QUERY_COMMANDS
+             else f"Unknown command: {command} (try 'help')")
+        return True
+
+    try:
+        results = index.lookup(command, parts[1].strip())
+    except KeyError:
+        emit(f"Unknown command: {command} (try 'help')")
+        return True
+
+    for result in results:
+        emit(result)
+    if not results:
+        emit("(no results)")
+    return True
@@ -0,0 +1,198 @@
+"""
+records.py - Compact in-memory representation of analysis results
+The dict-of-lists schema repeats the same strings (call names such as
+print, len, append; import names) hundreds of thousands of times and
+pays a dict per function. For large runs the analyzer keeps results in
+slotted records instead:
+
+- FunctionRecord / FileRecord use __slots__ (no per-instance dict)
+- every name is interned, so each distinct string exists once
+- identical name lists (calls, imports, depends_on) share one tuple
+
+Records convert to the unified-model dict schema only at the
+serialization boundary: CompactModel.write_json() streams one file entry
+at a time and produces exactly the JSON json.dump(build_unified_model())
+would, without ever holding the whole dict model in memory.
+
+FileRecord and FunctionRecord support the read-only .get()/[] access the
+dependency helpers use, so they can be passed to
+build_file_dependency_graph() and identify_entry_point() directly.
+"""
+
+import json
+import sys
+from typing import Any, Dict, IO, Iterable, Optional, Tuple
+
+from analyzer.fingerprint import build_directories, hash_file, hash_function
+
+
+class NamePool:
+    """Interns names and deduplicates name tuples for one analysis run."""
+
+    def __init__(self):
+        self._tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+    def name(self, value: str) -> str:
+        return sys.intern(value)
+
+    def names(self, values: Iterable[str]) -> Tuple[str, ...]:
+        key = tuple(sys.intern(value) for value in values)
+        return self._tuples.setdefault(key, key)
+
+
+class _RecordAccess:
+    """Dict-style read access to slots (file_data.get("imports") etc.)."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+
+class FunctionRecord(_RecordAccess):
+    __slots__ = ("name", "calls")
+
+    def __init__(self, name: str, calls: Tuple[str, ...]):
+        self.name = name
+        self.calls = calls
+
+    def to_dict(self, with_fingerprint: bool = True) -> Dict:
+        data = {"calls": list(self.calls)}
+        if with_fingerprint:
+            data["fingerprint"] = hash_function(self.name, self.calls)
+        return data
+
+
+class FileRecord(_RecordAccess):
+    __slots__ = ("entry", "imports", "functions", "depends_on", "fingerprint", "passes", "skipped")
+
+    def __init__(self, entry: bool, imports: Tuple[str, ...],
+                 functions: Tuple[FunctionRecord, ...],
+                 depends_on: Tuple[str, ...] = (),
+                 passes: Optional[Dict] = None,
+                 skipped: Optional[Dict] = None):
+        self.entry = entry
+        self.imports = imports
+        self.functions = functions
+        self.depends_on = depends_on
+        self.fingerprint: Optional[str] = None
+        self.passes = passes
+        self.skipped = skipped
+
+    @classmethod
+    def from_analysis(cls, file_data: Dict, pool: NamePool) -> "FileRecord":
+        """Compact one analyze_file()/analyze_source() result."""
+        return cls(
+            bool(file_data["entry"]),
+            pool.names(file_data["imports"]),
+            tuple(
+                FunctionRecord(pool.name(name), pool.names(func_data["calls"]))
+                for name, func_data in file_data["functions"].items()
+            ),
+            passes=file_data.get("passes"),
+            skipped=file_data.get("skipped")
+        )
+
+    def share(self) -> "FileRecord":
+        """Record for another path with the same content (analysis shared)."""
+        return FileRecord(self.entry, self.imports, self.functions,
+                          passes=self.passes, skipped=self.skipped)
+
+    def compute_fingerprint(self, file_path: str) -> str:
+        self.fingerprint = hash_file(
+            file_path, self.entry, self.imports, self.depends_on,
+            (hash_function(func.name, func.calls) for func in self.functions),
+            self.passes, self.skipped
+        )
+        return self.fingerprint
+
+    def to_dict(self, with_model_fields: bool = True) -> Dict:
+        """
+        Convert to the dict schema: the analyze_file() shape, or the
+        unified-model entry (with depends_on and fingerprints).
+        """
+        data = {
+            "entry": self.entry,
+            "imports": list(self.imports),
+            "functions": {
+                func.name: func.to_dict(with_model_fields) for func in self.functions
+            }
+        }
+        if with_model_fields:
+            data["depends_on"] = list(self.depends_on)
+        if self.passes is not None:
+            data["passes"] = self.passes
+        if self.skipped is not None:
+            data["skipped"] = self.skipped
+        if with_model_fields:
+            data["fingerprint"] = self.fingerprint
+        return data
+
+
+class CompactModel:
+    """
+    Unified model held as FileRecords.
+
+    Use to_dict() for the regular model, or write_json() to serialize
+    without materializing it.
+    """
+
+    __slots__ = ("entry_point", "fingerprint", "files", "directories")
+
+    def __init__(self, analysis_results: Dict[str, FileRecord], pool: Optional[NamePool] = None):
+        """
+        Assemble the model (dependencies, entry point, fingerprints) from
+        compact per-file results, like assemble_unified_model().
+        """
+        from analyzer.dependency import build_file_dependency_graph, identify_entry_point
+
+        pool = pool or NamePool()
+        dependency_graph = build_file_dependency_graph(analysis_results)
+        self.entry_point = identify_entry_point(analysis_results)
+        self.files = analysis_results
+
+        file_hashes = {}
+        for file_path, record in analysis_results.items():
+            record.depends_on = pool.names(dependency_graph.pop(file_path, []))
+            file_hashes[file_path] = record.compute_fingerprint(file_path)
+
+        self.fingerprint, self.directories = build_directories(file_hashes, self.entry_point)
+
+    def to_dict(self) -> Dict:
+        return {
+            "entry_point": self.entry_point,
+            "fingerprint": self.fingerprint,
+            "files": {file_path: record.to_dict() for file_path, record in self.files.items()},
+            "directories": self.directories
+        }
+
+    def write_json(self, f: IO[str], indent: int = 2) -> None:
+        """
+        Write the model as JSON, one file entry at a time.
+
+        The output is byte-identical to json.dump(self.to_dict(), f, indent=indent).
+        """
+        pad = " " * indent
+
+        def nested(value: Any, level: int) -> str:
+            return json.dumps(value, indent=indent).replace("\n", "\n" + pad * level)
+
+        f.write("{\n")
+        f.write(f'{pad}"entry_point": {json.dumps(self.entry_point)},\n')
+        f.write(f'{pad}"fingerprint": {json.dumps(self.fingerprint)},\n')
+        f.write(f'{pad}"files": ')
+        if self.files:
+            f.write("{")
+            separator = "\n"
+            for file_path, record in self.files.items():
+                f.write(f"{separator}{pad * 2}{json.dumps(file_path)}: {nested(record.to_dict(), 2)}")
+                separator = ",\n"
+            f.write(f"\n{pad}}}")
+        else:
+            f.write("{}")
+        f.write(f',\n{pad}"directories": {nested(self.directories, 1)}\n}}')
@@ -0,0 +1,191 @@
+"""
+shard.py - Shard-and-merge analysis across machines
+Splits analysis into a map step that analyzes one deterministic shard of
+the repository and a reduce step that merges the partial results into
+the unified model. Partials are plain JSON files, so shards can run on
+any batch cluster that shares storage.
+
+Files are assigned to shards by a hash of their relative path (not
+Python's salted hash()), so every machine agrees on the split without
+coordination. The reduce step builds the model with the same code as a
+single-node run, so the merged output is identical.
+
+Usage:
+    python -m analyzer.shard map <repo_path|archive> --shard <i>/<n> --output <partial.json>
+        [--rev <git_revision>] [--strip-components <n>] [--passes <a,b,...>]
+    python -m analyzer.shard reduce <partial.json>... --output <analysis.json>
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple, Union
+
+from analyzer.analyzer import analyze_repo_files, assemble_unified_model
+from analyzer.sources import Source, open_source
+
+PARTIAL_FORMAT = "code-sherpa-partial/1"
+
+
+def shard_of(file_path: str, shard_count: int) -> int:
+    """Shard index of a file: stable across machines and Python versions."""
+    digest = hashlib.blake2b(file_path.encode("utf-8", "surrogateescape"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shard_count
+
+
+def parse_shard_spec(spec: str) -> Tuple[int, int]:
+    """'3/16' -> (3, 16). Shard indices are zero-based."""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard spec (expected <index>/<count>): {spec}")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard index out of range: {spec}")
+    return index, count
+
+
+def run_map(repo_path: Union[str, Source], shard_index: int, shard_count: int,
+            output_file: Optional[str] = None, passes: Optional[List[str]] = None) -> Dict:
+    """
+    Map step: analyze the files of one shard.
+
+    Args:
+        repo_path: Directory path or analyzer.sources.Source
+        shard_index: Zero-based shard index
+        shard_count: Total number of shards
+        output_file: If given, the partial is written there (atomically,
+            so a reducer never sees a half-written file)
+        passes: Extra analysis passes (analyzer/passes.py); use the same
+            list on every shard
+
+    Returns:
+        {"format", "shard", "shards", "files": {path: analysis}}
+    """
+    files = analyze_repo_files(
+        repo_path,
+        select=lambda file_path: shard_of(file_path, shard_count) == shard_index,
+        passes=passes
+    )
+    partial = {
+        "format": PARTIAL_FORMAT,
+        "shard": shard_index,
+        "shards": shard_count,
+        "files": files
+    }
+
+    if output_file:
+        tmp_path = output_file + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(partial, f)
+        os.replace(tmp_path, output_file)
+
+    return partial
+
+
+def merge_partials(partials: List[Dict]) -> Dict[str, Dict]:
+    """
+    Union the per-file results of a complete set of partials.
+
+    Raises:
+        ValueError: Partials disagree on the shard count, or a shard is
+            missing or duplicated
+    """
+    if not partials:
+        raise ValueError("No partial results to merge")
+
+    shard_count = partials[0].get("shards")
+    seen = set()
+    for partial in partials:
+        if partial.get("format") != PARTIAL_FORMAT:
+            raise ValueError(f"Not a partial result: format {partial.get('format')!r}")
+        if partial["shards"] != shard_count:
+            raise ValueError(f"Shard count mismatch: {partial['shards']} != {shard_count}")
+        if partial["shard"] in seen:
+            raise ValueError(f"Duplicate shard: {partial['shard']}")
+        seen.add(partial["shard"])
+
+    missing = sorted(set(range(shard_count)) - seen)
+    if missing:
+        raise ValueError(f"Missing shards: {missing}")
+
+    analysis_results = {}
+    for partial in partials:
+        analysis_results.update(partial["files"])
+
+    return {file_path: analysis_results[file_path] for file_path in sorted(analysis_results)}
+
+
+def run_reduce(partial_files: List[str], output_file: Optional[str] = None) -> Dict:
+    """
+    Reduce step: merge partial files into the unified model.
+
+    The result is identical to build_unified_model() on the whole
+    repository.
+    """
+    partials = []
+    for partial_file in partial_files:
+        with open(partial_file, "r", encoding="utf-8") as f:
+            partials.append(json.load(f))
+
+    unified = assemble_unified_model(merge_partials(partials))
+
+    if output_file:
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(unified, f, indent=2)
+
+    return unified
+
+
+def main():
+    import sys
+
+    usage = (
+        "Usage: python -m analyzer.shard map <repo_path|archive> --shard <i>/<n> --output <partial.json> "
+        "[--rev <git_revision>] [--strip-components <n>] [--passes <a,b,...>]\n"
+        "       python -m analyzer.shard reduce <partial.json>... --output <analysis.json>"
+    )
+    if len(sys.argv) < 3 or sys.argv[1] not in ("map", "reduce"):
+        print(usage, file=sys.stderr)
+        sys.exit(1)
+
+    def option(name, default=None):
+        if name in sys.argv:
+            idx = sys.argv.index(name)
+            if idx + 1 < len(sys.argv):
+                return sys.argv[idx + 1]
+        return default
+
+    output_file = option("--output")
+    if not output_file:
+        print(usage, file=sys.stderr)
+        sys.exit(1)
+
+    if sys.argv[1] == "map":
+        shard_spec = option("--shard")
+        if not shard_spec:
+            print(usage, file=sys.stderr)
+            sys.exit(1)
+        shard_index, shard_count = parse_shard_spec(shard_spec)
+        with open_source(sys.argv[2], option("--rev"), int(option("--strip-components", 0))) as source:
+            passes = option("--passes")
+            partial = run_map(source, shard_index, shard_count, output_file,
+                              passes.split(",") if passes else None)
+        print(f"Shard {shard_index}/{shard_count}: {len(partial['files'])} files -> {output_file}",
+              file=sys.stderr)
+    else:
+        partial_files = []
+        skip_next = False
+        for arg in sys.argv[2:]:
+            if skip_next:
+                skip_next = False
+            elif arg == "--output":
+                skip_next = True
+            else:
+                partial_files.append(arg)
+        unified = run_reduce(partial_files, output_file)
+        print(f"Merged {len(partial_files)} partials: {len(unified['files'])} files -> {output_file}",
+              file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""
+sources.py - Pluggable source backends for CODE_Sherpa
+Lets the analyzer read Python files from places other than a working
+tree, without checking out or extracting anything to disk.
+
+Backends:
+- LocalSource:       a directory on disk, read ahead by a small thread pool
+- GitRevisionSource: any revision of a git repository, read through one
+                     long-lived `git cat-file --batch` process
+- ArchiveSource:     .tar / .tar.gz / .tgz / .zip archives, read member
+                     by member
+
+Every backend applies the FileTraverser rules (excluded directories,
+hidden files, .py only), so all of them select the same files a
+directory traversal of the same tree would.
+"""
+
+import os
+import subprocess
+import tarfile
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import IO, Callable, Iterator, List, Optional, Tuple
+
+from analyzer.parser import FileTraverser, get_python_files
+
+ARCHIVE_SUFFIXES = (".tar.gz", ".tgz", ".tar", ".zip")
+
+# LocalSource prefetching: files read ahead of the parser, and I/O threads
+DEFAULT_READ_AHEAD = 64
+DEFAULT_IO_THREADS = 8
+
+
+class Source:
+    """
+    A tree of Python files, addressed by forward-slash relative paths.
+
+    Subclasses implement list_files() and read_bytes(); iter_files() may be
+    overridden when reading in listing order is cheaper than random access.
+    Sources are context managers so backends holding a process or file
+    handle release it deterministically.
+    """
+
+    name: str = ""
+
+    def list_files(self) -> List[str]:
+        """Sorted relative paths of all Python files in the source."""
+        raise NotImplementedError
+
+    def read_bytes(self, relative_path: str) -> bytes:
+        """Raw content of one file."""
+        raise NotImplementedError
+
+    def count_files(self, select: Optional[Callable[[str], bool]] = None) -> Optional[int]:
+        """
+        Number of files iter_files(select) will yield, or None when
+        counting would cost an extra pass over the source.
+        """
+        return sum(1 for relative_path in self.list_files() if select is None or select(relative_path))
+
+    def iter_files(self, select: Optional[Callable[[str], bool]] = None) -> Iterator[Tuple[str, bytes]]:
+        """
+        Yield (relative_path, content) for every Python file.
+
+        Args:
+            select: Optional predicate on the relative path; files it
+                rejects are never read
+        """
+        for relative_path in self.list_files():
+            if select is None or select(relative_path):
+                yield relative_path, self.read_bytes(relative_path)
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "Source":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class LocalSource(Source):
+    """
+    A directory on disk.
+
+    iter_files() reads ahead: a small thread pool fetches up to
+    `read_ahead` files beyond the one the caller is parsing, so on
+    high-latency filesystems (NFS) waiting for I/O overlaps with CPU work.
+    The window bounds memory, and files are still yielded in listing
+    order. read_ahead=0 reads one file at a time.
+    """
+
+    def __init__(self, root_path: str, read_ahead: int = DEFAULT_READ_AHEAD,
+                 io_threads: int = DEFAULT_IO_THREADS):
+        self.root_path = Path(root_path)
+        self.name = str(root_path)
+        self.read_ahead = read_ahead
+        self.io_threads = io_threads
+        self._files: Optional[List[str]] = None
+
+    def list_files(self) -> List[str]:
+        # Traversed once per source, so counting before iterating is free
+        if self._files is None:
+            self._files = get_python_files(str(self.root_path))
+        return self._files
+
+    def read_bytes(self, relative_path: str) -> bytes:
+        return (self.root_path / relative_path).read_bytes()
+
+    def iter_files(self, select: Optional[Callable[[str], bool]] = None) -> Iterator[Tuple[str, bytes]]:
+        paths = [p for p in self.list_files() if select is None or select(p)]
+        if self.read_ahead <= 0 or self.io_threads <= 0 or len(paths) < 2:
+            for relative_path in paths:
+                yield relative_path, self.read_bytes(relative_path)
+            return
+
+        remaining = iter(paths)
+        with ThreadPoolExecutor(max_workers=self.io_threads, thread_name_prefix="source-read") as executor:
+            pending = deque(
+                (relative_path, executor.submit(self.read_bytes, relative_path))
+                for relative_path in islice(remaining, self.read_ahead)
+            )
+            try:
+                while pending:
+                    relative_path, future = pending.popleft()
+                    next_path = next(remaining, None)
+                    if next_path is not None:
+                        pending.append((next_path, executor.submit(self.read_bytes, next_path)))
+                    # Read errors surface here, in order, as they would sequentially
+                    yield relative_path, future.result()
+            finally:
+                # Consumer stopped early: drop reads that have not started
+                for _, future in pending:
+                    future.cancel()
+
+
+class GitRevisionSource(Source):
+    """
+    A revision of a git repository, read straight from the object store.
+
+    The tree is listed once with `git ls-tree`; blobs are then streamed
+    through a single `git cat-file --batch` process that stays alive for
+    the lifetime of the source, instead of one git process per file.
+    """
+
+    def __init__(self, repo_path: str, revision: str = "HEAD"):
+        self.repo_path = str(repo_path)
+        self.revision = revision
+        self.name = f"{repo_path}@{revision}"
+        self.commit = self._git("rev-parse", "--verify", f"{revision}^{{commit}}").strip()
+        self._blobs: Optional[dict] = None
+        self._process: Optional[subprocess.Popen] = None
+
+    def _git(self, *args: str) -> str:
+        result = subprocess.run(
+            ["git", "-C", self.repo_path, *args],
+            capture_output=True
+        )
+        if result.returncode != 0:
+            raise ValueError(
+                f"git {args[0]} failed: {result.stderr.decode('utf-8', 'replace').strip()}"
+            )
+        return result.stdout.decode("utf-8", "surrogateescape")
+
+    def _blob_index(self) -> dict:
+        """Map relative path -> blob id for every Python file in the revision."""
+        if self._blobs is None:
+            blobs = {}
+            listing = self._git("ls-tree", "-r", "-z", "--full-tree", self.commit)
+            for record in listing.split("\0"):
+                if not record:
+                    continue
+                meta, relative_path = record.split("\t", 1)
+                mode, object_type, object_id = meta.split(" ")
+                # Skip symlinks (120000) and submodules (commit entries)
+                if object_type != "blob" or mode == "120000":
+                    continue
+                if FileTraverser.is_included_path(relative_path):
+                    blobs[relative_path] = object_id
+            self._blobs = blobs
+        return self._blobs
+
+    def _cat_file(self) -> subprocess.Popen:
+        if self._process is None:
+            self._process = subprocess.Popen(
+                ["git", "-C", self.repo_path, "cat-file", "--batch"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE
+            )
+        return self._process
+
+    def list_files(self) -> List[str]:
+        return sorted(self._blob_index())
+
+    def read_bytes(self, relative_path: str) -> bytes:
+        # Before the tree has been listed, address the blob as <commit>:<path>
+        # so reading a handful of files never lists the whole tree
+        if self._blobs is None:
+            object_id = f"{self.commit}:{relative_path}"
+        else:
+            object_id = self._blobs[relative_path]
+        process = self._cat_file()
+        process.stdin.write(object_id.encode("utf-8", "surrogateescape") + b"\n")
+        process.stdin.flush()
+
+        # Response: "<id> <type> <size>\n<content>\n" or "<id> missing\n"
+        header = process.stdout.readline().split()
+        if len(header) != 3:
+            raise ValueError(f"git cat-file could not read {relative_path} ({object_id})")
+        content = process.stdout.read(int(header[2]))
+        process.stdout.read(1)
+        return content
+
+    def close(self) -> None:
+        if self._process is not None:
+            self._process.stdin.close()
+            self._process.wait()
+            self._process.stdout.close()
+            self._process = None
+
+
+class ArchiveSource(Source):
+    """
+    A .tar, .tar.gz/.tgz or .zip archive.
+
+    iter_files() reads tar archives as a single forward stream (mode
+    "r|*"), so compressed tarballs are decompressed exactly once and never
+    extracted. Zip archives are read member by member from the central
+    directory.
+
+    Args:
+        archive_path: Path to the archive
+        strip_components: Leading path components to drop from member
+            names, like `tar --strip-components` (release tarballs usually
+            wrap everything in a "project-1.0/" directory)
+    """
+
+    def __init__(self, archive_path: str, strip_components: int = 0):
+        self.archive_path = str(archive_path)
+        self.strip_components = strip_components
+        self.name = self.archive_path
+        self.is_zip = zipfile.is_zipfile(self.archive_path)
+        if not self.is_zip and not tarfile.is_tarfile(self.archive_path):
+            raise ValueError(f"Not a tar or zip archive: {archive_path}")
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._tar: Optional[tarfile.TarFile] = None
+        self._members: Optional[dict] = None
+
+    def _relative_path(self, member_name: str) -> Optional[str]:
+        """Member name -> relative path, or None if it is not analyzed."""
+        parts = [p for p in member_name.split("/") if p and p != "."]
+        parts = parts[self.strip_components:]
+        if not parts:
+            return None
+        relative_path = "/".join(parts)
+        return relative_path if FileTraverser.is_included_path(relative_path) else None
+
+    def _zip_file(self) -> zipfile.ZipFile:
+        if self._zip is None:
+            self._zip = zipfile.ZipFile(self.archive_path)
+        return self._zip
+
+    def _member_index(self) -> dict:
+        """Map relative path -> member name (zip) or TarInfo (tar)."""
+        if self._members is None:
+            members = {}
+            if self.is_zip:
+                for info in self._zip_file().infolist():
+                    relative_path = None if info.is_dir() else self._relative_path(info.filename)
+                    if relative_path:
+                        members[relative_path] = info.filename
+            else:
+                # Random access needs a seekable archive; iter_files() does not
+                self._tar = tarfile.open(self.archive_path, "r:*")
+                for info in self._tar:
+                    relative_path = self._relative_path(info.name) if info.isfile() else None
+                    if relative_path:
+                        members[relative_path] = info
+            self._members = members
+        return self._members
+
+    def list_files(self) -> List[str]:
+        return sorted(self._member_index())
+
+    def count_files(self, select: Optional[Callable[[str], bool]] = None) -> Optional[int]:
+        # Tar archives are streamed once; indexing them first would read them twice
+        return super().count_files(select) if self.is_zip else None
+
+    def read_bytes(self, relative_path: str) -> bytes:
+        member = self._member_index()[relative_path]
+        if self.is_zip:
+            return self._zip_file().read(member)
+        with self._tar.extractfile(member) as f:
+            return f.read()
+
+    def iter_files(self, select: Optional[Callable[[str], bool]] = None) -> Iterator[Tuple[str, bytes]]:
+        """Yield files in archive order (callers sort if they need to)."""
+        if self.is_zip:
+            yield from super().iter_files(select)
+            return
+
+        with tarfile.open(self.archive_path, "r|*") as archive:
+            for info in archive:
+                relative_path = self._relative_path(info.name) if info.isfile() else None
+                if not relative_path or (select is not None and not select(relative_path)):
+                    continue
+                stream: Optional[IO[bytes]] = archive.extractfile(info)
+                if stream is not None:
+                    yield relative_path, stream.read()
+
+    def close(self) -> None:
+        for handle in (self._zip, self._tar):
+            if handle is not None:
+                handle.close()
+        self._zip = self._tar = None
+
+
+def is_archive(path: str) -> bool:
+    """True if path names an archive file supported by ArchiveSource."""
+    return os.path.isfile(path) and path.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def open_source(location: str, revision: Optional[str] = None,
+                strip_components: int = 0) -> Source:
+    """
+    Pick a backend for a location.
+
+    Args:
+        location: Directory, git repository, or archive file
+        revision: If given, read this git revision of the repository at
+            `location` instead of its working tree
+        strip_components: Leading path components to drop (archives only)
+
+    Returns:
+        A Source (use it as a context manager to release resources)
+    """
+    if revision:
+        return GitRevisionSource(location, revision)
+    if is_archive(location):
+        return ArchiveSource(location, strip_components)
+    return LocalSource(location)
@@ -16,12 +16,17 @@ import sys
 import os
 import json
 import subprocess
+import time
+from contextlib import contextmanager, nullcontext
 from typing import Tuple
 
 # Add project root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from analyzer.analyzer import build_unified_model
+from analyzer.checkpoint import AnalysisJournal
+from analyzer.query import ModelIndex, query_help, run_query_line
+from analyzer.sources import open_source
 from enrich.enrich import run_enrichment_generation
 
 
@@ -29,14 +34,74 @@ from enrich.enrich import run_enrichment_generation
 # Pipeline Step Implementations
 # ============================================================
 
-def run_analyze(repo_path: str, output_file: str) -> None:
-    """Pipeline step 1: Static analysis."""
+def run_analyze(repo_path: str, output_file: str, revision: str = None,
+                strip_components: int = 0, passes: list = None,
+                deadline: float = None, limits=None, on_file=None,
+                on_progress=None, progress_interval: float = 1.0,
+                resume: bool = False) -> None:
+    """
+    Pipeline step 1: Static analysis.
+    
+    repo_path may be a directory, a git repository (with `revision`), or a
+    .tar.gz/.tgz/.tar/.zip archive; nothing is checked out or extracted.
+    `passes` adds extra per-file analysis passes (analyzer/passes.py).
+    With `deadline` (seconds) analysis is progressive: output_file is
+    rewritten with each intermediate snapshot, so it always holds the
+    best model so far. `limits` (analyzer.isolation.ResourceLimits)
+    analyzes files in a worker process under size/time/memory guards.
+    `on_file` is called after each analyzed file (path, size);
+    `on_progress` receives progress events (analyzer/progress.py).
+    
+    Completed files are journaled to <output_file>.journal while the run
+    is in progress (analyzer/checkpoint.py); with `resume`, a journal left
+    by an interrupted run is reused so only the remaining files are
+    analyzed. The journal is removed once output_file is written. Deadline
+    runs are not journaled, so `resume` cannot be combined with `deadline`.
+    """
     print("Running static analysis...")
-    analysis_result = build_unified_model(repo_path)
+    if deadline is not None:
+        if resume:
+            raise ValueError("resume is not supported with deadline")
+        
+        def write_snapshot(model):
+            tmp_path = output_file + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(model, f, indent=2)
+            os.replace(tmp_path, output_file)
+            progress = model["progress"]
+            print(f"  {progress['complete']} complete, {progress['partial']} partial, "
+                  f"{progress['unanalyzed']} unanalyzed ({progress['elapsed_seconds']}s)")
+        
+        with open_source(repo_path, revision, strip_components) as source:
+            write_snapshot(build_unified_model(source, passes=passes, deadline_seconds=deadline,
+                                               on_snapshot=write_snapshot, limits=limits, on_file=on_file,
+                                               on_progress=on_progress, progress_interval=progress_interval))
+        print("Analysis completed (deadline)")
+        return
     
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(analysis_result, f, indent=2)
+    stats = {}
+    journal_file = output_file + ".journal"
+    with open_source(repo_path, revision, strip_components) as source, \
+            AnalysisJournal(journal_file, passes, resume, limits) as journal:
+        analysis_result = build_unified_model(source, compact=True, passes=passes, stats=stats,
+                                              limits=limits, on_file=on_file, on_progress=on_progress,
+                                              progress_interval=progress_interval, journal=journal)
+    
+    # Streams the compact model; same JSON as json.dump(..., indent=2)
+    tmp_path = output_file + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        analysis_result.write_json(f)
+    os.replace(tmp_path, output_file)
+    os.remove(journal_file)
     
+    if stats["resumed"]:
+        print(f"  {stats['resumed']} files resumed from {journal_file}")
+    duplicates = stats["files"] - stats["unique"]
+    dedup_ratio = duplicates / stats["files"] if stats["files"] else 0.0
+    print(f"  {stats['files']} files, {stats['unique']} unique "
+          f"({duplicates} duplicates reused, {dedup_ratio:.1%} dedup)")
+    if stats["skipped"]:
+        print(f"  {stats['skipped']} files not analyzed (see \"skipped\" in {output_file})")
     print("Analysis completed")
 
 
@@ -89,7 +154,11 @@ def run_enrich(input_file: str, output_file: str) -> None:
 # Pipeline Orchestration
 # ============================================================
 
-def run_pipeline(repo_path: str, output_dir: str) -> None:
+def run_pipeline(repo_path: str, output_dir: str, revision: str = None,
+                 strip_components: int = 0, passes: list = None,
+                 deadline: float = None, limits=None, profiler=None,
+                 on_progress=None, progress_interval: float = 1.0,
+                 resume: bool = False) -> None:
     """
     Execute the CODE_Sherpa pipeline.
     
@@ -98,6 +167,10 @@ def run_pipeline(repo_path: str, output_dir: str) -> None:
         2. Tour -> learning_order.json (uses analysis.json)
         3. Flowchart -> flowchart.md (uses analysis.json)
         4. Enrich -> annotations.json (uses analysis.json, Optional)
+    
+    With a cli.memprofile.MemoryProfiler, each step is measured as a stage.
+    With on_progress, each step emits stage_start/stage_done events and
+    analysis reports per-file progress (analyzer/progress.py).
     """
     # Define output files
     analysis_file = os.path.join(output_dir, "analysis.json")
@@ -105,20 +178,85 @@ def run_pipeline(repo_path: str, output_dir: str) -> None:
     flowchart_file = os.path.join(output_dir, "flowchart.md")
     annotations_file = os.path.join(output_dir, "annotations.json")
     
+    @contextmanager
+    def stage(name):
+        if on_progress:
+            on_progress({"event": "stage_start", "stage": name, "elapsed_seconds": 0.0})
+        start = time.monotonic()
+        with profiler.stage(name) if profiler else nullcontext():
+            yield
+        if on_progress:
+            on_progress({"event": "stage_done", "stage": name,
+                         "elapsed_seconds": round(time.monotonic() - start, 3)})
+    
     # Step 1: Analyze
-    run_analyze(repo_path, analysis_file)
+    with stage("analyze"):
+        run_analyze(repo_path, analysis_file, revision, strip_components, passes, deadline, limits,
+                    on_file=profiler.record_file if profiler else None,
+                    on_progress=on_progress, progress_interval=progress_interval, resume=resume)
     
     # Step 2: Tour (Independent of enrichment)
-    run_tour(analysis_file, learning_order_file)
+    with stage("tour"):
+        run_tour(analysis_file, learning_order_file)
     
     # Step 3: Flowchart (Independent of enrichment)
-    run_flowchart(analysis_file, flowchart_file)
+    with stage("flowchart"):
+        run_flowchart(analysis_file, flowchart_file)
     
     # Step 4: Enrich (Last & Optional sidecar)
-    run_enrich(analysis_file, annotations_file)
+    with stage("enrich"):
+        run_enrich(analysis_file, annotations_file)
     
     print("\nPipeline completed successfully")
 
+# ============================================================
+# Query
+# ============================================================
+
+def run_query(model_file: str, query_args: list) -> None:
+    """
+    Answer lookups against an analysis.json.
+    
+    Modes:
+        - One query from the command line: query <model> callers foo
+        - Batch: one query per line on stdin (when stdin is not a terminal)
+        - REPL: interactive prompt otherwise
+    """
+    start = time.perf_counter()
+    with open(model_file, "r", encoding="utf-8") as f:
+        model = json.load(f)
+    index = ModelIndex(model)
+    print(
+        f"Indexed {len(index.functions)} files in {time.perf_counter() - start:.2f}s",
+        file=sys.stderr
+    )
+    
+    if query_args:
+        run_query_line(index, " ".join(query_args))
+        return
+    
+    if not sys.stdin.isatty():
+        for line in sys.stdin:
+            # Echo each query so batch output can be split per query
+            if line.strip():
+                print(f"> {line.strip()}")
+            if not run_query_line(index, line):
+                break
+        return
+    
+    print(query_help() + "\nquit", file=sys.stderr)
+    while True:
+        try:
+            line = input("query> ")
+        except EOFError:
+            break
+        start = time.perf_counter()
+        if not run_query_line(index, line):
+            break
+        if line.strip():
+            print(f"({(time.perf_counter() - start) * 1000:.3f} ms)", file=sys.stderr)
+
+
 # ============================================================
 # CLI Entry Point
 # ============================================================
@@ -126,12 +264,51 @@ def run_pipeline(repo_path: str, output_dir: str) -> None:
 def main():
     """CLI entry point. Validates input and delegates to pipeline."""
     if len(sys.argv) < 3:
-        print("Usage: python cli/main.py analyze <repo_path>")
+        print("Usage: python cli/main.py analyze <repo_path|archive> [--rev <git_revision>] [--strip-components <n>] [--passes <a,b,...>] [--deadline <seconds>]")
+        print("           [--max-file-size <bytes>] [--file-timeout <seconds>] [--max-memory <MB>]")
+        print("           [--memory-report <report.json>] [--progress auto|tty|json|off]")
+        print("           [--resume]")
+        print("       python cli/main.py query <analysis.json> [<command> <argument>]")
         sys.exit(1)
     
     command = sys.argv[1]
     repo_path = sys.argv[2]
     
+    if command == "query":
+        if not os.path.exists(repo_path):
+            print(f"Error: Model file not found: {repo_path}")
+            sys.exit(1)
+        run_query(repo_path, sys.argv[3:])
+        return
+    
+    def option(name, default=None):
+        if name in sys.argv:
+            idx = sys.argv.index(name)
+            if idx + 1 < len(sys.argv):
+                return sys.argv[idx + 1]
+        return default
+    
+    revision = option("--rev")
+    strip_components = int(option("--strip-components", 0))
+    passes = option("--passes")
+    passes = passes.split(",") if passes else None
+    deadline = option("--deadline")
+    deadline = float(deadline) if deadline else None
+    if deadline is not None and "--resume" in sys.argv:
+        print("Error: --resume cannot be combined with --deadline (deadline runs are not journaled)")
+        sys.exit(1)
+    
+    limits = None
+    if any(name in sys.argv for name in ("--max-file-size", "--file-timeout", "--max-memory")):
+        from analyzer.isolation import ResourceLimits
+        limits = ResourceLimits()
+        if option("--max-file-size"):
+            limits.max_bytes = int(option("--max-file-size"))
+        if option("--file-timeout"):
+            limits.timeout = float(option("--file-timeout"))
+        if option("--max-memory"):
+            limits.max_memory = int(option("--max-memory")) * 1024 * 1024
+    
     if command != "analyze":
         print(f"Unknown command: {command}")
         sys.exit(1)
@@ -144,14 +321,39 @@ def main():
     output_dir = "demo"
     os.makedirs(output_dir, exist_ok=True)
     
+    memory_report = option("--memory-report")
+    profiler = None
+    if memory_report:
+        from cli.memprofile import MemoryProfiler
+        profiler = MemoryProfiler()
+    
+    # Progress goes to stderr: a refreshed line on a terminal, JSON lines in logs
+    progress_mode = option("--progress", "auto")
+    if progress_mode not in ("auto", "tty", "json", "off"):
+        print(f"Error: --progress must be auto, tty, json or off, not {progress_mode!r}")
+        sys.exit(1)
+    on_progress = None
+    progress_interval = 1.0
+    if progress_mode != "off":
+        from analyzer.progress import LOG_INTERVAL, TTY_INTERVAL, console_reporter
+        is_tty = sys.stderr.isatty() if progress_mode == "auto" else progress_mode == "tty"
+        on_progress = console_reporter(sys.stderr, is_tty)
+        progress_interval = TTY_INTERVAL if is_tty else LOG_INTERVAL
+    
     # Execute pipeline
     try:
-        run_pipeline(repo_path, output_dir)
+        run_pipeline(repo_path, output_dir, revision, strip_components, passes, deadline, limits, profiler,
+                     on_progress, progress_interval, "--resume" in sys.argv)
     except Exception as e:
         print(f"\nPipeline failed: {e}")
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        # Written even when a stage fails: the stages so far are still useful
+        if profiler:
+            profiler.write(memory_report)
+            print(f"Memory report: {memory_report}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,233 @@
+"""
+memprofile.py - Memory accounting for pipeline stages
+Optional profiling mode for cli/main.py (--memory-report <file>). For
+every pipeline stage it records:
+
+- peak RSS of the CLI process during the stage (Linux resets the peak
+  per stage through /proc/self/clear_refs; elsewhere the value is the
+  process high-water mark so far)
+- peak RSS of stage subprocesses (tour, flowchart): the largest child
+  that has exited so far, so it only attributes a stage that raised it
+- tracemalloc: peak traced memory and the top allocation sites still
+  live at the end of the stage, grouped by file:line
+
+During analysis it also records the files whose ASTs were largest, as
+the traced memory peak while each file was parsed and visited (not
+measured when files are analyzed in isolated workers).
+
+The report is JSON with a stable layout; compare two with
+`python -m cli.memprofile <old.json> <new.json>`.
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+REPORT_FORMAT = "code-sherpa-memory/1"
+TOP_ALLOCATIONS = 10
+TOP_FILES = 20
+TRACEMALLOC_FRAMES = 1
+MIB = 1024 * 1024
+
+
+def _status_bytes(field: str) -> Optional[int]:
+    """A kB field of /proc/self/status (Linux), in bytes."""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _maxrss_bytes(who) -> Optional[int]:
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(who).ru_maxrss
+    # kB on Linux, bytes on macOS
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def current_rss() -> Optional[int]:
+    return _status_bytes("VmRSS")
+
+
+def peak_rss() -> Optional[int]:
+    peak = _status_bytes("VmHWM")
+    if peak is None and resource is not None:
+        peak = _maxrss_bytes(resource.RUSAGE_SELF)
+    return peak
+
+
+def _reset_peak_rss() -> bool:
+    """Restart the VmHWM high-water mark (Linux 4.0+)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class MemoryProfiler:
+    """
+    Collects the memory report for one pipeline run.
+
+    Usage:
+        profiler = MemoryProfiler()
+        with profiler.stage("analyze"):
+            build_unified_model(repo, on_file=profiler.record_file)
+        profiler.write("memory.json")
+    """
+
+    def __init__(self, top_allocations: int = TOP_ALLOCATIONS, top_files: int = TOP_FILES):
+        self.top_allocations = top_allocations
+        self.top_files = top_files
+        self.stages: List[Dict] = []
+        self.file_peaks: Dict[str, Dict] = {}
+        self._file_baseline = 0
+        # record_file() resets the tracemalloc peak; keep the stage's here
+        self._stage_traced_peak = 0
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Measure everything run inside the block as one stage."""
+        peak_reset = _reset_peak_rss()
+        rss_before = current_rss()
+        children_before = _maxrss_bytes(resource.RUSAGE_CHILDREN) if resource else None
+        start_snapshot = self._snapshot()
+        tracemalloc.reset_peak()
+        self._file_baseline = tracemalloc.get_traced_memory()[0]
+        self._stage_traced_peak = 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            traced_current, traced_peak = tracemalloc.get_traced_memory()
+            traced_peak = max(traced_peak, self._stage_traced_peak)
+            growth = self._snapshot().compare_to(start_snapshot, "lineno")
+            growth = [stat for stat in growth if stat.size_diff > 0]
+            growth.sort(key=lambda stat: stat.size_diff, reverse=True)
+            children_after = _maxrss_bytes(resource.RUSAGE_CHILDREN) if resource else None
+
+            self.stages.append({
+                "name": name,
+                "seconds": round(seconds, 3),
+                "rss_before_bytes": rss_before,
+                "rss_after_bytes": current_rss(),
+                "peak_rss_bytes": peak_rss(),
+                "peak_rss_is_per_stage": peak_reset,
+                "children_peak_rss_bytes": (
+                    children_after if children_after and children_after != children_before else None
+                ),
+                "traced_peak_bytes": traced_peak,
+                "traced_retained_bytes": traced_current,
+                "top_allocations": [
+                    {
+                        "site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                        "size_bytes": stat.size_diff,
+                        "count": stat.count_diff
+                    }
+                    for stat in growth[:self.top_allocations]
+                ]
+            })
+
+    def record_file(self, file_path: str, size: int) -> None:
+        """on_file hook for analyze_repo_files(): attribute the traced peak
+        since the previous file to this one."""
+        current, peak = tracemalloc.get_traced_memory()
+        self._stage_traced_peak = max(self._stage_traced_peak, peak)
+        self.file_peaks[file_path] = {"size_bytes": size, "ast_peak_bytes": max(peak - self._file_baseline, 0)}
+        tracemalloc.reset_peak()
+        self._file_baseline = current
+
+    def report(self) -> Dict:
+        largest = sorted(self.file_peaks.items(), key=lambda item: item[1]["ast_peak_bytes"], reverse=True)
+        return {
+            "format": REPORT_FORMAT,
+            "python": sys.version.split()[0],
+            "platform": sys.platform,
+            "stages": self.stages,
+            "largest_asts": [
+                {"path": file_path, **data} for file_path, data in largest[:self.top_files]
+            ]
+        }
+
+    def write(self, output_file: str) -> None:
+        tmp_path = output_file + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        os.replace(tmp_path, output_file)
+
+
+def compare_reports(old: Dict, new: Dict) -> List[Dict]:
+    """
+    Per-stage differences between two reports.
+
+    Returns:
+        [{"name", "<metric>": {"old", "new", "delta"}}] for stages in
+        either report, in the new report's order
+    """
+    metrics = ("peak_rss_bytes", "children_peak_rss_bytes", "traced_peak_bytes", "traced_retained_bytes")
+    old_stages = {stage["name"]: stage for stage in old.get("stages", [])}
+    new_stages = {stage["name"]: stage for stage in new.get("stages", [])}
+    names = list(new_stages) + [name for name in old_stages if name not in new_stages]
+
+    rows = []
+    for name in names:
+        row = {"name": name}
+        for metric in metrics:
+            before = old_stages.get(name, {}).get(metric)
+            after = new_stages.get(name, {}).get(metric)
+            row[metric] = {
+                "old": before,
+                "new": after,
+                "delta": after - before if before is not None and after is not None else None
+            }
+        rows.append(row)
+    return rows
+
+
+def main():
+    if len(sys.argv) != 3:
+        print("Usage: python -m cli.memprofile <old_report.json> <new_report.json>", file=sys.stderr)
+        sys.exit(1)
+
+    reports = []
+    for path in sys.argv[1:]:
+        with open(path, "r", encoding="utf-8") as f:
+            reports.append(json.load(f))
+
+    def mib(value, sign=""):
+        return "-" if value is None else f"{value / MIB:{sign}.1f}"
+
+    for row in compare_reports(*reports):
+        print(row["name"])
+        for metric, values in row.items():
+            if metric != "name":
+                print(f"  {metric:<26} {mib(values['old']):>9} -> {mib(values['new']):>9} MiB"
+                      f"  ({mib(values['delta'], '+')})")
+
+
+if __name__ == "__main__":
+    main()
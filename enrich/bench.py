@@ -0,0 +1,306 @@
+"""
+bench.py - Offline load-test harness for the enrichment layer.
+
+Starts a local stub of an OpenAI-compatible chat-completions endpoint,
+points enrich.enrich at it, and runs generate_annotations() on a
+synthetic unified model. Reports throughput, latency percentiles and
+wall time, so concurrency / caching / batching changes can be compared
+without touching the real API.
+
+Usage:
+    python enrich/bench.py --files 50 --functions 10 --latency-ms 80 \
+        --error-rate 0.02 --rate-limit-rate 0.05 --response-words 40
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add project root to Python path so imports work. Inserted first so that
+# `enrich` resolves to the package, not to enrich/enrich.py next to this script.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from enrich import enrich
+from enrich.scheduler import EnrichmentBudget
+
+
+# ============================================================
+# Stub chat-completions server
+# ============================================================
+
+class StubLLMServer:
+    """
+    Local chat-completions stub with configurable behavior.
+
+    Args:
+        latency_ms: Mean artificial latency per request
+        jitter_ms: Uniform +/- jitter added to latency
+        error_rate: Fraction of requests answered with HTTP 500
+        rate_limit_rate: Fraction of requests answered with HTTP 429
+        response_words: Number of words in each completion
+        seed: RNG seed, for reproducible error / 429 patterns
+    """
+
+    def __init__(self, latency_ms: float = 50.0, jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 response_words: int = 30, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.response_words = response_words
+
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.status_counts: Dict[int, int] = {}
+
+        self.httpd: Optional[ThreadingHTTPServer] = None
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _decide(self) -> Tuple[int, float]:
+        """Pick status code and latency for one request (thread-safe)."""
+        with self.lock:
+            roll = self.random.random()
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms)
+
+        if roll < self.rate_limit_rate:
+            status = 429
+        elif roll < self.rate_limit_rate + self.error_rate:
+            status = 500
+        else:
+            status = 200
+
+        return status, max(0.0, self.latency_ms + jitter) / 1000.0
+
+    def _record(self, status: int) -> None:
+        with self.lock:
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+    def _completion_body(self, prompt: str) -> Dict[str, Any]:
+        words = ["This", "module", "appears", "to", "provide"]
+        words += ["stub"] * max(0, self.response_words - len(words))
+        content = " ".join(words[:self.response_words]) + "."
+        prompt_tokens = enrich.estimate_tokens(prompt)
+        completion_tokens = enrich.estimate_tokens(content)
+
+        return {
+            "id": "stub-completion",
+            "object": "chat.completion",
+            "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": content},
+                 "finish_reason": "stop"}
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                messages = payload.get("messages", [])
+                prompt = messages[-1]["content"] if messages else ""
+
+                status, delay = server._decide()
+                time.sleep(delay)
+                server._record(status)
+
+                if status == 200:
+                    body = json.dumps(server._completion_body(prompt)).encode("utf-8")
+                else:
+                    body = json.dumps({"error": {"code": status}}).encode("utf-8")
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if status == 429:
+                    self.send_header("Retry-After", "1")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> "StubLLMServer":
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+# ============================================================
+# Synthetic models
+# ============================================================
+
+def make_synthetic_model(n_files: int, functions_per_file: int,
+                         calls_per_function: int = 5, deps_per_file: int = 2,
+                         seed: int = 0) -> Dict[str, Any]:
+    """
+    Build a unified model (analysis.json shape) of the given size.
+    """
+    rng = random.Random(seed)
+    paths = [f"pkg{i % 10}/module_{i}.py" for i in range(n_files)]
+    call_pool = ["len", "append", "get", "helper", "load", "save", "validate", "render"]
+
+    files = {}
+    for i, path in enumerate(paths):
+        functions = {
+            f"func_{i}_{j}": {
+                "calls": sorted(set(rng.choice(call_pool) for _ in range(calls_per_function)))
+            }
+            for j in range(functions_per_file)
+        }
+        candidates = paths[:i]
+        depends_on = sorted(set(rng.sample(candidates, min(deps_per_file, len(candidates)))))
+        files[path] = {
+            "entry": i == 0,
+            "imports": [],
+            "functions": functions,
+            "depends_on": depends_on
+        }
+
+    return {"entry_point": paths[0] if paths else None, "files": files}
+
+
+# ============================================================
+# Benchmark
+# ============================================================
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def run_benchmark(model: Dict[str, Any], server: StubLLMServer,
+                  max_requests: Optional[int] = None,
+                  deadline_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Run generate_annotations() against a running stub server.
+
+    Client-side latency is measured around every _call_llm() invocation
+    (including failed ones). The enrichment module is restored afterwards.
+
+    Returns:
+        Report with wall time, requests/sec, latency percentiles (ms),
+        HTTP status counts and number of fallback entries.
+    """
+    latencies: List[float] = []
+    latency_lock = threading.Lock()
+    original_call = enrich._call_llm
+    original_url = enrich.GROQ_API_URL
+    original_key = os.environ.get("GROQ_API_KEY")
+
+    def timed_call(prompt: str, usage: Optional[Dict[str, int]] = None) -> str:
+        start = time.perf_counter()
+        try:
+            return original_call(prompt, usage=usage)
+        finally:
+            with latency_lock:
+                latencies.append(time.perf_counter() - start)
+
+    enrich.set_api_base_url(server.base_url)
+    os.environ.setdefault("GROQ_API_KEY", "stub-key")
+    enrich._call_llm = timed_call
+
+    try:
+        start = time.perf_counter()
+        annotations = enrich.generate_annotations(
+            model, use_llm=True, budget=EnrichmentBudget(max_requests, deadline_seconds)
+        )
+        wall = time.perf_counter() - start
+    finally:
+        enrich._call_llm = original_call
+        enrich.GROQ_API_URL = original_url
+        if original_key is None:
+            os.environ.pop("GROQ_API_KEY", None)
+
+    ordered = sorted(latencies)
+    fallbacks = sum(
+        1 for text in annotations["files"].values() if text == enrich._file_fallback()
+    ) + sum(
+        1 for key, text in annotations["functions"].items()
+        if text == enrich._function_fallback(key.split("::", 1)[1])
+    )
+
+    return {
+        "files": len(model.get("files", {})),
+        "entries": len(annotations["files"]) + len(annotations["functions"]),
+        "requests": len(latencies),
+        "wall_seconds": round(wall, 3),
+        "requests_per_second": round(len(latencies) / wall, 2) if wall > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(ordered, 50) * 1000, 2),
+            "p99": round(percentile(ordered, 99) * 1000, 2),
+            "max": round(ordered[-1] * 1000, 2) if ordered else 0.0
+        },
+        "status_counts": {str(k): v for k, v in sorted(server.status_counts.items())},
+        "fallbacks": fallbacks
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark enrichment against a local stub LLM")
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--functions", type=int, default=5, help="Functions per file")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--response-words", type=int, default=30)
+    parser.add_argument("--max-requests", type=int, default=None)
+    parser.add_argument("--deadline", type=float, default=None, help="Seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    model = make_synthetic_model(args.files, args.functions, seed=args.seed)
+
+    with StubLLMServer(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        response_words=args.response_words,
+        seed=args.seed
+    ) as server:
+        report = run_benchmark(model, server, args.max_requests, args.deadline)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,24 +9,45 @@ Purpose:
 
 import json
 import os
+import sys
+import time
 import requests
 from copy import deepcopy
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional, TextIO
+
+from enrich.prompt import build_file_prompt, build_function_prompt, estimate_tokens
+from enrich.scheduler import EnrichmentBudget, prioritize_files
 
 # -------------------------
 # LLM configuration
 # -------------------------
 
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+# Base URL of an OpenAI-compatible API. Override with GROQ_API_BASE_URL
+# (or set_api_base_url()) to point enrichment at a proxy or local stub.
+DEFAULT_API_BASE_URL = "https://api.groq.com/openai/v1"
+GROQ_API_URL = f"{os.getenv('GROQ_API_BASE_URL', DEFAULT_API_BASE_URL).rstrip('/')}/chat/completions"
 MODEL = "llama3-8b-8192"
 TEMPERATURE = 0.2
 TIMEOUT_SECONDS = 20
+PROMPT_TOKEN_BUDGET = 400
+
+# Checkpointing / progress
+JOURNAL_SUFFIX = ".journal.jsonl"
+PROGRESS_INTERVAL_SECONDS = 2.0
 
 
 # -------------------------
 # Public API
 # -------------------------
 
+def set_api_base_url(base_url: str) -> None:
+    """
+    Point all subsequent LLM calls at base_url + "/chat/completions".
+    """
+    global GROQ_API_URL
+    GROQ_API_URL = f"{base_url.rstrip('/')}/chat/completions"
+
+
 def enrich_analysis(analysis: Dict[str, Any], use_llm: bool = True) -> Dict[str, Any]:
     """
     Enrich the analysis dict with explanations.
@@ -79,7 +100,12 @@ def enrich_file(input_path: str, output_path: str, use_llm: bool = True) -> None
 # Explanation helpers
 # -------------------------
 
-def _explain_file(file_node: Dict[str, Any], use_llm: bool) -> str:
+def _explain_file(
+    file_node: Dict[str, Any],
+    use_llm: bool,
+    token_budget: int = PROMPT_TOKEN_BUDGET,
+    usage: Optional[Dict[str, int]] = None
+) -> str:
     """
     Generate a file-level explanation.
     """
@@ -87,42 +113,19 @@ def _explain_file(file_node: Dict[str, Any], use_llm: bool) -> str:
     path = file_node.get("path", "this file")
 
     if not use_llm:
-        return (
-            "The role of this file cannot be determined from static structure alone."
-        )
-
-    functions = file_node.get("functions", {})
-    function_names = list(functions.keys()) if isinstance(functions, dict) else []
-
-    prompt = f"""
-You are given verified static analysis data.
-
-File path: {path}
-Defined functions: {function_names}
-
-Explain the role of this file in a codebase.
+        return _file_fallback()
 
-Rules:
-- You may use common programming conventions and file naming patterns.
-- Do NOT invent runtime behavior or hidden relationships.
-- If the role cannot be determined with confidence, state uncertainty explicitly.
-- Prefer explaining relevance over listing contents.
-- Avoid tautologies such as "defines logic".
+    prompt = build_file_prompt(path, file_node.get("functions", {}), token_budget)
 
-Keep it concise (1–2 sentences).
-"""
-
-    fallback = (
-        "The role of this file cannot be determined from static structure alone."
-    )
-
-    return _safe_llm_call(prompt, fallback=fallback)
+    return _safe_llm_call(prompt, fallback=_file_fallback(), usage=usage)
 
 
 def _explain_function(
     fn_node: Dict[str, Any],
     file_node: Dict[str, Any],
-    use_llm: bool
+    use_llm: bool,
+    token_budget: int = PROMPT_TOKEN_BUDGET,
+    usage: Optional[Dict[str, int]] = None
 ) -> str:
     """
     Generate a function-level explanation.
@@ -133,37 +136,24 @@ def _explain_function(
     file_path = file_node.get("path", "unknown file")
 
     if not use_llm:
-        return (
-            f"`{name}` performs an internal operation, "
-            "but its exact responsibility cannot be determined from static structure alone."
-        )
+        return _function_fallback(name)
 
-    prompt = f"""
-You are given verified static analysis data.
+    local_functions = file_node.get("functions", {})
+    prompt = build_function_prompt(name, file_path, calls, local_functions, token_budget)
 
-Function name: {name}
-Defined in file: {file_path}
-Calls: {calls}
+    return _safe_llm_call(prompt, fallback=_function_fallback(name), usage=usage)
 
-Explain what this function appears to be responsible for.
 
-Rules:
-- You may interpret function names and standard library calls.
-- Do NOT invent runtime behavior or external interactions.
-- If responsibility cannot be inferred, state uncertainty explicitly.
-- Do NOT describe the function by listing its calls.
-- Focus on developer-relevant understanding.
+def _file_fallback() -> str:
+    return "The role of this file cannot be determined from static structure alone."
 
-Keep it concise (1 sentence).
-"""
 
-    fallback = (
+def _function_fallback(name: str) -> str:
+    return (
         f"`{name}` performs an internal operation, "
         "but its exact responsibility cannot be determined from static structure alone."
     )
 
-    return _safe_llm_call(prompt, fallback=fallback)
-
 
 # -------------------------
 # Explanation quality gate
@@ -189,15 +179,21 @@ def _is_bad_explanation(text: str) -> bool:
 # LLM interaction
 # -------------------------
 
-def _safe_llm_call(prompt: str, fallback: str) -> str:
+def _safe_llm_call(prompt: str, fallback: str, usage: Optional[Dict[str, int]] = None) -> str:
     """
     Calls the LLM safely.
     If anything fails or output violates quality rules,
     returns the fallback explanation.
+
+    If a usage dict is given, it receives the local prompt token estimate
+    and, when the API reports them, the actual token counts.
     """
 
+    if usage is not None:
+        usage["prompt_tokens_estimate"] = estimate_tokens(prompt)
+
     try:
-        result = _call_llm(prompt)
+        result = _call_llm(prompt, usage=usage)
         if _is_bad_explanation(result):
             return fallback
         return result
@@ -205,7 +201,7 @@ def _safe_llm_call(prompt: str, fallback: str) -> str:
         return fallback
 
 
-def _call_llm(prompt: str) -> str:
+def _call_llm(prompt: str, usage: Optional[Dict[str, int]] = None) -> str:
     """
     Low-level LLM call.
     This is the ONLY place that talks to the model.
@@ -243,14 +239,30 @@ def _call_llm(prompt: str) -> str:
     )
 
     response.raise_for_status()
-    return response.json()["choices"][0]["message"]["content"].strip()
+    payload = response.json()
+
+    if usage is not None:
+        for field in ("prompt_tokens", "completion_tokens", "total_tokens"):
+            value = payload.get("usage", {}).get(field)
+            if value is not None:
+                usage[field] = value
+
+    return payload["choices"][0]["message"]["content"].strip()
 
 
 # -------------------------
 # Annotation Generation (New Sidecar Flow)
 # -------------------------
 
-def generate_annotations(analysis: Dict[str, Any], use_llm: bool = True) -> Dict[str, Any]:
+def generate_annotations(
+    analysis: Dict[str, Any],
+    use_llm: bool = True,
+    completed: Optional[Dict[str, Dict[str, str]]] = None,
+    on_entry: Optional[Callable[[str, str, str, bool, Dict[str, int]], None]] = None,
+    token_budget: int = PROMPT_TOKEN_BUDGET,
+    usage: Optional[Dict[str, Dict[str, int]]] = None,
+    budget: Optional[EnrichmentBudget] = None,
+) -> Dict[str, Any]:
     """
     Generate a sidecar explanations file (annotations.json).
     
@@ -263,44 +275,338 @@ def generate_annotations(analysis: Dict[str, Any], use_llm: bool = True) -> Dict
             "path/to/file.py::func_name": "Explanation...",
         }
     }
+
+    Args:
+        analysis: Unified model (analysis.json)
+        use_llm: Whether to call the LLM or emit fallbacks only
+        completed: Annotations already produced by an earlier run
+            (same structure as the output). These entries are reused
+            as-is and never re-requested.
+        on_entry: Called as on_entry(section, key, text, is_fallback, usage)
+            for every newly generated entry.
+        token_budget: Maximum estimated prompt size per request (tokens)
+        usage: If given, receives per-entry token usage keyed like the
+            annotations (file path or file_path::func_name).
+        budget: Optional request / wall-clock cap. Files are processed in
+            prioritize_files() order; once the budget is exhausted the
+            remaining entries receive fallback explanations.
     """
-    annotations = {
-        "files": {},
-        "functions": {}
-    }
+    completed = completed or {"files": {}, "functions": {}}
+    done_files = completed.get("files", {})
+    done_functions = completed.get("functions", {})
+
+    generated_files: Dict[str, str] = {}
+    generated_functions: Dict[str, str] = {}
     
     files = analysis.get("files", {})
+
+    def request_allowed() -> bool:
+        # Once the budget is spent, remaining entries get fallbacks
+        if not use_llm:
+            return False
+        if budget is None:
+            return True
+        if budget.exhausted():
+            return False
+        budget.consume()
+        return True
     
-    for file_path, file_node in files.items():
+    # Most important files first, so a capped run explains them
+    for file_path in prioritize_files(analysis):
+        file_node = files[file_path]
+
         # Temporarily inject path for helper
         file_node_copy = file_node.copy()
         file_node_copy["path"] = file_path
         
         # Explain file
-        explanation = _explain_file(file_node_copy, use_llm)
-        annotations["files"][file_path] = explanation
+        if file_path in done_files:
+            explanation = done_files[file_path]
+        else:
+            entry_usage: Dict[str, int] = {}
+            explanation = _explain_file(
+                file_node_copy, request_allowed(), token_budget, entry_usage
+            )
+            if usage is not None and entry_usage:
+                usage[file_path] = entry_usage
+            if on_entry:
+                on_entry("files", file_path, explanation,
+                         explanation == _file_fallback(), entry_usage)
+        generated_files[file_path] = explanation
         
         # Explain functions
         functions = file_node.get("functions", {})
         for func_name, func_node in functions.items():
+            # Key format: file_path::func_name
+            key = f"{file_path}::{func_name}"
+            if key in done_functions:
+                generated_functions[key] = done_functions[key]
+                continue
+
             func_node_copy = func_node.copy()
             func_node_copy["name"] = func_name
             
-            # Key format: file_path::func_name
+            entry_usage = {}
+            explanation = _explain_function(
+                func_node_copy, file_node_copy, request_allowed(), token_budget, entry_usage
+            )
+            if usage is not None and entry_usage:
+                usage[key] = entry_usage
+            if on_entry:
+                on_entry("functions", key, explanation,
+                         explanation == _function_fallback(func_name), entry_usage)
+            generated_functions[key] = explanation
+
+    # Output keeps model order regardless of processing order
+    annotations = {
+        "files": {},
+        "functions": {}
+    }
+
+    for file_path, file_node in files.items():
+        annotations["files"][file_path] = generated_files[file_path]
+        for func_name in file_node.get("functions", {}):
             key = f"{file_path}::{func_name}"
-            annotations["functions"][key] = _explain_function(func_node_copy, file_node_copy, use_llm)
+            annotations["functions"][key] = generated_functions[key]
             
     return annotations
 
 
-def run_enrichment_generation(input_path: str, output_path: str, use_llm: bool = True) -> None:
+def count_annotation_entries(analysis: Dict[str, Any]) -> int:
+    """
+    Number of entries (files + functions) generate_annotations() will produce.
+    """
+    total = 0
+    for file_node in analysis.get("files", {}).values():
+        total += 1 + len(file_node.get("functions", {}))
+    return total
+
+
+# -------------------------
+# Checkpointing (append-only journal)
+# -------------------------
+
+def journal_path_for(output_path: str) -> str:
+    """
+    Journal file used to checkpoint annotations for output_path.
+    """
+    return output_path + JOURNAL_SUFFIX
+
+
+def load_journal(journal_path: str, include_fallbacks: bool = False,
+                 usage: Optional[Dict[str, Dict[str, int]]] = None) -> Dict[str, Dict[str, str]]:
+    """
+    Replay a journal into an annotations dict.
+
+    Each journal line is one JSON object:
+        {"section": "files" | "functions", "key": ..., "text": ...,
+         "fallback": bool, "usage": {...}}
+
+    A truncated final line (process killed mid-write) is ignored.
+    Fallback entries are skipped by default so that a resumed run
+    retries them (they usually mean the LLM call failed).
+    """
+    completed = {"files": {}, "functions": {}}
+
+    if not os.path.exists(journal_path):
+        return completed
+
+    with open(journal_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            section = record.get("section")
+            if section not in completed:
+                continue
+            if record.get("fallback") and not include_fallbacks:
+                continue
+            completed[section][record["key"]] = record["text"]
+            if usage is not None and record.get("usage"):
+                usage[record["key"]] = record["usage"]
+
+    return completed
+
+
+class _JournalWriter:
+    """
+    Appends one JSON line per generated entry and flushes it immediately,
+    so everything written survives a crash or Ctrl-C.
+    """
+
+    def __init__(self, journal_path: str):
+        self.file: TextIO = open(journal_path, "a", encoding="utf-8")
+
+    def write(self, section: str, key: str, text: str, is_fallback: bool,
+              usage: Optional[Dict[str, int]] = None) -> None:
+        record = {"section": section, "key": key, "text": text, "fallback": is_fallback}
+        if usage:
+            record["usage"] = usage
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class _ProgressReporter:
+    """
+    Periodically prints done/total, throughput and ETA to stderr.
+    """
+
+    def __init__(self, total: int, already_done: int = 0,
+                 interval: float = PROGRESS_INTERVAL_SECONDS, stream: TextIO = sys.stderr):
+        self.total = total
+        self.done = already_done
+        self.generated = 0
+        self.fallbacks = 0
+        self.interval = interval
+        self.stream = stream
+        self.start = time.monotonic()
+        self.last_report = self.start
+
+    def update(self, is_fallback: bool) -> None:
+        self.done += 1
+        self.generated += 1
+        if is_fallback:
+            self.fallbacks += 1
+
+        now = time.monotonic()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            self.report(now)
+
+    def report(self, now: Optional[float] = None) -> None:
+        now = now if now is not None else time.monotonic()
+        elapsed = max(now - self.start, 1e-9)
+        rate = self.generated / elapsed
+        remaining = self.total - self.done
+        eta = f"{remaining / rate:.0f}s" if rate > 0 else "?"
+        percent = (100.0 * self.done / self.total) if self.total else 100.0
+
+        print(
+            f"Enrichment: {self.done}/{self.total} ({percent:.1f}%) "
+            f"{rate:.2f} entries/s, {self.fallbacks} fallbacks, ETA {eta}",
+            file=self.stream
+        )
+
+
+def usage_path_for(output_path: str) -> str:
+    """
+    Token usage report written next to output_path (annotations.usage.json).
+    """
+    root, ext = os.path.splitext(output_path)
+    return f"{root}.usage{ext or '.json'}"
+
+
+def summarize_usage(usage: Dict[str, Dict[str, int]], token_budget: int) -> Dict[str, Any]:
+    """
+    Build the usage report: per-entry counts plus totals.
+    """
+    totals: Dict[str, int] = {}
+    for entry in usage.values():
+        for field, value in entry.items():
+            totals[field] = totals.get(field, 0) + value
+
+    return {
+        "token_budget": token_budget,
+        "requests": len(usage),
+        "totals": totals,
+        "entries": usage
+    }
+
+
+def run_enrichment_generation(input_path: str, output_path: str, use_llm: bool = True,
+                              resume: bool = True,
+                              token_budget: int = PROMPT_TOKEN_BUDGET,
+                              max_requests: Optional[int] = None,
+                              deadline_seconds: Optional[float] = None) -> None:
     """
     Generate independent annotations.json from analysis.json.
+
+    Entries are checkpointed to `<output_path>.journal.jsonl` as they are
+    produced. If the run is interrupted, re-running with resume=True
+    replays the journal and only requests the missing entries. The
+    journal is removed once a run finishes without fallbacks; otherwise
+    it is kept so a resumed run retries only the fallback entries.
+
+    Per-request token usage is written to `annotations.usage.json`
+    (see usage_path_for()) when the LLM is used.
+
+    max_requests / deadline_seconds cap this run; entries beyond the cap
+    get fallbacks, which a later resumed run will retry.
     """
     with open(input_path, "r", encoding="utf-8") as f:
         analysis = json.load(f)
 
-    annotations = generate_annotations(analysis, use_llm=use_llm)
+    journal_path = journal_path_for(output_path)
 
-    with open(output_path, "w", encoding="utf-8") as f:
+    usage: Dict[str, Dict[str, int]] = {}
+
+    if resume:
+        completed = load_journal(journal_path, usage=usage)
+    else:
+        completed = {"files": {}, "functions": {}}
+        if os.path.exists(journal_path):
+            os.remove(journal_path)
+
+    # A journal from another or older input may hold keys that no longer
+    # exist; reuse and count only entries of the current model
+    files = analysis.get("files", {})
+    function_keys = {
+        f"{file_path}::{func_name}"
+        for file_path, file_node in files.items()
+        for func_name in file_node.get("functions", {})
+    }
+    completed = {
+        "files": {key: text for key, text in completed["files"].items() if key in files},
+        "functions": {key: text for key, text in completed["functions"].items() if key in function_keys}
+    }
+
+    already_done = len(completed["files"]) + len(completed["functions"])
+    total = count_annotation_entries(analysis)
+    if already_done:
+        print(f"Resuming enrichment: {already_done}/{total} entries already journaled",
+              file=sys.stderr)
+
+    progress = _ProgressReporter(total, already_done)
+    journal = _JournalWriter(journal_path)
+
+    def on_entry(section: str, key: str, text: str, is_fallback: bool,
+                 entry_usage: Dict[str, int]) -> None:
+        journal.write(section, key, text, is_fallback, entry_usage)
+        progress.update(is_fallback)
+
+    try:
+        annotations = generate_annotations(
+            analysis,
+            use_llm=use_llm,
+            completed=completed,
+            on_entry=on_entry,
+            token_budget=token_budget,
+            usage=usage,
+            budget=EnrichmentBudget(max_requests, deadline_seconds)
+        )
+    finally:
+        journal.close()
+        progress.report()
+
+    # Compact: write the final file atomically, then drop the journal
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
         json.dump(annotations, f, indent=2)
+    os.replace(tmp_path, output_path)
+
+    if usage:
+        with open(usage_path_for(output_path), "w", encoding="utf-8") as f:
+            json.dump(summarize_usage(usage, token_budget), f, indent=2)
+
+    # Fallbacks (budget ran out, or the LLM failed) are retried by a resumed
+    # run, which needs the successful entries still journaled
+    if use_llm and progress.fallbacks:
+        print(f"Kept {journal_path}: {progress.fallbacks} fallback entries will be "
+              f"retried with resume", file=sys.stderr)
+    else:
+        os.remove(journal_path)
@@ -0,0 +1,203 @@
+"""
+Prompt construction for the enrichment layer.
+
+Purpose:
+- Keep prompts within a fixed token budget, even for generated modules
+  with hundreds of functions or calls.
+- Rank and truncate lists deterministically (same input -> same prompt).
+- Summarize what was left out instead of silently dropping it.
+"""
+
+import builtins
+from typing import Callable, Dict, Iterable, List, Set, Tuple, Any
+
+# Rough chars-per-token ratio for English/code with BPE tokenizers
+CHARS_PER_TOKEN = 4
+
+# Call names that carry no project-specific meaning: builtins plus the
+# most common str/list/dict/set/file/logging methods. They are collapsed
+# into a count instead of being listed one by one.
+BUILTIN_CALL_NAMES: Set[str] = {
+    name for name in dir(builtins) if not name.startswith("_")
+}
+COMMON_METHOD_NAMES: Set[str] = {
+    # str
+    "join", "split", "rsplit", "strip", "lstrip", "rstrip", "replace",
+    "startswith", "endswith", "lower", "upper", "format", "encode", "decode",
+    "find", "splitlines",
+    # list / dict / set
+    "append", "extend", "insert", "pop", "remove", "clear", "copy", "sort",
+    "get", "items", "keys", "values", "update", "setdefault", "add", "discard",
+    # files / io
+    "read", "write", "close", "open", "readline", "readlines", "flush",
+    # logging
+    "debug", "info", "warning", "warn", "error", "exception", "critical",
+}
+NOISE_CALL_NAMES: Set[str] = BUILTIN_CALL_NAMES | COMMON_METHOD_NAMES
+
+
+FILE_PROMPT_TEMPLATE = """
+You are given verified static analysis data.
+
+File path: {path}
+Defined functions: {functions}
+
+Explain the role of this file in a codebase.
+
+Rules:
+- You may use common programming conventions and file naming patterns.
+- Do NOT invent runtime behavior or hidden relationships.
+- If the role cannot be determined with confidence, state uncertainty explicitly.
+- Prefer explaining relevance over listing contents.
+- Avoid tautologies such as "defines logic".
+
+Keep it concise (1–2 sentences).
+"""
+
+FUNCTION_PROMPT_TEMPLATE = """
+You are given verified static analysis data.
+
+Function name: {name}
+Defined in file: {file_path}
+Calls: {calls}
+
+Explain what this function appears to be responsible for.
+
+Rules:
+- You may interpret function names and standard library calls.
+- Do NOT invent runtime behavior or external interactions.
+- If responsibility cannot be inferred, state uncertainty explicitly.
+- Do NOT describe the function by listing its calls.
+- Focus on developer-relevant understanding.
+
+Keep it concise (1 sentence).
+"""
+
+
+# -------------------------
+# Token estimation
+# -------------------------
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap, tokenizer-free token estimate (ceil(len / CHARS_PER_TOKEN)).
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+# -------------------------
+# Ranking
+# -------------------------
+
+def rank_function_names(functions: Dict[str, Any]) -> List[str]:
+    """
+    Order a file's functions by likely relevance.
+
+    Public before private, then functions with more calls first
+    (they tend to be the orchestrators), then alphabetically.
+    """
+    def call_count(name: str) -> int:
+        node = functions.get(name)
+        return len(node.get("calls", [])) if isinstance(node, dict) else 0
+
+    return sorted(
+        functions.keys(),
+        key=lambda name: (name.startswith("_"), -call_count(name), name)
+    )
+
+
+def rank_calls(calls: Iterable[str], local_functions: Iterable[str] = ()) -> Tuple[List[str], int]:
+    """
+    Dedupe and order a function's calls.
+
+    Builtin and common stdlib method names are dropped and only counted.
+    Calls to functions defined in the same file come first, then the rest
+    alphabetically.
+
+    Returns:
+        (ranked project-level call names, number of builtin/stdlib calls dropped)
+    """
+    local = set(local_functions)
+    unique = set(calls)
+
+    noise = {name for name in unique if name in NOISE_CALL_NAMES and name not in local}
+    kept = unique - noise
+
+    ranked = sorted(kept, key=lambda name: (name not in local, name))
+    return ranked, len(noise)
+
+
+# -------------------------
+# Budget fitting
+# -------------------------
+
+def format_list(items: List[str], omitted: int, dropped_noise: int = 0) -> str:
+    """
+    Render a (possibly truncated) list plus a summary of what was left out.
+    """
+    text = repr(items)
+    notes = []
+    if omitted:
+        notes.append(f"+{omitted} more not shown")
+    if dropped_noise:
+        notes.append(f"{dropped_noise} builtin/standard-library calls omitted")
+    if notes:
+        text += f" ({'; '.join(notes)})"
+    return text
+
+
+def fit_list(render: Callable[[List[str], int], str], items: List[str], token_budget: int) -> str:
+    """
+    Render with as many leading items as fit in token_budget.
+
+    render(shown_items, omitted_count) must return the full prompt.
+    Uses a binary search on the number of items, so the cost is
+    O(log n) renders regardless of list size. If even zero items do
+    not fit, the zero-item prompt is returned.
+    """
+    full = render(items, 0)
+    if estimate_tokens(full) <= token_budget:
+        return full
+
+    low, high = 0, len(items) - 1  # high: the full list is known not to fit
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(render(items[:mid], len(items) - mid)) <= token_budget:
+            low = mid
+        else:
+            high = mid - 1
+
+    return render(items[:low], len(items) - low)
+
+
+# -------------------------
+# Prompt builders
+# -------------------------
+
+def build_file_prompt(path: str, functions: Dict[str, Any], token_budget: int) -> str:
+    """
+    File-level prompt with the function list ranked and truncated to fit.
+    """
+    names = rank_function_names(functions) if isinstance(functions, dict) else []
+
+    def render(shown: List[str], omitted: int) -> str:
+        return FILE_PROMPT_TEMPLATE.format(path=path, functions=format_list(shown, omitted))
+
+    return fit_list(render, names, token_budget)
+
+
+def build_function_prompt(name: str, file_path: str, calls: Iterable[str],
+                          local_functions: Iterable[str], token_budget: int) -> str:
+    """
+    Function-level prompt with the call list deduped, ranked and truncated to fit.
+    """
+    ranked, dropped_noise = rank_calls(calls, local_functions)
+
+    def render(shown: List[str], omitted: int) -> str:
+        return FUNCTION_PROMPT_TEMPLATE.format(
+            name=name,
+            file_path=file_path,
+            calls=format_list(shown, omitted, dropped_noise)
+        )
+
+    return fit_list(render, ranked, token_budget)
@@ -0,0 +1,85 @@
+"""
+Enrichment scheduling.
+
+Purpose:
+- Decide in which order files are explained, most useful first:
+  entry point, then files many others depend on, then the rest.
+- Enforce a request and/or wall-clock budget so that a capped run
+  stops cleanly instead of being killed halfway.
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+from analyzer.dependency import identify_entry_point
+
+
+def compute_fan_in(files: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Count how many files depend on each file (via depends_on).
+
+    Args:
+        files: The "files" section of the unified model
+
+    Returns:
+        Dictionary mapping file -> number of files that depend on it
+    """
+    fan_in = {file_path: 0 for file_path in files}
+
+    for file_data in files.values():
+        for dep_file in file_data.get("depends_on", []):
+            if dep_file in fan_in:
+                fan_in[dep_file] += 1
+
+    return fan_in
+
+
+def prioritize_files(analysis: Dict[str, Any]) -> List[str]:
+    """
+    Order files by importance for enrichment.
+
+    1. The entry point (from the model, or identify_entry_point())
+    2. Files with the highest fan-in in the dependency graph
+    3. Everything else, in model order
+
+    Ties keep model order, so the schedule is deterministic.
+    """
+    files = analysis.get("files", {})
+    entry_point = analysis.get("entry_point") or identify_entry_point(files)
+    fan_in = compute_fan_in(files)
+    position = {file_path: i for i, file_path in enumerate(files)}
+
+    return sorted(
+        files,
+        key=lambda file_path: (
+            file_path != entry_point,
+            -fan_in[file_path],
+            position[file_path]
+        )
+    )
+
+
+class EnrichmentBudget:
+    """
+    Caps the number of LLM requests and/or total wall-clock time.
+
+    Once exhausted, callers should stop issuing requests and emit
+    fallback explanations for the remaining entries.
+    """
+
+    def __init__(self, max_requests: Optional[int] = None,
+                 deadline_seconds: Optional[float] = None):
+        self.max_requests = max_requests
+        self.deadline_seconds = deadline_seconds
+        self.requests = 0
+        self.start = time.monotonic()
+
+    def exhausted(self) -> bool:
+        if self.max_requests is not None and self.requests >= self.max_requests:
+            return True
+        if self.deadline_seconds is not None:
+            return time.monotonic() - self.start >= self.deadline_seconds
+        return False
+
+    def consume(self) -> None:
+        self.requests += 1
@@ -0,0 +1,195 @@
+"""
+call_graph.py - Function-level call graph construction
+Builds function -> function edges from the unified model in linear time
+using a prebuilt name -> defining-files index, with optional pruning to
+a neighbourhood of the entry point (or any chosen function) and by degree.
+"""
+
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+Edge = Tuple[str, str]
+
+
+def function_node(file_path: str, func_name: str) -> str:
+    """Node name for a function: 'path/to/file.py::func'."""
+    return f"{file_path}::{func_name}"
+
+
+def build_function_index(files: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    Map each function name to the files that define it (model order).
+
+    Args:
+        files: The "files" section of the unified model
+
+    Returns:
+        Dictionary mapping function name -> list of defining file paths
+    """
+    index: Dict[str, List[str]] = {}
+    for file_path, file_data in files.items():
+        for func_name in file_data.get("functions", {}):
+            index.setdefault(func_name, []).append(file_path)
+    return index
+
+
+def resolve_call(called: str, file_path: str, local_functions: Dict[str, Any],
+                 index: Dict[str, List[str]], include_local: bool = True) -> Optional[str]:
+    """
+    Resolve a call name to its defining file in O(1).
+
+    A definition in the calling file wins (when include_local), otherwise
+    the first other file that defines the name. Returns None for
+    unresolved calls (builtins, stdlib, third-party, dynamic dispatch).
+    """
+    if include_local and called in local_functions:
+        return file_path
+
+    # At most one of the first two candidates is the calling file itself
+    for candidate in index.get(called, ())[:2]:
+        if candidate != file_path:
+            return candidate
+
+    return None
+
+
+def build_function_call_graph(analysis_data: Dict[str, Any]) -> Dict[str, List]:
+    """
+    Build function -> function edges (same-file and cross-file calls).
+
+    Cost is O(total calls): each call is resolved with a dict lookup.
+
+    Returns:
+        Dictionary with "edges": [("a.py::f", "b.py::g"), ...]
+    """
+    files = analysis_data.get("files", {})
+    index = build_function_index(files)
+    edges: List[Edge] = []
+    seen: Set[Edge] = set()
+
+    for file_path, file_data in files.items():
+        functions = file_data.get("functions", {})
+        for func_name, func_data in functions.items():
+            source = function_node(file_path, func_name)
+            for called in func_data.get("calls", []):
+                target_file = resolve_call(called, file_path, functions, index)
+                if target_file is None:
+                    continue
+                edge = (source, function_node(target_file, called))
+                if edge not in seen:
+                    seen.add(edge)
+                    edges.append(edge)
+
+    return {"edges": edges}
+
+
+# ============================================================
+# Pruning
+# ============================================================
+
+def find_root_nodes(analysis_data: Dict[str, Any], root: Optional[str] = None) -> List[str]:
+    """
+    Resolve pruning roots.
+
+    - root=None: every function defined in the entry point file
+    - root='file.py::func': that function
+    - root='func': every function with that name
+    """
+    files = analysis_data.get("files", {})
+
+    if root is None:
+        entry_point = analysis_data.get("entry_point")
+        if not entry_point or entry_point not in files:
+            return []
+        return [function_node(entry_point, name) for name in files[entry_point].get("functions", {})]
+
+    if "::" in root:
+        file_path, func_name = root.split("::", 1)
+        if func_name in files.get(file_path, {}).get("functions", {}):
+            return [root]
+        return []
+
+    return [function_node(file_path, root) for file_path in build_function_index(files).get(root, [])]
+
+
+def prune_reachable(edges: List[Edge], roots: Iterable[str], max_hops: Optional[int] = None) -> List[Edge]:
+    """
+    Keep only edges between nodes reachable from roots within max_hops
+    (following call direction). max_hops=None means unlimited.
+    """
+    adjacency: Dict[str, List[str]] = {}
+    for src, dst in edges:
+        adjacency.setdefault(src, []).append(dst)
+
+    distance: Dict[str, int] = {}
+    queue = deque()
+    for node in roots:
+        if node not in distance:
+            distance[node] = 0
+            queue.append(node)
+
+    while queue:
+        node = queue.popleft()
+        if max_hops is not None and distance[node] >= max_hops:
+            continue
+        for neighbor in adjacency.get(node, []):
+            if neighbor not in distance:
+                distance[neighbor] = distance[node] + 1
+                queue.append(neighbor)
+
+    return [
+        (src, dst) for src, dst in edges
+        if src in distance and dst in distance
+        and (max_hops is None or distance[src] < max_hops)
+    ]
+
+
+def prune_by_degree(edges: List[Edge], min_degree: int) -> List[Edge]:
+    """
+    Drop edges touching nodes whose total degree (in + out) is below
+    min_degree. Degrees are computed once on the input edges.
+    """
+    if min_degree <= 0:
+        return edges
+
+    degree: Dict[str, int] = {}
+    for src, dst in edges:
+        degree[src] = degree.get(src, 0) + 1
+        degree[dst] = degree.get(dst, 0) + 1
+
+    return [
+        (src, dst) for src, dst in edges
+        if degree[src] >= min_degree and degree[dst] >= min_degree
+    ]
+
+
+def build_pruned_call_graph(analysis_data: Dict[str, Any], root: Optional[str] = None,
+                            max_hops: Optional[int] = None, min_degree: int = 0,
+                            prune: bool = False) -> Dict[str, List]:
+    """
+    Function-level graph with optional pruning.
+
+    Args:
+        analysis_data: Unified model format
+        root: Pruning root (see find_root_nodes); implies prune=True
+        max_hops: Keep nodes within N calls of the roots; implies prune=True
+        min_degree: Drop nodes with fewer total connections
+        prune: Restrict to nodes reachable from the roots
+
+    Raises:
+        ValueError: If pruning was requested but no root function was found
+    """
+    graph = build_function_call_graph(analysis_data)
+    edges = graph["edges"]
+
+    if prune or root is not None or max_hops is not None:
+        roots = find_root_nodes(analysis_data, root)
+        if not roots:
+            raise ValueError(
+                f"No root function found for pruning: {root or 'entry point functions'}"
+            )
+        edges = prune_reachable(edges, roots, max_hops)
+
+    edges = prune_by_degree(edges, min_degree)
+
+    return {"edges": edges}
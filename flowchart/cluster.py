@@ -0,0 +1,166 @@
+"""
+cluster.py - Package-level aggregation for large flowcharts
+Collapses file-level dependencies into package (directory) nodes with
+weighted, deduplicated edges, so chart size depends on the number of
+packages rather than the number of files.
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from analyzer.dependency import ROOT_PACKAGE, package_of
+from flowchart.exporter import assign_node_ids, export_mermaid, sanitize_node_id
+
+# Default cap on edges in an aggregated chart
+DEFAULT_TOP_K = 300
+
+
+def parent_package(package: str) -> str:
+    """Parent directory of a package, used as its subgraph cluster."""
+    if package == ROOT_PACKAGE or "/" not in package:
+        return ROOT_PACKAGE
+    return package.rsplit("/", 1)[0]
+
+
+def top_k_edges(weights: Dict[Tuple[str, str], int], top_k: Optional[int]) -> List[Tuple[str, str, int]]:
+    """
+    Keep the heaviest top_k edges (all if top_k is None).
+    Ties are broken by (source, target) so output is deterministic.
+    """
+    ranked = sorted(weights.items(), key=lambda item: (-item[1], item[0]))
+    if top_k is not None:
+        ranked = ranked[:top_k]
+    return [(src, dst, weight) for (src, dst), weight in ranked]
+
+
+def build_package_graph(analysis_data: Dict[str, Any], depth: int = 2,
+                        top_k: Optional[int] = DEFAULT_TOP_K) -> Dict[str, Any]:
+    """
+    Collapse file dependencies into package-level nodes.
+
+    Args:
+        analysis_data: Unified model format
+        depth: Number of directory components that identify a package
+        top_k: Keep only the K heaviest edges (None = keep all)
+
+    Returns:
+        Dictionary with:
+            "nodes": {node_id: label}
+            "edges": [(source_id, target_id, weight), ...]
+            "clusters": {cluster_label: [node_id, ...]}
+    """
+    files = analysis_data.get("files", {})
+    file_counts: Dict[str, int] = {}
+    weights: Dict[Tuple[str, str], int] = {}
+
+    for file_path, file_data in files.items():
+        src_pkg = package_of(file_path, depth)
+        file_counts[src_pkg] = file_counts.get(src_pkg, 0) + 1
+
+        for dep_file in file_data.get("depends_on", []):
+            dst_pkg = package_of(dep_file, depth)
+            if dst_pkg == src_pkg:
+                continue  # intra-package edges are not shown at this level
+            key = (src_pkg, dst_pkg)
+            weights[key] = weights.get(key, 0) + 1
+
+    edges = top_k_edges(weights, top_k)
+
+    # 'a-b' and 'a_b' sanitize alike; assign_node_ids() keeps them apart
+    ids = assign_node_ids(sorted(file_counts))
+    nodes = {}
+    clusters: Dict[str, List[str]] = {}
+    for package in sorted(file_counts):
+        nodes[ids[package]] = f"{package} ({file_counts[package]} files)"
+        clusters.setdefault(parent_package(package), []).append(ids[package])
+
+    return {
+        "nodes": nodes,
+        "edges": [(ids[src], ids[dst], w) for src, dst, w in edges],
+        "clusters": clusters
+    }
+
+
+def build_package_drilldown(analysis_data: Dict[str, Any], package: str, depth: int = 2,
+                            top_k: Optional[int] = DEFAULT_TOP_K) -> Dict[str, Any]:
+    """
+    File-level chart for a single package.
+
+    Files inside the package are shown individually; dependencies on
+    other packages are collapsed into one weighted edge per package.
+    """
+    files = analysis_data.get("files", {})
+    members = [f for f in files if package_of(f, depth) == package]
+    external = sorted({
+        package_of(dep_file, depth)
+        for file_path in members
+        for dep_file in files[file_path].get("depends_on", [])
+    } - {package})
+
+    # Files first, so they keep their plain IDs
+    ids = assign_node_ids(members + [f"pkg:{dep_pkg}" for dep_pkg in external])
+    nodes = {ids[file_path]: file_path for file_path in members}
+    weights: Dict[Tuple[str, str], int] = {}
+
+    for file_path in members:
+        for dep_file in files[file_path].get("depends_on", []):
+            dep_pkg = package_of(dep_file, depth)
+            target = ids[dep_file] if dep_pkg == package else ids[f"pkg:{dep_pkg}"]
+            key = (ids[file_path], target)
+            weights[key] = weights.get(key, 0) + 1
+
+    for dep_pkg in external:
+        nodes[ids[f"pkg:{dep_pkg}"]] = f"{dep_pkg} (package)"
+
+    return {
+        "nodes": nodes,
+        "edges": top_k_edges(weights, top_k),
+        "clusters": {
+            package: [ids[f] for f in members],
+            "external packages": [ids[f"pkg:{p}"] for p in external]
+        }
+    }
+
+
+def drilldown_file_names(packages: List[str]) -> Dict[str, str]:
+    """
+    Map packages to unique drill-down file names (without ".md").
+    Names are compared case-insensitively, since 'Api' and 'api' would
+    overwrite each other on macOS and Windows; clashes get a numeric
+    suffix.
+    """
+    names: Dict[str, str] = {}
+    used = set()
+
+    for package in packages:
+        base = sanitize_node_id(package)
+        name, n = base, 1
+        while name.lower() in used:
+            n += 1
+            name = f"{base}_{n}"
+        used.add(name.lower())
+        names[package] = name
+
+    return names
+
+
+def write_drilldown_charts(analysis_data: Dict[str, Any], output_dir: str, depth: int = 2,
+                           top_k: Optional[int] = DEFAULT_TOP_K) -> List[str]:
+    """
+    Write one Mermaid chart per package into output_dir.
+
+    Returns:
+        List of written file paths
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    packages = sorted({package_of(f, depth) for f in analysis_data.get("files", {})})
+    file_names = drilldown_file_names(packages)
+    written = []
+
+    for package in packages:
+        graph = build_package_drilldown(analysis_data, package, depth, top_k)
+        out_file = os.path.join(output_dir, f"{file_names[package]}.md")
+        export_mermaid(graph, out_file)
+        written.append(out_file)
+
+    return written
@@ -1,8 +1,301 @@
+"""
+exporter.py - Streaming graph exporters
+Writes a graph ({"edges": [...], optional "nodes" / "clusters"}) straight
+to disk in several formats: Mermaid, Graphviz DOT, GraphML, JSON
+node-link, node/edge CSV files for graph-database bulk loading, and a
+standalone HTML viewer with a precomputed layout.
+
+Edges are (src, dst) or weighted (src, dst, weight) tuples. Output goes
+through a large write buffer and is never assembled in memory, so memory
+use does not grow with the size of the rendered output.
+"""
+
+import csv
+import json
+import os
+import re
+from typing import Any, Dict, Iterator, List, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+# Size of the file write buffer (bytes)
+WRITE_BUFFER_SIZE = 1 << 20
+
+_INVALID_ID_CHARS = re.compile(r"[^0-9A-Za-z_]")
+
+
+def sanitize_node_id(name):
+    """Turn a path or label into a Mermaid-safe node ID."""
+    return _INVALID_ID_CHARS.sub("_", name)
+
+
+def assign_node_ids(names) -> Dict[str, str]:
+    """
+    Map names to unique Mermaid-safe IDs (deterministic for a given order).
+    Names that sanitize to the same ID get a numeric suffix.
+    """
+    ids: Dict[str, str] = {}
+    used = set()
+
+    for name in names:
+        if name in ids:
+            continue
+        base = sanitize_node_id(name)
+        if base.lower() == "end":  # reserved word in Mermaid
+            base = f"{base}_"
+        node_id, n = base, 1
+        while node_id in used:
+            n += 1
+            node_id = f"{base}_{n}"
+        used.add(node_id)
+        ids[name] = node_id
+
+    return ids
+
+
+def relabel_for_mermaid(graph) -> Dict[str, Any]:
+    """
+    Replace raw node names (e.g. 'a.py::func') with safe IDs and keep
+    the original names as labels.
+    """
+    names = list(graph.get("nodes", {}))
+    names += [node for edge in graph["edges"] for node in edge[:2]]
+    ids = assign_node_ids(names)
+    labels = graph.get("nodes", {})
+
+    return {
+        "nodes": {ids[name]: labels.get(name, name) for name in ids},
+        "edges": [(ids[edge[0]], ids[edge[1]], *edge[2:]) for edge in graph["edges"]],
+        "clusters": {
+            cluster: [ids[name] for name in members]
+            for cluster, members in graph.get("clusters", {}).items()
+        }
+    }
+
+
+def _escape_label(label):
+    return label.replace('"', "#quot;")
+
+
+def _open_output(out_file):
+    return open(out_file, "w", encoding="utf-8", newline="", buffering=WRITE_BUFFER_SIZE)
+
+
+def _split_edge(edge) -> Tuple[str, str, int]:
+    """Normalize an edge to (src, dst, weight); unweighted edges weigh 1."""
+    if len(edge) == 3:
+        return edge[0], edge[1], edge[2]
+    return edge[0], edge[1], 1
+
+
+def iter_nodes(graph) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (node_id, label) for every node: declared nodes first,
+    then nodes that only appear as edge endpoints (label = ID).
+    """
+    nodes: Dict[str, str] = graph.get("nodes", {})
+    seen = set()
+
+    for node_id, label in nodes.items():
+        seen.add(node_id)
+        yield node_id, label
+
+    for edge in graph["edges"]:
+        for node_id in edge[:2]:
+            if node_id not in seen:
+                seen.add(node_id)
+                yield node_id, node_id
+
+
+# ============================================================
+# Mermaid
+# ============================================================
+
 def export_mermaid(graph, out_file="flowchart.md"):
-    lines = ["graph TD"]
+    """
+    Write a Mermaid flowchart.
+
+    graph["edges"] holds (src, dst) or weighted (src, dst, weight) tuples.
+    Optional graph["nodes"] maps node ID -> label, and graph["clusters"]
+    maps a cluster label -> node IDs rendered inside a subgraph.
+    """
+    nodes = graph.get("nodes", {})
+    clustered = set()
+
+    with _open_output(out_file) as f:
+        f.write("graph TD")
+
+        for i, (cluster, members) in enumerate(graph.get("clusters", {}).items()):
+            if not members:
+                continue
+            f.write(f'\nsubgraph cluster_{i}["{_escape_label(cluster)}"]')
+            for node_id in members:
+                f.write(f'\n  {node_id}["{_escape_label(nodes.get(node_id, node_id))}"]')
+                clustered.add(node_id)
+            f.write("\nend")
+
+        for node_id, label in nodes.items():
+            if node_id not in clustered:
+                f.write(f'\n{node_id}["{_escape_label(label)}"]')
+
+        for edge in graph["edges"]:
+            if len(edge) == 3:
+                src, dst, weight = edge
+                f.write(f"\n{src} -->|{weight}| {dst}")
+            else:
+                src, dst = edge
+                f.write(f"\n{src} --> {dst}")
+
+
+# ============================================================
+# Graphviz DOT
+# ============================================================
+
+def _dot_quote(value: str) -> str:
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def export_dot(graph, out_file="graph.dot"):
+    """Write a Graphviz digraph; clusters become `subgraph cluster_N`."""
+    nodes = graph.get("nodes", {})
+
+    with _open_output(out_file) as f:
+        f.write("digraph G {\n")
+
+        for i, (cluster, members) in enumerate(graph.get("clusters", {}).items()):
+            f.write(f"  subgraph cluster_{i} {{\n    label={_dot_quote(cluster)};\n")
+            for node_id in members:
+                f.write(f"    {_dot_quote(node_id)};\n")
+            f.write("  }\n")
+
+        for node_id, label in nodes.items():
+            f.write(f"  {_dot_quote(node_id)} [label={_dot_quote(label)}];\n")
+
+        for edge in graph["edges"]:
+            src, dst, weight = _split_edge(edge)
+            f.write(f"  {_dot_quote(src)} -> {_dot_quote(dst)} [weight={weight}];\n")
+
+        f.write("}\n")
+
+
+# ============================================================
+# GraphML
+# ============================================================
+
+def export_graphml(graph, out_file="graph.graphml"):
+    """Write GraphML with a `label` node attribute and `weight` edge attribute."""
+    with _open_output(out_file) as f:
+        f.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+            '  <key id="label" for="node" attr.name="label" attr.type="string"/>\n'
+            '  <key id="weight" for="edge" attr.name="weight" attr.type="int"/>\n'
+            '  <graph id="G" edgedefault="directed">\n'
+        )
+
+        for node_id, label in iter_nodes(graph):
+            f.write(
+                f"    <node id={quoteattr(node_id)}>"
+                f'<data key="label">{escape(label)}</data></node>\n'
+            )
+
+        for edge in graph["edges"]:
+            src, dst, weight = _split_edge(edge)
+            f.write(
+                f"    <edge source={quoteattr(src)} target={quoteattr(dst)}>"
+                f'<data key="weight">{weight}</data></edge>\n'
+            )
+
+        f.write("  </graph>\n</graphml>\n")
+
+
+# ============================================================
+# JSON node-link
+# ============================================================
+
+def export_json(graph, out_file="graph.json"):
+    """
+    Write the node-link JSON layout (as used by networkx / d3):
+    {"directed": true, "nodes": [{"id", "label"}], "links": [{"source", "target", "weight"}]}
+    """
+    with _open_output(out_file) as f:
+        f.write('{"directed": true, "multigraph": false, "graph": {}, "nodes": [')
+
+        for i, (node_id, label) in enumerate(iter_nodes(graph)):
+            f.write(("," if i else "") + "\n  " + json.dumps({"id": node_id, "label": label}))
+
+        f.write('\n], "links": [')
+
+        for i, edge in enumerate(graph["edges"]):
+            src, dst, weight = _split_edge(edge)
+            f.write(
+                ("," if i else "") + "\n  "
+                + json.dumps({"source": src, "target": dst, "weight": weight})
+            )
+
+        f.write("\n]}\n")
+
+
+# ============================================================
+# CSV (bulk load)
+# ============================================================
+
+def csv_paths(out_file: str) -> Tuple[str, str]:
+    """`graph.csv` -> (`graph.nodes.csv`, `graph.edges.csv`)."""
+    root, _ = os.path.splitext(out_file)
+    return f"{root}.nodes.csv", f"{root}.edges.csv"
+
+
+def export_csv(graph, out_file="graph.csv") -> List[str]:
+    """
+    Write separate node and edge CSV files.
+
+    Headers follow the neo4j-admin import convention
+    (`id:ID`, `:START_ID`, `:END_ID`), which most graph databases'
+    bulk loaders accept or can map trivially.
+
+    Returns:
+        [nodes_file, edges_file]
+    """
+    nodes_file, edges_file = csv_paths(out_file)
+
+    with _open_output(nodes_file) as f:
+        writer = csv.writer(f)
+        writer.writerow(["id:ID", "label"])
+        for node_id, label in iter_nodes(graph):
+            writer.writerow([node_id, label])
+
+    with _open_output(edges_file) as f:
+        writer = csv.writer(f)
+        writer.writerow([":START_ID", ":END_ID", "weight:int"])
+        for edge in graph["edges"]:
+            writer.writerow(_split_edge(edge))
+
+    return [nodes_file, edges_file]
+
+
+# ============================================================
+# Dispatch
+# ============================================================
+
+def export_html(graph, out_file="graph.html"):
+    """Precomputed layered layout in a self-contained canvas viewer."""
+    from flowchart.html_viewer import export_html as write_html
+
+    write_html(graph, out_file)
+
+
+EXPORTERS = {
+    "mermaid": export_mermaid,
+    "dot": export_dot,
+    "graphml": export_graphml,
+    "json": export_json,
+    "csv": export_csv,
+    "html": export_html,
+}
 
-    for src, dst in graph["edges"]:
-        lines.append(f"{src} --> {dst}")
 
-    with open(out_file, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
+def export_graph(graph: Dict[str, Any], out_file: str, fmt: str = "mermaid") -> None:
+    """Export graph to out_file in the given format (see EXPORTERS)."""
+    if fmt not in EXPORTERS:
+        raise ValueError(f"Unknown export format: {fmt} (expected one of {', '.join(EXPORTERS)})")
+    EXPORTERS[fmt](graph, out_file)
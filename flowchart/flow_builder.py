@@ -11,7 +11,13 @@ from typing import Dict, List, Any
 # Add project root to Python path so imports work
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from flowchart.exporter import export_mermaid
+from flowchart.exporter import EXPORTERS, export_graph, relabel_for_mermaid, sanitize_node_id
+from flowchart.call_graph import build_function_index, build_pruned_call_graph, resolve_call
+from flowchart.cluster import (
+    DEFAULT_TOP_K,
+    build_package_graph,
+    write_drilldown_charts
+)
 
 
 def build_graph_from_analysis(analysis_data: Dict[str, Any]) -> Dict[str, List]:
@@ -35,6 +41,7 @@ def build_graph_from_analysis(analysis_data: Dict[str, Any]) -> Dict[str, List]:
     """
     edges = []
     files = analysis_data.get("files", {})
+    index = build_function_index(files)
     
     # Build edges from file dependencies
     for file_path, file_data in files.items():
@@ -44,29 +51,27 @@ def build_graph_from_analysis(analysis_data: Dict[str, Any]) -> Dict[str, List]:
             # Actually, for flowchart we want: file -> dependency (shows what file uses)
             edges.append((file_path, dep_file))
         
-        # Also add function-level edges within files
+        # Also add function-level edges across files
         functions = file_data.get("functions", {})
         for func_name, func_data in functions.items():
             calls = func_data.get("calls", [])
             for called_func in calls:
-                # Check if called function is in another file
-                for other_file, other_data in files.items():
-                    if other_file != file_path:
-                        other_functions = other_data.get("functions", {})
-                        if called_func in other_functions:
-                            # Function call across files
-                            edges.append((f"{file_path}::{func_name}", f"{other_file}::{called_func}"))
-                            break
+                # First other file defining the name (index lookup, not a scan)
+                other_file = resolve_call(called_func, file_path, functions, index, include_local=False)
+                if other_file is not None:
+                    edges.append((f"{file_path}::{func_name}", f"{other_file}::{called_func}"))
     
     return {"edges": edges}
 
 
-def build_simple_file_graph(analysis_data: Dict[str, Any]) -> Dict[str, List]:
+def build_simple_file_graph(analysis_data: Dict[str, Any], sanitize: bool = True) -> Dict[str, List]:
     """
     Build simpler graph showing only file-level dependencies.
     
     Args:
         analysis_data: Unified model format
+        sanitize: Convert paths to Mermaid-safe node IDs. Formats that
+            quote their IDs (DOT, GraphML, JSON, CSV) keep real paths.
     
     Returns:
         Dictionary with "edges" list for file dependencies only
@@ -78,27 +83,65 @@ def build_simple_file_graph(analysis_data: Dict[str, Any]) -> Dict[str, List]:
     for file_path, file_data in files.items():
         depends_on = file_data.get("depends_on", [])
         for dep_file in depends_on:
-            # Normalize node names for Mermaid (replace special chars)
-            src = file_path.replace("/", "_").replace(".", "_").replace("-", "_")
-            dst = dep_file.replace("/", "_").replace(".", "_").replace("-", "_")
-            edges.append((src, dst))
+            if sanitize:
+                # Normalize node names for Mermaid (replace special chars)
+                edges.append((sanitize_node_id(file_path), sanitize_node_id(dep_file)))
+            else:
+                edges.append((file_path, dep_file))
+
+    if not sanitize:
+        # Keep isolated files too, so bulk-loaded graphs are complete
+        return {"nodes": {file_path: file_path for file_path in files}, "edges": edges}
     
     return {"edges": edges}
 
 
+def _get_option(name: str, default: Any = None) -> Any:
+    """Return the value following `name` in sys.argv, or default."""
+    if name in sys.argv:
+        idx = sys.argv.index(name)
+        if idx + 1 < len(sys.argv):
+            return sys.argv[idx + 1]
+    return default
+
+
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python flow_builder.py <analysis.json> [--output <output_file>]", file=sys.stderr)
+        print(
+            "Usage: python flow_builder.py <analysis.json> [--output <output_file>]\n"
+            "       [--mode file|package] [--depth <n>] [--top-k <k>] [--drilldown <dir>]\n"
+            "       [--level file|function] [--reachable] [--root <file.py::func|func>]\n"
+            "       [--hops <n>] [--min-degree <d>]\n"
+            f"       [--format {'|'.join(EXPORTERS)}]",
+            file=sys.stderr
+        )
         sys.exit(1)
     
     analysis_file = sys.argv[1]
-    output_file = "flowchart.md"
-    
-    # Parse optional output file
-    if "--output" in sys.argv:
-        idx = sys.argv.index("--output")
-        if idx + 1 < len(sys.argv):
-            output_file = sys.argv[idx + 1]
+    output_file = _get_option("--output", "flowchart.md")
+    mode = _get_option("--mode", "file")
+    depth = int(_get_option("--depth", 2))
+    top_k = int(_get_option("--top-k", DEFAULT_TOP_K))
+    drilldown_dir = _get_option("--drilldown")
+    fmt = _get_option("--format", "mermaid")
+    level = _get_option("--level", "file")
+    root = _get_option("--root")
+    hops = _get_option("--hops")
+    hops = int(hops) if hops is not None else None
+    min_degree = int(_get_option("--min-degree", 0))
+    reachable = "--reachable" in sys.argv
+
+    if mode not in ("file", "package"):
+        print(f"Error: Unknown mode: {mode}", file=sys.stderr)
+        sys.exit(1)
+
+    if level not in ("file", "function"):
+        print(f"Error: Unknown level: {level}", file=sys.stderr)
+        sys.exit(1)
+
+    if fmt not in EXPORTERS:
+        print(f"Error: Unknown format: {fmt}", file=sys.stderr)
+        sys.exit(1)
     
     if not os.path.exists(analysis_file):
         print(f"Error: Analysis file not found: {analysis_file}", file=sys.stderr)
@@ -109,13 +152,29 @@ def main():
         with open(analysis_file, "r", encoding="utf-8") as f:
             analysis_data = json.load(f)
         
-        # Build graph (using simple file-level graph)
-        graph = build_simple_file_graph(analysis_data)
+        if level == "function":
+            # Function-level call graph, optionally pruned around a root
+            graph = build_pruned_call_graph(
+                analysis_data, root=root, max_hops=hops,
+                min_degree=min_degree, prune=reachable
+            )
+            if fmt == "mermaid":
+                graph = relabel_for_mermaid(graph)
+        elif mode == "package":
+            # Aggregated package-level graph (bounded size on large repos)
+            graph = build_package_graph(analysis_data, depth=depth, top_k=top_k)
+        else:
+            # Build graph (using simple file-level graph)
+            graph = build_simple_file_graph(analysis_data, sanitize=(fmt == "mermaid"))
         
-        # Export to Mermaid format
-        export_mermaid(graph, output_file)
+        # Export in the requested format (Mermaid by default)
+        export_graph(graph, output_file, fmt)
         
-        print(f"Flowchart exported to {output_file}")
+        print(f"Flowchart exported to {output_file} ({fmt})")
+
+        if drilldown_dir:
+            written = write_drilldown_charts(analysis_data, drilldown_dir, depth=depth, top_k=top_k)
+            print(f"{len(written)} package charts exported to {drilldown_dir}")
         
     except Exception as e:
         print(f"Error building flowchart: {e}", file=sys.stderr)
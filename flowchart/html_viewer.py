@@ -0,0 +1,207 @@
+"""
+html_viewer.py - Self-contained HTML viewer for precomputed layouts
+Writes a single static HTML file with the layout embedded as compact
+arrays. The page draws on a canvas, culls nodes and edges outside the
+viewport, and only draws labels when zoomed in far enough to read them.
+Nothing is laid out in the browser.
+"""
+
+import json
+from typing import Any, Dict
+
+from flowchart.exporter import WRITE_BUFFER_SIZE
+from flowchart.layout import compute_layered_layout
+
+_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+  html, body { margin: 0; height: 100%; overflow: hidden; font: 12px sans-serif; }
+  canvas { display: block; width: 100%; height: 100%; background: #fff; cursor: grab; }
+  #info { position: fixed; left: 8px; top: 8px; background: rgba(255,255,255,.9);
+          padding: 4px 8px; border: 1px solid #ccc; border-radius: 4px; }
+</style>
+</head>
+<body>
+<canvas id="view"></canvas>
+<div id="info"></div>
+<script id="graph-data" type="application/json">__DATA__</script>
+<script>
+(function () {
+  var data = JSON.parse(document.getElementById("graph-data").textContent);
+  var xs = data.x, ys = data.y, labels = data.labels, cyc = data.cycle, E = data.edges;
+  var n = xs.length, R = 6, LABEL_SCALE = 0.6, CELL = 200;
+  var canvas = document.getElementById("view"), ctx = canvas.getContext("2d");
+  var info = document.getElementById("info");
+  var scale = 1, tx = 0, ty = 0, hover = -1;
+
+  // Uniform grid for hover lookups
+  var grid = {};
+  for (var i = 0; i < n; i++) {
+    var key = Math.floor(xs[i] / CELL) + "," + Math.floor(ys[i] / CELL);
+    (grid[key] = grid[key] || []).push(i);
+  }
+
+  function resize() {
+    canvas.width = canvas.clientWidth * devicePixelRatio;
+    canvas.height = canvas.clientHeight * devicePixelRatio;
+    draw();
+  }
+
+  function fit() {
+    var w = Math.max(data.width, 1) + 4 * R, h = Math.max(data.height, 1) + 4 * R;
+    scale = Math.min(canvas.clientWidth / w, canvas.clientHeight / h);
+    tx = (canvas.clientWidth - data.width * scale) / 2;
+    ty = (canvas.clientHeight - data.height * scale) / 2;
+  }
+
+  function draw() {
+    var dpr = devicePixelRatio, W = canvas.clientWidth, H = canvas.clientHeight;
+    ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+    ctx.clearRect(0, 0, W, H);
+    ctx.setTransform(dpr * scale, 0, 0, dpr * scale, dpr * tx, dpr * ty);
+
+    // Visible world rectangle (with margin)
+    var x0 = -tx / scale - R, y0 = -ty / scale - R;
+    var x1 = (W - tx) / scale + R, y1 = (H - ty) / scale + R;
+    function visible(k) { return xs[k] >= x0 && xs[k] <= x1 && ys[k] >= y0 && ys[k] <= y1; }
+
+    ctx.lineWidth = 1 / scale;
+    ctx.strokeStyle = "rgba(100,100,100,0.35)";
+    ctx.beginPath();
+    for (var e = 0; e < E.length; e += 2) {
+      var a = E[e], b = E[e + 1];
+      // Cull edges whose bounding box misses the viewport
+      if (Math.max(xs[a], xs[b]) < x0 || Math.min(xs[a], xs[b]) > x1 ||
+          Math.max(ys[a], ys[b]) < y0 || Math.min(ys[a], ys[b]) > y1) continue;
+      ctx.moveTo(xs[a], ys[a]);
+      ctx.lineTo(xs[b], ys[b]);
+    }
+    ctx.stroke();
+
+    var shown = 0;
+    ctx.beginPath();
+    for (var k = 0; k < n; k++) {
+      if (!visible(k) || cyc[k]) continue;
+      ctx.moveTo(xs[k] + R, ys[k]);
+      ctx.arc(xs[k], ys[k], R, 0, 2 * Math.PI);
+      shown++;
+    }
+    ctx.fillStyle = "#4a7bd0";
+    ctx.fill();
+
+    ctx.beginPath();
+    for (var c = 0; c < n; c++) {
+      if (!visible(c) || !cyc[c]) continue;
+      ctx.moveTo(xs[c] + R, ys[c]);
+      ctx.arc(xs[c], ys[c], R, 0, 2 * Math.PI);
+      shown++;
+    }
+    ctx.fillStyle = "#d0604a";
+    ctx.fill();
+
+    // Labels only when readable (level of detail)
+    if (scale >= LABEL_SCALE) {
+      ctx.fillStyle = "#222";
+      ctx.font = (11 / scale) + "px sans-serif";
+      for (var l = 0; l < n; l++) {
+        if (visible(l)) ctx.fillText(labels[l], xs[l] + R + 2 / scale, ys[l] + 4 / scale);
+      }
+    }
+
+    if (hover >= 0) {
+      ctx.beginPath();
+      ctx.arc(xs[hover], ys[hover], R * 1.8, 0, 2 * Math.PI);
+      ctx.strokeStyle = "#000";
+      ctx.lineWidth = 2 / scale;
+      ctx.stroke();
+    }
+
+    info.textContent = n + " nodes, " + (E.length / 2) + " edges, " + shown + " in view" +
+      (hover >= 0 ? " | " + labels[hover] : "");
+  }
+
+  function nodeAt(px, py) {
+    var wx = (px - tx) / scale, wy = (py - ty) / scale;
+    var gx = Math.floor(wx / CELL), gy = Math.floor(wy / CELL), best = -1, bestD = (R * 2) * (R * 2);
+    for (var dx = -1; dx <= 1; dx++) for (var dy = -1; dy <= 1; dy++) {
+      var cell = grid[(gx + dx) + "," + (gy + dy)] || [];
+      for (var j = 0; j < cell.length; j++) {
+        var k = cell[j], d = (xs[k] - wx) * (xs[k] - wx) + (ys[k] - wy) * (ys[k] - wy);
+        if (d < bestD) { bestD = d; best = k; }
+      }
+    }
+    return best;
+  }
+
+  var dragging = false, lastX = 0, lastY = 0, pending = false;
+  function redraw() {
+    if (pending) return;
+    pending = true;
+    requestAnimationFrame(function () { pending = false; draw(); });
+  }
+
+  canvas.addEventListener("mousedown", function (ev) { dragging = true; lastX = ev.clientX; lastY = ev.clientY; });
+  window.addEventListener("mouseup", function () { dragging = false; });
+  canvas.addEventListener("mousemove", function (ev) {
+    if (dragging) {
+      tx += ev.clientX - lastX; ty += ev.clientY - lastY;
+      lastX = ev.clientX; lastY = ev.clientY;
+    } else {
+      hover = nodeAt(ev.offsetX, ev.offsetY);
+    }
+    redraw();
+  });
+  canvas.addEventListener("wheel", function (ev) {
+    ev.preventDefault();
+    var f = Math.exp(-ev.deltaY * 0.0015);
+    tx = ev.offsetX - (ev.offsetX - tx) * f;
+    ty = ev.offsetY - (ev.offsetY - ty) * f;
+    scale *= f;
+    redraw();
+  }, { passive: false });
+  window.addEventListener("resize", resize);
+
+  fit();
+  resize();
+})();
+</script>
+</body>
+</html>
+"""
+
+
+def _compact_layout(layout: Dict[str, Any]) -> Dict[str, Any]:
+    """Column-oriented arrays: much smaller JSON and faster to parse."""
+    nodes = layout["nodes"]
+    return {
+        "x": [node["x"] for node in nodes],
+        "y": [node["y"] for node in nodes],
+        "labels": [node["label"] for node in nodes],
+        "cycle": [1 if node["cycle"] else 0 for node in nodes],
+        "edges": [index for edge in layout["edges"] for index in edge],
+        "width": layout["width"],
+        "height": layout["height"]
+    }
+
+
+def write_html_viewer(layout: Dict[str, Any], out_file: str, title: str = "CODE_Sherpa dependency map") -> None:
+    """
+    Write a self-contained HTML viewer for a layout from compute_layered_layout().
+    """
+    # "</" would end the <script> element early
+    data = json.dumps(_compact_layout(layout), separators=(",", ":")).replace("</", "<\\/")
+    page_head, page_tail = _PAGE_TEMPLATE.split("__DATA__")
+    page_head = page_head.replace("__TITLE__", title.replace("<", "&lt;"))
+
+    with open(out_file, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(page_head)
+        f.write(data)
+        f.write(page_tail)
+
+
+def export_html(graph: Dict[str, Any], out_file: str = "graph.html") -> None:
+    """Lay out a graph and write it as a standalone HTML viewer."""
+    write_html_viewer(compute_layered_layout(graph), out_file)
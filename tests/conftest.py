@@ -0,0 +1,45 @@
+import pytest
+
+# A small repository covering the cases the model invariants depend on:
+# package imports, an entry point, byte-identical files, an empty
+# __init__.py and a file that does not parse.
+TINY_REPO = {
+    "main.py": (
+        "from app import service\n"
+        "import app.util\n"
+        "\n"
+        "def main():\n"
+        "    service.run()\n"
+        "    app.util.helper()\n"
+        "\n"
+        "if __name__ == '__main__':\n"
+        "    main()\n"
+    ),
+    "app/__init__.py": "",
+    "app/service.py": (
+        "import os\n"
+        "from app.util import helper\n"
+        "\n"
+        "class Service:\n"
+        "    def start(self):\n"
+        "        helper()\n"
+        "\n"
+        "def run():\n"
+        "    if os.environ.get('X'):\n"
+        "        Service().start()\n"
+    ),
+    "app/util.py": "def helper():\n    return sorted([])\n",
+    "vendor/util_copy.py": "def helper():\n    return sorted([])\n",
+    "broken.py": "def broken(:\n",
+}
+
+
+@pytest.fixture
+def tiny_repo(tmp_path):
+    """Path of a fresh copy of TINY_REPO."""
+    repo = tmp_path / "repo"
+    for rel_path, text in TINY_REPO.items():
+        path = repo / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return str(repo)
@@ -0,0 +1,79 @@
+"""Resuming from an analysis journal must give the same model as a clean run."""
+
+import json
+import os
+
+import pytest
+
+from analyzer.analyzer import build_unified_model
+from analyzer.checkpoint import AnalysisJournal
+from analyzer.isolation import ResourceLimits
+from analyzer.passes import PASSES
+
+
+def journaled_run(repo, journal_file, passes=None, resume=False, limits=None, stats=None):
+    with AnalysisJournal(journal_file, passes, resume, limits) as journal:
+        model = build_unified_model(repo, compact=True, passes=passes, stats=stats,
+                                    limits=limits, journal=journal)
+    return model.to_dict()
+
+
+def interrupt(journal_file, results_kept):
+    """Cut the journal as a killed run would: some results, then a torn line."""
+    with open(journal_file, "rb") as f:
+        lines = f.readlines()
+    with open(journal_file, "wb") as f:
+        f.writelines(lines[:1 + results_kept])
+        f.write(lines[1 + results_kept][:10])
+
+
+def test_resumed_model_equals_clean_run(tiny_repo, tmp_path):
+    journal_file = str(tmp_path / "analysis.json.journal")
+    journaled_run(tiny_repo, journal_file, passes=["lines"])
+    interrupt(journal_file, results_kept=3)
+
+    stats = {}
+    resumed = journaled_run(tiny_repo, journal_file, passes=["lines"], resume=True, stats=stats)
+
+    assert stats["resumed"] == 3
+    assert resumed == build_unified_model(tiny_repo, passes=["lines"])
+
+
+def test_torn_last_line_is_truncated_on_resume(tiny_repo, tmp_path):
+    journal_file = str(tmp_path / "analysis.json.journal")
+    journaled_run(tiny_repo, journal_file)
+    interrupt(journal_file, results_kept=2)
+    size_before_torn_line = os.path.getsize(journal_file) - 10
+
+    AnalysisJournal(journal_file, resume=True).close()
+
+    assert os.path.getsize(journal_file) == size_before_torn_line
+    with open(journal_file, "r", encoding="utf-8") as f:
+        assert len([json.loads(line) for line in f]) == 3
+
+
+def test_resume_with_other_passes_is_refused(tiny_repo, tmp_path):
+    journal_file = str(tmp_path / "analysis.json.journal")
+    journaled_run(tiny_repo, journal_file, passes=["lines"])
+
+    with pytest.raises(ValueError, match="passes"):
+        AnalysisJournal(journal_file, ["classes"], resume=True)
+
+
+def test_resume_with_other_pass_version_is_refused(tiny_repo, tmp_path, monkeypatch):
+    journal_file = str(tmp_path / "analysis.json.journal")
+    journaled_run(tiny_repo, journal_file, passes=["lines"])
+    monkeypatch.setattr(PASSES["lines"], "version", PASSES["lines"].version + 1)
+
+    with pytest.raises(ValueError, match="pass versions"):
+        AnalysisJournal(journal_file, ["lines"], resume=True)
+
+
+def test_resume_without_limits_redoes_skipped_files(tiny_repo, tmp_path):
+    journal_file = str(tmp_path / "analysis.json.journal")
+    limited = journaled_run(tiny_repo, journal_file, limits=ResourceLimits(max_bytes=40))
+    assert any(file_data.get("skipped") for file_data in limited["files"].values())
+
+    resumed = journaled_run(tiny_repo, journal_file, resume=True)
+
+    assert resumed == build_unified_model(tiny_repo)
@@ -0,0 +1,62 @@
+"""Map and refine order of the progressive (deadline) analysis."""
+
+from analyzer.progressive import build_progressive_model
+from analyzer.sources import LocalSource
+
+
+class RecordingSource(LocalSource):
+    """LocalSource that remembers the order files are read in."""
+
+    def __init__(self, root_path):
+        super().__init__(root_path)
+        self.reads = []
+
+    def read_bytes(self, relative_path):
+        self.reads.append(relative_path)
+        return super().read_bytes(relative_path)
+
+
+def write_files(root, files):
+    for rel_path, text in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+
+def test_refine_starts_at_entry_point_outside_listing_order(tmp_path):
+    # aa/ sorts first and forms a long chain; the entry point is zz/cli.py
+    files = {f"aa/m{i}.py": f"import aa.m{i + 1}\n" for i in range(1, 6)}
+    files["aa/m6.py"] = "X = 1\n"
+    files["zz/core.py"] = "def run():\n    pass\n"
+    files["zz/cli.py"] = (
+        "import zz.core\n"
+        "\n"
+        "if __name__ == '__main__':\n"
+        "    zz.core.run()\n"
+    )
+    write_files(tmp_path, files)
+
+    source = RecordingSource(str(tmp_path))
+    model = build_progressive_model(source, deadline_seconds=60)
+
+    # The map scans every file once; the refine phase reads in map order
+    refine_reads = source.reads[len(files):]
+    assert refine_reads == [
+        "zz/cli.py", "zz/core.py",
+        "aa/m1.py", "aa/m2.py", "aa/m3.py", "aa/m4.py", "aa/m5.py", "aa/m6.py"
+    ]
+    assert model["entry_point"] == "zz/cli.py"
+    assert model["progress"]["complete"] == len(files)
+
+
+def test_top_level_main_wins_over_other_entry_guards(tmp_path):
+    write_files(tmp_path, {
+        "a/tool.py": "if __name__ == '__main__':\n    pass\n",
+        "main.py": "import lib\n\nif __name__ == '__main__':\n    pass\n",
+        "lib.py": "X = 1\n",
+    })
+
+    source = RecordingSource(str(tmp_path))
+    build_progressive_model(source, deadline_seconds=60)
+
+    assert source.reads[3:] == ["main.py", "lib.py", "a/tool.py"]
@@ -0,0 +1,20 @@
+"""CompactModel.write_json() must match json.dump(model, indent=2)."""
+
+import io
+import json
+
+import pytest
+
+from analyzer.analyzer import build_unified_model
+
+
+@pytest.mark.parametrize("passes", [None, ["classes", "decorators", "lines", "complexity"]])
+def test_compact_write_json_matches_dict_model(tiny_repo, passes):
+    model = build_unified_model(tiny_repo, passes=passes)
+    compact = build_unified_model(tiny_repo, compact=True, passes=passes)
+
+    buffer = io.StringIO()
+    compact.write_json(buffer)
+
+    assert buffer.getvalue() == json.dumps(model, indent=2)
+
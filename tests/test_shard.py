@@ -0,0 +1,43 @@
+"""Shard-and-merge must reproduce the single-node model exactly."""
+
+import json
+import os
+
+import pytest
+
+from analyzer.analyzer import assemble_unified_model, build_unified_model
+from analyzer.shard import merge_partials, run_map, run_reduce
+
+
+@pytest.mark.parametrize("shard_count", [1, 2, 5])
+def test_reduce_equals_single_node_run(tiny_repo, tmp_path, shard_count):
+    partial_files = []
+    for shard_index in range(shard_count):
+        partial_file = os.path.join(str(tmp_path), f"part{shard_index}.json")
+        run_map(tiny_repo, shard_index, shard_count, partial_file)
+        partial_files.append(partial_file)
+
+    output_file = os.path.join(str(tmp_path), "analysis.json")
+    merged = run_reduce(partial_files, output_file)
+    single = build_unified_model(tiny_repo)
+
+    assert merged == single
+    with open(output_file, "r", encoding="utf-8") as f:
+        assert f.read() == json.dumps(single, indent=2)
+
+
+def test_reduce_with_passes_equals_single_node_run(tiny_repo):
+    passes = ["classes", "complexity"]
+    partials = [run_map(tiny_repo, i, 3, passes=passes) for i in range(3)]
+    merged = assemble_unified_model(merge_partials(partials))
+
+    assert merged == build_unified_model(tiny_repo, passes=passes)
+
+
+def test_merge_rejects_incomplete_shard_sets(tiny_repo):
+    partials = [run_map(tiny_repo, i, 3) for i in range(3)]
+
+    with pytest.raises(ValueError, match="Missing shards"):
+        merge_partials(partials[:2])
+    with pytest.raises(ValueError, match="Duplicate shard"):
+        merge_partials(partials + partials[:1])
@@ -0,0 +1,235 @@
+"""
+chapters.py - Paginated, per-package tours for huge repositories
+Splits the learning order into chapters (one per package, large packages
+split into pages) so viewers never load the whole tour at once.
+
+Layout of the output directory:
+    index.json           Small chapter list (no file lists)
+    members.jsonl        One line per chapter: its files in tour order
+    chapters/<id>.json   Chapter content, generated on first request
+
+Chapter content is generated lazily by load_chapter(): the index records
+the byte offset of each chapter's line in members.jsonl, so producing
+one chapter reads a single line and touches only that chapter's files.
+"""
+
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+# Add project root to Python path so imports work
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from analyzer.dependency import package_of
+from tour.tour_builder import ORDERINGS, build_file_info, get_file_order
+
+INDEX_FILE = "index.json"
+MEMBERS_FILE = "members.jsonl"
+CHAPTERS_DIR = "chapters"
+
+DEFAULT_PACKAGE_DEPTH = 2
+MAX_CHAPTER_FILES = 200
+
+
+def plan_chapters(analyzer_data: Dict[str, Any], depth: int = DEFAULT_PACKAGE_DEPTH,
+                  ordering: str = "flow",
+                  max_chapter_files: int = MAX_CHAPTER_FILES) -> List[Dict[str, Any]]:
+    """
+    Group the learning order into chapters.
+
+    Chapters follow the tour: a package's chapter appears where its first
+    file appears in the learning order, and files keep their tour order
+    inside the chapter. Packages larger than max_chapter_files are split
+    into numbered parts.
+
+    Returns:
+        [{"id", "title", "package", "part", "files": [...]}, ...]
+    """
+    by_package: Dict[str, List[str]] = {}
+    for file_name in get_file_order(analyzer_data, ordering):
+        by_package.setdefault(package_of(file_name, depth), []).append(file_name)
+
+    chapters = []
+    for package, members in by_package.items():
+        parts = [members[i:i + max_chapter_files] for i in range(0, len(members), max_chapter_files)]
+        for part, files in enumerate(parts, start=1):
+            number = len(chapters) + 1
+            slug = package.replace("/", "-").strip("()") or "root"
+            title = package if len(parts) == 1 else f"{package} (part {part}/{len(parts)})"
+            chapters.append({
+                "id": f"{number:04d}-{slug}" + (f"-{part}" if len(parts) > 1 else ""),
+                "title": title,
+                "package": package,
+                "part": part,
+                "files": files
+            })
+
+    return chapters
+
+
+def write_tour_index(analyzer_data: Dict[str, Any], out_dir: str,
+                     depth: int = DEFAULT_PACKAGE_DEPTH, ordering: str = "flow",
+                     max_chapter_files: int = MAX_CHAPTER_FILES) -> Dict[str, Any]:
+    """
+    Write index.json and members.jsonl. Chapter files are not generated;
+    chapters cached for a previous index are removed, since chapter ids
+    are reused across models, orderings and depths.
+
+    Returns:
+        The index that was written
+    """
+    chapters_dir = os.path.join(out_dir, CHAPTERS_DIR)
+    os.makedirs(chapters_dir, exist_ok=True)
+    for name in os.listdir(chapters_dir):
+        if name.endswith(".json") or name.endswith(".json.tmp"):
+            os.remove(os.path.join(chapters_dir, name))
+    chapters = plan_chapters(analyzer_data, depth, ordering, max_chapter_files)
+    entries = []
+
+    with open(os.path.join(out_dir, MEMBERS_FILE), "wb") as f:
+        for chapter in chapters:
+            offset = f.tell()
+            f.write(json.dumps(chapter["files"]).encode("utf-8") + b"\n")
+            entries.append({
+                "id": chapter["id"],
+                "title": chapter["title"],
+                "package": chapter["package"],
+                "part": chapter["part"],
+                "file_count": len(chapter["files"]),
+                "first_file": chapter["files"][0],
+                "path": f"{CHAPTERS_DIR}/{chapter['id']}.json",
+                "members_offset": offset
+            })
+
+    index = {
+        "metadata": {
+            "entry_point": analyzer_data.get("entry_point"),
+            "ordering": ordering,
+            "package_depth": depth,
+            "total_files": sum(entry["file_count"] for entry in entries),
+            "total_chapters": len(entries)
+        },
+        "chapters": entries
+    }
+
+    with open(os.path.join(out_dir, INDEX_FILE), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+
+    return index
+
+
+def _read_members(out_dir: str, offset: int) -> List[str]:
+    with open(os.path.join(out_dir, MEMBERS_FILE), "rb") as f:
+        f.seek(offset)
+        return json.loads(f.readline())
+
+
+def load_chapter(out_dir: str, chapter_id: str, analyzer_data: Optional[Dict[str, Any]] = None,
+                 index: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Return a chapter, generating and caching it on first request.
+
+    Args:
+        out_dir: Directory written by write_tour_index()
+        chapter_id: Chapter "id" from the index
+        analyzer_data: Unified model; only needed if the chapter has not
+            been generated yet
+        index: Already-loaded index.json (read from disk if omitted)
+
+    Raises:
+        KeyError: Unknown chapter id
+        ValueError: Chapter must be generated but no model was given
+    """
+    if index is None:
+        with open(os.path.join(out_dir, INDEX_FILE), "r", encoding="utf-8") as f:
+            index = json.load(f)
+
+    chapters = index["chapters"]
+    position = next((i for i, c in enumerate(chapters) if c["id"] == chapter_id), None)
+    if position is None:
+        raise KeyError(f"Unknown chapter: {chapter_id}")
+    entry = chapters[position]
+
+    chapter_path = os.path.join(out_dir, entry["path"])
+    if os.path.exists(chapter_path):
+        with open(chapter_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    if analyzer_data is None:
+        raise ValueError(f"Chapter {chapter_id} has not been generated and no model was given")
+
+    files = analyzer_data.get("files", {})
+    entry_point = index["metadata"].get("entry_point")
+    members = _read_members(out_dir, entry["members_offset"])
+
+    chapter = {
+        "chapter": {
+            "id": entry["id"],
+            "title": entry["title"],
+            "number": position + 1,
+            "total": len(chapters)
+        },
+        "learning_order": [
+            build_file_info(file_name, files[file_name], file_name == entry_point)
+            for file_name in members
+        ],
+        "previous": chapters[position - 1]["id"] if position > 0 else None,
+        "next": chapters[position + 1]["id"] if position + 1 < len(chapters) else None
+    }
+
+    tmp_path = chapter_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(chapter, f, indent=2)
+    os.replace(tmp_path, chapter_path)
+
+    return chapter
+
+
+def main():
+    if len(sys.argv) < 3:
+        print(
+            "Usage: python chapters.py analyzer_output.json <out_dir> "
+            f"[--chapter <id>] [--depth <n>] [--order {'|'.join(ORDERINGS)}]",
+            file=sys.stderr
+        )
+        sys.exit(1)
+
+    analyzer_output_path = sys.argv[1]
+    out_dir = sys.argv[2]
+
+    def option(name, default=None):
+        if name in sys.argv:
+            idx = sys.argv.index(name)
+            if idx + 1 < len(sys.argv):
+                return sys.argv[idx + 1]
+        return default
+
+    chapter_id = option("--chapter")
+    depth = int(option("--depth", DEFAULT_PACKAGE_DEPTH))
+    ordering = option("--order", "flow")
+
+    def load_model():
+        with open(analyzer_output_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    if chapter_id:
+        # Cached chapters are served without reading the (large) model
+        try:
+            chapter = load_chapter(out_dir, chapter_id)
+        except ValueError:
+            chapter = load_chapter(out_dir, chapter_id, load_model())
+        print(json.dumps(chapter, indent=2))
+        return
+
+    analyzer_data = load_model()
+    index = write_tour_index(analyzer_data, out_dir, depth=depth, ordering=ordering)
+    print(
+        f"Wrote {index['metadata']['total_chapters']} chapters "
+        f"({index['metadata']['total_files']} files) to {os.path.join(out_dir, INDEX_FILE)}",
+        file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,13 @@
 import json
+import os
 import sys
+from typing import Any, Dict, List, Optional
+
+# Add project root to Python path so imports work
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from analyzer.dependency import build_reverse_dependency_graph
+
 FILE_ENTRY_TEMPLATE = (
     "This file acts as the entry point of the system. "
     "Execution of the application begins here."
@@ -18,7 +26,29 @@ FUNCTION_ENTRY_TEMPLATE = (
 FUNCTION_GENERIC_TEMPLATE = (
     "This function contributes to the system's behavior as part of its execution."
 )
-def explain_file(file_name, analyzer_files, entry_point):
+def build_dependency_index(analyzer_files: Dict[str, Any]) -> Dict[str, Dict]:
+    """
+    Build the reverse-dependency index once per model.
+    
+    Args:
+        analyzer_files: Dict of file data from unified model
+    
+    Returns:
+        {
+            "dependents": {file: [files that depend on it]},
+            "fan_in": {file: number of dependents}
+        }
+    """
+    dependency_graph = {
+        file_name: file_data.get("depends_on", [])
+        for file_name, file_data in analyzer_files.items()
+    }
+    dependents = build_reverse_dependency_graph(dependency_graph)
+    return {
+        "dependents": dependents,
+        "fan_in": {file_name: len(files) for file_name, files in dependents.items()}
+    }
+def explain_file(file_name, analyzer_files, entry_point, index: Optional[Dict[str, Dict]] = None):
     """
     Explain a file's role in the system.
     
@@ -26,6 +56,8 @@ def explain_file(file_name, analyzer_files, entry_point):
         file_name: Name of the file
         analyzer_files: Dict of file data from unified model
         entry_point: Entry point file name
+        index: Output of build_dependency_index(). Pass it when explaining
+            many files; otherwise it is rebuilt on every call.
     
     Returns:
         Explanation string
@@ -33,13 +65,10 @@ def explain_file(file_name, analyzer_files, entry_point):
     if file_name == entry_point:
         return FILE_ENTRY_TEMPLATE
     
-    file_data = analyzer_files.get(file_name, {})
-    # Check if file has dependencies (is called by other files)
-    depends_on = file_data.get("depends_on", [])
-    # Also check if it's imported/called by checking if any file depends on it
-    # Actually, depends_on shows what THIS file depends on, not what depends on IT
-    # For now, if it has dependencies, it's likely a called file
-    if depends_on:
+    if index is None:
+        index = build_dependency_index(analyzer_files)
+    # A file is "called" when at least one other file depends on it
+    if index["fan_in"].get(file_name, 0) > 0:
         return FILE_CALLED_TEMPLATE
     
     return FILE_SUPPORT_TEMPLATE
@@ -55,24 +84,20 @@ def explain_functions(functions, is_entry_file):
             "explanation": explanation
         })
     return explained
-def main():
-    if len(sys.argv) != 3:
-        print(
-            "Usage: python explainer.py analyzer_output.json learning_order.json",
-            file=sys.stderr
-        )
-        sys.exit(1)
-    analyzer_output_path = sys.argv[1]
-    learning_order_path = sys.argv[2]
-    
-    with open(analyzer_output_path, "r", encoding="utf-8") as f:
-        analyzer_data = json.load(f)
+def explain_learning_order(analyzer_data: Dict[str, Any], learning_order_data: Dict[str, Any]) -> Dict[str, List]:
+    """
+    Explain every step of a learning order, in-process.
     
-    with open(learning_order_path, "r", encoding="utf-8") as f:
-        learning_order_data = json.load(f)
+    Args:
+        analyzer_data: Unified model (analysis.json)
+        learning_order_data: Output of build_learning_order()
     
+    Returns:
+        {"learning_steps": [{"file", "summary", "functions"}, ...]}
+    """
     analyzer_files = analyzer_data.get("files", {})
     entry_point = learning_order_data["metadata"].get("entry_point")
+    index = build_dependency_index(analyzer_files)
     learning_steps = []
     for item in learning_order_data["learning_order"]:
         file_name = item["file"]
@@ -80,13 +105,30 @@ def main():
         is_entry = item.get("is_entry", False)
         step = {
             "file": file_name,
-            "summary": explain_file(file_name, analyzer_files, entry_point),
+            "summary": explain_file(file_name, analyzer_files, entry_point, index),
             "functions": explain_functions(functions, is_entry)
         }
         learning_steps.append(step)
-    output = {
+    return {
         "learning_steps": learning_steps
     }
+def main():
+    if len(sys.argv) != 3:
+        print(
+            "Usage: python explainer.py analyzer_output.json learning_order.json",
+            file=sys.stderr
+        )
+        sys.exit(1)
+    analyzer_output_path = sys.argv[1]
+    learning_order_path = sys.argv[2]
+    
+    with open(analyzer_output_path, "r", encoding="utf-8") as f:
+        analyzer_data = json.load(f)
+    
+    with open(learning_order_path, "r", encoding="utf-8") as f:
+        learning_order_data = json.load(f)
+    
+    output = explain_learning_order(analyzer_data, learning_order_data)
     print(json.dumps(output, indent=2))
 if __name__ == "__main__":
     main()
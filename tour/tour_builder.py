@@ -1,8 +1,74 @@
 import json
+import os
 import sys
 from typing import Dict, List, Any
 
-def build_learning_order(analyzer_data: Dict[str, Any]) -> Dict[str, Any]:
+# Add project root to Python path so imports work
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from tour.ordering import dependency_order
+
+ORDERINGS = ("flow", "model")
+
+
+def get_function_info(functions_dict: Dict, file_data: Dict) -> List[Dict]:
+    """Extract function info with explanations if present."""
+    function_list = []
+    if isinstance(functions_dict, dict):
+        for func_name, func_data in functions_dict.items():
+            func_info = {"name": func_name}
+            # Include explanation if present (from enrichment)
+            explanation = func_data.get("explanation") if isinstance(func_data, dict) else None
+            if explanation:
+                func_info["explanation"] = explanation
+            function_list.append(func_info)
+    elif isinstance(functions_dict, list):
+        # Legacy format: just function names
+        for func_name in functions_dict:
+            # Try to find explanation from file_data
+            file_functions = file_data.get("functions", {})
+            if isinstance(file_functions, dict) and func_name in file_functions:
+                func_data = file_functions[func_name]
+                if isinstance(func_data, dict):
+                    explanation = func_data.get("explanation")
+                    if explanation:
+                        function_list.append({"name": func_name, "explanation": explanation})
+                        continue
+            function_list.append({"name": func_name})
+    return function_list
+
+
+def build_file_info(file_name: str, file_data: Dict, is_entry: bool) -> Dict:
+    """Build one learning-order step for a file."""
+    file_info = {
+        "file": file_name,
+        "functions": get_function_info(file_data.get("functions", {}), file_data),
+        "is_entry": is_entry
+    }
+    # Include explanation if present (from enrichment)
+    explanation = file_data.get("explanation")
+    if explanation:
+        file_info["explanation"] = explanation
+    return file_info
+
+
+def get_file_order(analyzer_data: Dict[str, Any], ordering: str = "flow") -> List[str]:
+    """
+    File order of the tour: entry point first, then the rest by `ordering`.
+    """
+    files = analyzer_data.get("files", {})
+    entry_point = analyzer_data.get("entry_point")
+
+    if ordering == "flow":
+        rest = dependency_order(files, entry_point)
+    else:
+        rest = list(files)
+
+    head = [entry_point] if entry_point and entry_point in files else []
+    return head + [file_name for file_name in rest if file_name != entry_point]
+
+
+def build_learning_order(analyzer_data: Dict[str, Any], ordering: str = "flow") -> Dict[str, Any]:
     """
     Build learning order from unified model format.
     
@@ -21,6 +87,9 @@ def build_learning_order(analyzer_data: Dict[str, Any]) -> Dict[str, Any]:
                     }
                 }
             }
+        ordering: "flow" walks the dependency graph from the entry point
+            (see tour/ordering.py); "model" keeps the entry point first
+            and then the model's file order.
     
     Returns:
         Learning order with files and their functions
@@ -29,86 +98,34 @@ def build_learning_order(analyzer_data: Dict[str, Any]) -> Dict[str, Any]:
     entry_point = analyzer_data.get("entry_point")
     learning_order = []
     
-    # Extract function names from the functions dict
-    def get_function_names(functions_dict: Dict) -> List[str]:
-        """Extract function names from functions dict."""
-        if isinstance(functions_dict, dict):
-            return list(functions_dict.keys())
-        elif isinstance(functions_dict, list):
-            return functions_dict
-        else:
-            return []
-    
-    # Extract function info with explanations if present
-    def get_function_info(functions_dict: Dict, file_data: Dict) -> List[Dict]:
-        """Extract function info with explanations if present."""
-        function_list = []
-        if isinstance(functions_dict, dict):
-            for func_name, func_data in functions_dict.items():
-                func_info = {"name": func_name}
-                # Include explanation if present (from enrichment)
-                explanation = func_data.get("explanation") if isinstance(func_data, dict) else None
-                if explanation:
-                    func_info["explanation"] = explanation
-                function_list.append(func_info)
-        elif isinstance(functions_dict, list):
-            # Legacy format: just function names
-            for func_name in functions_dict:
-                # Try to find explanation from file_data
-                file_functions = file_data.get("functions", {})
-                if isinstance(file_functions, dict) and func_name in file_functions:
-                    func_data = file_functions[func_name]
-                    if isinstance(func_data, dict):
-                        explanation = func_data.get("explanation")
-                        if explanation:
-                            function_list.append({"name": func_name, "explanation": explanation})
-                            continue
-                function_list.append({"name": func_name})
-        return function_list
-    
-    # Add entry point first if it exists
-    if entry_point and entry_point in files:
-        file_data = files[entry_point]
-        file_info = {
-            "file": entry_point,
-            "functions": get_function_info(file_data.get("functions", {}), file_data),
-            "is_entry": True
-        }
-        # Include explanation if present (from enrichment)
-        explanation = file_data.get("explanation")
-        if explanation:
-            file_info["explanation"] = explanation
-        learning_order.append(file_info)
-    
-    # Add other files
-    for file_name, file_data in files.items():
-        if file_name == entry_point:
-            continue
-        file_info = {
-            "file": file_name,
-            "functions": get_function_info(file_data.get("functions", {}), file_data),
-            "is_entry": False
-        }
-        # Include explanation if present (from enrichment)
-        explanation = file_data.get("explanation")
-        if explanation:
-            file_info["explanation"] = explanation
-        learning_order.append(file_info)
+    # Entry point first (if it exists), then the other files
+    for file_name in get_file_order(analyzer_data, ordering):
+        learning_order.append(
+            build_file_info(file_name, files[file_name], file_name == entry_point)
+        )
     
     return {
         "learning_order": learning_order,
         "metadata": {
-            "entry_point": entry_point
+            "entry_point": entry_point,
+            "ordering": ordering
         }
     }
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python tour_builder.py analyzer_output.json", file=sys.stderr)
+    if len(sys.argv) not in (2, 4) or (len(sys.argv) == 4 and sys.argv[2] != "--order"):
+        print(
+            f"Usage: python tour_builder.py analyzer_output.json [--order {'|'.join(ORDERINGS)}]",
+            file=sys.stderr
+        )
         sys.exit(1)
     analyzer_output_path = sys.argv[1]
+    ordering = sys.argv[3] if len(sys.argv) == 4 else "flow"
+    if ordering not in ORDERINGS:
+        print(f"Unknown ordering: {ordering}", file=sys.stderr)
+        sys.exit(1)
     with open(analyzer_output_path, "r") as f:
         analyzer_data = json.load(f)
-    result = build_learning_order(analyzer_data)
+    result = build_learning_order(analyzer_data, ordering=ordering)
     print(json.dumps(result, indent=2))
 if __name__ == "__main__":
     main()